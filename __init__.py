@@ -66,6 +66,7 @@ def register():
         print("Registering Runchat Addon...")
         
         preferences.register()
+        preferences.apply_network_settings()
         print("✓ Preferences registered")
         
         properties.register()
@@ -81,6 +82,9 @@ def register():
         bpy.types.Scene.runchat_properties = bpy.props.PointerProperty(type=properties.RunChatProperties)
         print("✓ Property group attached to Scene")
         
+        utils.capture_cache.register()
+        print("✓ Scene change tracking registered")
+        
         print("✅ Runchat Addon Registered Successfully")
         
         # Auto-load examples after a short delay to avoid blocking startup
@@ -109,6 +113,10 @@ def unregister():
     try:
         print("Unregistering Runchat Addon...")
         
+        utils.capture_cache.unregister()
+        utils.dispatch.unregister()
+        print("✓ Scene change tracking and main-thread dispatch removed")
+        
         # Remove the main property group from the Scene
         if hasattr(bpy.types.Scene, 'runchat_properties'):
             del bpy.types.Scene.runchat_properties
@@ -126,6 +134,10 @@ def unregister():
         preferences.unregister()
         print("✓ Preferences unregistered")
         
+        utils.workers.shutdown()
+        utils.transport.close()
+        print("✓ Worker pools and network connections closed")
+        
         print("✅ Runchat Addon Unregistered Successfully")
         
     except Exception as e:
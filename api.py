@@ -2,6 +2,11 @@
 # Copyright (C) 2024 Runchat - Licensed under GPL v3
 
 import bpy
+import time
+
+from .utils import cancellation
+from .utils import streaming
+from .utils import transport
 
 # Import requests lazily when needed to avoid import issues during module loading
 _requests = None
@@ -36,6 +41,27 @@ def is_credit_error(error_message):
     return any(keyword in error_lower for keyword in credit_keywords)
 
 
+def error_result(message, status_code=0):
+    """Error dict in the shape run_workflow returns for API errors"""
+    return {
+        'error': True,
+        'status_code': status_code,
+        'message': message,
+        'is_credit_error': is_credit_error(message)
+    }
+
+
+def normalize_progress(value):
+    """Progress reported as a fraction or a percentage, as a fraction in 0-1"""
+    try:
+        progress = float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    if progress > 1.0:
+        progress /= 100.0
+    return min(max(progress, 0.0), 1.0)
+
+
 def format_credit_error(error_message):
     """Format a credit error message for display"""
     if not error_message:
@@ -51,8 +77,32 @@ def format_credit_error(error_message):
 class RunChatAPI:
     BASE_URL = "https://runchat.app/api/v1"
     UPLOAD_URL = "https://runchat.app/api/upload/supabase"
+    UPLOAD_STREAM_URL = "https://runchat.app/api/upload/supabase"  # Same route, multipart/form-data body
     EXAMPLES_URL = "https://runchat.app/api/v1/examples"
     
+    # Set to False once the server says it has no multipart route (404/405/415), so later uploads go
+    # straight to base64. Any other rejection only sends that one upload through base64.
+    stream_upload_supported = True
+    # Set once a multipart upload succeeds; after that a rejection is about the upload, not the route
+    stream_upload_confirmed = False
+    
+    # Streamed execution (preference): outputs are handed over one by one as the server finishes them
+    streaming_enabled = False
+    
+    # Submit-then-poll execution (preference). Whether the server has a status endpoint is probed once,
+    # before the first submit, since a run that was already accepted must never be submitted again
+    status_polling_enabled = True
+    status_polling_supported = None
+    
+    # Status polling backs off from the first interval to the cap, and starts over whenever progress changes
+    POLL_INTERVAL_MIN = 0.5
+    POLL_INTERVAL_MAX = 10.0
+    POLL_BACKOFF = 1.5
+    POLL_MAX_FAILURES = 5
+    POLL_TIMEOUT = 1800
+    PENDING_STATUSES = ('accepted', 'queued', 'pending', 'started', 'running', 'processing', 'in_progress')
+    FAILED_STATUSES = ('failed', 'error', 'cancelled', 'canceled')
+    
     @staticmethod
     def get_headers(api_key):
         return {
@@ -88,9 +138,8 @@ class RunChatAPI:
                 'Cache-Control': 'no-cache'  # Try to bypass caching
             }
             
-            # Use session for better connection handling
-            session = requests.Session()
-            response = session.get(url, headers=headers, timeout=30)
+            # Use the shared pooled transport so the connection is reused
+            response = transport.get(url, headers=headers, timeout=30)
             log_to_blender(f"Response status: {response.status_code}")
             log_to_blender(f"Response headers: {dict(response.headers)}")
             
@@ -219,7 +268,7 @@ class RunChatAPI:
         
         try:
             log_to_blender("Sending GET request for schema...")
-            response = requests.get(url, headers=headers, timeout=30)
+            response = transport.get(url, headers=headers, timeout=30)
             log_to_blender(f"Response status: {response.status_code}")
             log_to_blender(f"Response headers: {dict(response.headers)}")
             
@@ -295,8 +344,8 @@ class RunChatAPI:
             return None
     
     @staticmethod
-    def run_workflow(runchat_id, api_key, inputs=None, instance_id=None):
-        """Run a Runchat workflow"""
+    def run_workflow(runchat_id, api_key, inputs=None, instance_id=None, wait=True):
+        """Run a Runchat workflow. With wait=False the server is asked to return as soon as the run is queued."""
         # Check if online access is available
         if not bpy.app.online_access:
             log_to_blender("Network access is disabled in Blender", 'ERROR')
@@ -320,6 +369,10 @@ class RunChatAPI:
             data["inputs"] = inputs
         if instance_id:
             data["runchat_instance_id"] = instance_id
+        if not wait:
+            # Assumed flag, not a documented one: a server that ignores it just runs the workflow
+            # and answers with the result, which run_workflow_polled tells apart by its status
+            data["async"] = True
         
         log_to_blender("=== WORKFLOW EXECUTION API CALL ===")
         log_to_blender(f"URL: {url}")
@@ -332,7 +385,7 @@ class RunChatAPI:
         
         try:
             log_to_blender("Sending POST request...")
-            response = requests.post(url, headers=headers, json=data, timeout=300)  # Increased to 5 minutes
+            response = transport.post(url, headers=headers, json=data, timeout=300)  # Increased to 5 minutes
             
             log_to_blender(f"Response received - Status: {response.status_code}")
             log_to_blender(f"Response headers: {dict(response.headers)}")
@@ -456,7 +509,7 @@ class RunChatAPI:
             return None
 
     @staticmethod
-    def upload_image(base64_image, filename, api_key):
+    def upload_image(base64_image, filename, api_key, use_cache=True):
         """Upload an image to runchat"""
         # Check if online access is available
         if not bpy.app.online_access:
@@ -467,6 +520,20 @@ class RunChatAPI:
             log_to_blender("Base64 image and API key are required", 'ERROR')
             return None
         
+        # Skip the upload entirely if this exact content already has a valid URL
+        digest = None
+        if use_cache:
+            import base64
+            from .utils.upload_cache import get_upload_cache, hash_bytes
+            try:
+                digest = hash_bytes(base64.b64decode(base64_image))
+            except ValueError:
+                digest = None
+            cached_url = get_upload_cache().lookup(digest)
+            if cached_url:
+                log_to_blender(f"Upload cache hit for {filename}: {cached_url}")
+                return cached_url
+        
         url = RunChatAPI.UPLOAD_URL
         headers = RunChatAPI.get_headers(api_key)
         
@@ -489,7 +556,7 @@ class RunChatAPI:
         
         try:
             log_to_blender("Sending image upload request...")
-            response = requests.post(url, headers=headers, json=data, timeout=60)
+            response = transport.post(url, headers=headers, json=data, timeout=60)
             log_to_blender(f"Upload response status: {response.status_code}")
             log_to_blender(f"Upload response headers: {dict(response.headers)}")
             
@@ -550,6 +617,8 @@ class RunChatAPI:
             url_result = result.get("url")
             if url_result:
                 log_to_blender(f"Image uploaded successfully: {url_result}")
+                if digest:
+                    get_upload_cache().store(digest, url_result, len(base64_image) * 3 // 4)
             else:
                 log_to_blender("Image upload completed but no URL returned", 'WARNING')
             
@@ -570,6 +639,145 @@ class RunChatAPI:
                 log_to_blender(f"Response content: {e.response.text}", 'ERROR')
             return None
 
+    @staticmethod
+    def upload_file(file_path, api_key, filename=None):
+        """Upload an image file to runchat, streaming it from disk"""
+        import os
+        if not file_path or not os.path.exists(file_path):
+            log_to_blender(f"Upload file not found: {file_path}", 'ERROR')
+            return None
+        
+        filename = filename or os.path.basename(file_path)
+        return RunChatAPI._upload_raw(file_path, filename, api_key)
+    
+    @staticmethod
+    def upload_bytes(image_bytes, filename, api_key, digest=None):
+        """Upload an in-memory encoded image (bytes or memoryview) to runchat"""
+        if not image_bytes:
+            log_to_blender("Image bytes are required", 'ERROR')
+            return None
+        
+        return RunChatAPI._upload_raw(image_bytes, filename, api_key, digest)
+    
+    @staticmethod
+    def _upload_raw(source, filename, api_key, digest=None):
+        """Upload raw bytes as multipart/form-data, falling back to the base64 JSON endpoint"""
+        # Check if online access is available
+        if not bpy.app.online_access:
+            log_to_blender("Network access is disabled in Blender", 'ERROR')
+            return None
+            
+        if not api_key:
+            log_to_blender("API key is required", 'ERROR')
+            return None
+        
+        # Skip the upload entirely if this exact content already has a valid URL
+        from .utils.upload_cache import get_upload_cache, hash_bytes, hash_file
+        if isinstance(source, str):
+            import os
+            digest = digest or hash_file(source)
+            size = os.path.getsize(source)
+        else:
+            # Encoded captures arrive already hashed by the encode worker
+            digest = digest or hash_bytes(source)
+            size = memoryview(source).nbytes
+        
+        upload_cache = get_upload_cache()
+        cached_url = upload_cache.lookup(digest)
+        if cached_url:
+            log_to_blender(f"Upload cache hit for {filename}: {cached_url}")
+            return cached_url
+        
+        url_result = None
+        fallback = not RunChatAPI.stream_upload_supported
+        if RunChatAPI.stream_upload_supported:
+            url_result, fallback, permanent = RunChatAPI._upload_multipart(source, filename, api_key)
+            if permanent:
+                log_to_blender("Server has no multipart upload route - using base64 uploads from now on", 'WARNING')
+                RunChatAPI.stream_upload_supported = False
+            elif fallback:
+                log_to_blender("Multipart upload not accepted - sending this one as base64", 'WARNING')
+        
+        if fallback:
+            # Fallback: base64-in-JSON upload
+            import base64
+            if isinstance(source, str):
+                with open(source, 'rb') as f:
+                    base64_image = base64.b64encode(f.read()).decode('utf-8')
+            else:
+                base64_image = base64.b64encode(source).decode('utf-8')
+            
+            url_result = RunChatAPI.upload_image(base64_image, filename, api_key, use_cache=False)
+        
+        if url_result and digest:
+            upload_cache.store(digest, url_result, size)
+        
+        return url_result
+    
+    @staticmethod
+    def _upload_multipart(source, filename, api_key):
+        """
+        Stream an upload as multipart/form-data.
+        Returns (url, fallback, permanent): fallback when this upload should be retried as base64,
+        permanent when the answer shows the route doesn't take multipart at all (404/405/415).
+        """
+        from .utils.multipart import MultipartStream
+        
+        body = MultipartStream(source, filename, field_name="file", fields={"filename": filename})
+        
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": body.content_type,
+            'Accept-Encoding': 'gzip, deflate',  # Avoid zstd compression
+            'Cache-Control': 'no-cache'
+        }
+        
+        log_to_blender(f"Streaming upload: {filename} ({body.payload_size} bytes, {len(body)} on the wire)")
+        
+        # Get requests module once and reuse
+        requests = get_requests_module()
+        
+        try:
+            response = transport.post(RunChatAPI.UPLOAD_STREAM_URL, headers=headers, data=body, timeout=60)
+            log_to_blender(f"Streaming upload response status: {response.status_code}")
+            
+            # No multipart route, or one that refuses the content type
+            if response.status_code in (404, 405, 415):
+                log_to_blender(f"Streaming upload rejected: {response.text[:200]}", 'WARNING')
+                return None, True, True
+            # A JSON-only route may reject or crash on a body it doesn't expect, but so may a working
+            # one on a bad upload or a bad moment: only this upload falls back
+            if (response.status_code in (400, 422)
+                    or (response.status_code >= 500 and not RunChatAPI.stream_upload_confirmed)):
+                log_to_blender(f"Streaming upload failed with HTTP {response.status_code}: {response.text[:200]}", 'WARNING')
+                return None, True, False
+            
+            response.raise_for_status()
+            
+            try:
+                result = response.json()
+            except ValueError as json_error:
+                log_to_blender(f"Streaming upload JSON parsing failed: {json_error}", 'ERROR')
+                return None, True, False
+            
+            url_result = result.get("url") if isinstance(result, dict) else None
+            if url_result:
+                log_to_blender(f"Image uploaded successfully: {url_result}")
+                RunChatAPI.stream_upload_confirmed = True
+                return url_result, False, False
+            
+            log_to_blender("Streaming upload completed but no URL returned", 'WARNING')
+            return None, True, False
+        except requests.exceptions.Timeout:
+            log_to_blender("Streaming upload request timed out", 'ERROR')
+            return None, False, False
+        except requests.exceptions.ConnectionError as e:
+            log_to_blender(f"Streaming upload connection error: {e}", 'ERROR')
+            return None, False, False
+        except requests.exceptions.RequestException as e:
+            log_to_blender(f"Streaming upload error: {e}", 'ERROR')
+            return None, False, False
+
     @staticmethod
     def poll_workflow_status(runchat_id, api_key, instance_id):
         """Poll for workflow status and progress"""
@@ -587,22 +795,17 @@ class RunChatAPI:
         
         data = {"runchat_instance_id": instance_id}
         
-        log_to_blender(f"Polling workflow status - URL: {url}")
-        log_to_blender(f"Polling with instance ID: {instance_id}")
-        
         try:
-            response = get_requests_module().post(url, headers=headers, json=data, timeout=30)
-            log_to_blender(f"Polling response status: {response.status_code}")
+            response = transport.post(url, headers=headers, json=data, timeout=30)
             
             if response.status_code == 404:
-                # Status endpoint might not exist, return None to fall back to regular execution
+                # The endpoint exists (probed before submitting), so the server doesn't know this instance
+                log_to_blender(f"Status of instance {instance_id} not found")
                 return None
             
             response.raise_for_status()
             result = response.json()
             
-            log_to_blender(f"Polling result: {result}")
-            
             if isinstance(result, dict):
                 status = result.get('status', 'unknown')
                 progress = result.get('progress', 0)
@@ -613,4 +816,243 @@ class RunChatAPI:
             
         except get_requests_module().exceptions.RequestException as e:
             log_to_blender(f"Error polling workflow status: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def probe_status_endpoint(runchat_id, api_key):
+        """
+        Whether the server has a status endpoint, checked once per session with a request for no
+        instance: an unknown route answers 404/405, a real one accepts it or rejects the empty ID
+        (2xx/400/422). Any other answer (auth errors, 5xx, a proxy page) proves nothing, so it
+        returns None and caches nothing, like a probe that fails outright.
+        """
+        if RunChatAPI.status_polling_supported is not None:
+            return RunChatAPI.status_polling_supported
+        
+        url = f"{RunChatAPI.BASE_URL}/{runchat_id}/status"
+        try:
+            response = transport.post(url, headers=RunChatAPI.get_headers(api_key),
+                                      json={"runchat_instance_id": ""}, timeout=10)
+        except get_requests_module().exceptions.RequestException as e:
+            log_to_blender(f"Could not probe the status endpoint: {e}")
+            return None
+        
+        code = response.status_code
+        if code in (404, 405):
+            RunChatAPI.status_polling_supported = False
+        elif 200 <= code < 300 or code in (400, 422):
+            RunChatAPI.status_polling_supported = True
+        else:
+            log_to_blender(f"Status endpoint probe inconclusive (HTTP {code}), will check again next run")
+            return None
+        log_to_blender(f"Status endpoint {'available' if RunChatAPI.status_polling_supported else 'not available'} "
+                       f"(probe answered HTTP {response.status_code})")
+        return RunChatAPI.status_polling_supported
+
+    @staticmethod
+    def run_workflow_polled(runchat_id, api_key, inputs=None, instance_id=None, on_progress=None, on_partial=None):
+        """
+        Submit a workflow, then poll its status until it finishes instead of holding one request open.
+        on_progress(fraction, message) is called when the reported progress changes and on_partial(status)
+        when the status carries outputs, both on the calling thread. Falls back to the blocking
+        run_workflow when polling is off or the server has no status endpoint. Once a run has been
+        accepted it is never submitted again: a run that can't be followed ends in an error result.
+        """
+        if not RunChatAPI.status_polling_enabled or not RunChatAPI.probe_status_endpoint(runchat_id, api_key):
+            return RunChatAPI.run_workflow(runchat_id, api_key, inputs, instance_id)
+        
+        submitted = RunChatAPI.run_workflow(runchat_id, api_key, inputs, instance_id, wait=False)
+        if not isinstance(submitted, dict) or submitted.get('error'):
+            return submitted
+        if str(submitted.get('status', '')).lower() not in RunChatAPI.PENDING_STATUSES:
+            # The server ran the workflow before answering (it ignored "async"), this is already the result
+            log_to_blender("Server answered the submit with a finished run, nothing to poll")
+            return submitted
+        
+        poll_id = submitted.get('runchat_instance_id') or submitted.get('instance_id') or instance_id
+        if not poll_id:
+            log_to_blender("Submitted run has no instance ID to poll", 'ERROR')
+            return error_result("The server accepted the run but returned no instance ID to follow it")
+        
+        token = cancellation.current()
+        if token is not None:
+            # The props only learn this ID when the result is applied; cancel needs it now
+            token.instance_id = poll_id
+        interval = RunChatAPI.POLL_INTERVAL_MIN
+        deadline = time.time() + RunChatAPI.POLL_TIMEOUT
+        last_seen = None
+        failures = 0
+        
+        while True:
+            if token is not None:
+                token.wait(interval)
+                token.raise_if_cancelled()
+            else:
+                time.sleep(interval)
+            
+            status = RunChatAPI.poll_workflow_status(runchat_id, api_key, poll_id)
+            if status is None:
+                failures += 1
+                if failures >= RunChatAPI.POLL_MAX_FAILURES:
+                    log_to_blender(f"Giving up on {poll_id} after {failures} failed status checks", 'ERROR')
+                    return error_result(f"Lost track of run {poll_id} after {failures} failed status checks")
+            else:
+                failures = 0
+                state = str(status.get('status', '')).lower()
+                if state in RunChatAPI.FAILED_STATUSES:
+                    message = status.get('error') or status.get('message') or f"Workflow {state}"
+                    return error_result(str(message), status.get('status_code', 0))
+                if state not in RunChatAPI.PENDING_STATUSES:
+                    return status
+                
+                progress = normalize_progress(status.get('progress'))
+                seen = (progress, status.get('message'), status.get('data'))
+                if seen != last_seen:
+                    last_seen = seen
+                    # Something moved: check again soon
+                    interval = RunChatAPI.POLL_INTERVAL_MIN / RunChatAPI.POLL_BACKOFF
+                    if on_progress:
+                        on_progress(progress, status.get('message') or state)
+                    if on_partial and status.get('data'):
+                        on_partial(status)
+            
+            if time.time() > deadline:
+                log_to_blender(f"Workflow {poll_id} still running after {RunChatAPI.POLL_TIMEOUT}s, cancelling it", 'ERROR')
+                # Don't leave an abandoned run using credits server-side
+                RunChatAPI.cancel_workflow(runchat_id, api_key, poll_id)
+                return error_result(f"Run {poll_id} timed out after {RunChatAPI.POLL_TIMEOUT}s and was cancelled")
+            interval = min(interval * RunChatAPI.POLL_BACKOFF, RunChatAPI.POLL_INTERVAL_MAX)
+
+    @staticmethod
+    def stream_workflow(runchat_id, api_key, inputs=None, instance_id=None, on_event=None):
+        """
+        Run a workflow as a stream (SSE or NDJSON) and call on_event(event) for each output and
+        progress event as it arrives, on the calling thread (see utils/streaming.py for the events).
+        Returns the final result in run_workflow's shape; a server that doesn't stream just
+        answers with the plain JSON result, which is returned as-is. If the stream breaks or ends
+        without a done event, the outputs received so far come back with result['partial'] = True.
+        """
+        if not bpy.app.online_access:
+            log_to_blender("Network access is disabled in Blender", 'ERROR')
+            return None
+            
+        if not runchat_id or not api_key:
+            log_to_blender("Runchat ID and API key are required", 'ERROR')
+            return None
+        
+        url = f"{RunChatAPI.BASE_URL}/{runchat_id}"
+        headers = RunChatAPI.get_headers(api_key)
+        headers.update({
+            'Accept': f"{streaming.SSE_CONTENT_TYPE}, {streaming.NDJSON_CONTENT_TYPES[0]}, application/json",
+            'Accept-Encoding': 'gzip, deflate',
+            'Cache-Control': 'no-cache'
+        })
+        
+        data = {"stream": True}
+        if inputs:
+            data["inputs"] = inputs
+        if instance_id:
+            data["runchat_instance_id"] = instance_id
+        
+        requests = get_requests_module()
+        token = cancellation.current()
+        outputs = {}
+        final = None
+        
+        try:
+            # The read timeout applies between events, not to the whole run
+            response = transport.post(url, headers=headers, json=data, timeout=(30, 300), stream=True)
+            with response:
+                if response.status_code >= 400:
+                    message = None
+                    try:
+                        error_data = response.json()
+                        if isinstance(error_data, dict) and error_data.get('error'):
+                            message = str(error_data['error'])
+                    except ValueError:
+                        pass
+                    if not message:
+                        if response.status_code == 403:
+                            message = 'Access forbidden - this may be due to insufficient credits.'
+                        else:
+                            message = f"HTTP {response.status_code}"
+                    log_to_blender(f"Streaming run failed: {message}", 'ERROR')
+                    return error_result(message, response.status_code)
+                
+                fmt = streaming.stream_format(response.headers.get('Content-Type'))
+                if fmt is None:
+                    log_to_blender("Server answered without streaming, using the full result")
+                    return response.json()
+                
+                log_to_blender(f"Streaming workflow outputs ({fmt})")
+                for event in streaming.iter_events(response.iter_lines(), fmt):
+                    if token is not None:
+                        token.raise_if_cancelled()
+                    if event['type'] == 'error':
+                        message = event.get('message') or event.get('error') or "Workflow failed"
+                        return error_result(str(message), event.get('status_code', 0))
+                    if event['type'] == 'done':
+                        final = event
+                        break
+                    if event['type'] == 'output' and event.get('id'):
+                        outputs[event['id']] = event.get('data')
+                    elif event['type'] != 'progress':
+                        continue
+                    if on_event:
+                        on_event(event)
+                
+        except requests.exceptions.RequestException as e:
+            if token is not None:
+                token.raise_if_cancelled()
+            log_to_blender(f"Stream interrupted: {e}", 'ERROR')
+            if not outputs:
+                return None
+        except ValueError as e:
+            log_to_blender(f"Invalid JSON in workflow response: {e}", 'ERROR')
+            return None
+        
+        if token is not None:
+            # A cancel can also look like the server closing the stream
+            token.raise_if_cancelled()
+        partial = final is None
+        if partial:
+            log_to_blender(f"Stream ended without a final event, keeping {len(outputs)} outputs", 'WARNING')
+            final = {}
+        
+        # The final event's outputs are authoritative; streamed ones fill in anything it leaves out
+        result = {key: value for key, value in final.items() if key != 'type'}
+        if not result.get('data'):
+            result['data'] = [{'id': output_id, 'data': value} for output_id, value in outputs.items()]
+        if partial:
+            # Not a finished run: other outputs may never have arrived
+            result['partial'] = True
+        return result
+
+    @staticmethod
+    def cancel_workflow(runchat_id, api_key, instance_id):
+        """Ask the server to stop a running instance through the status endpoint. Returns True if accepted."""
+        if not bpy.app.online_access:
+            return False
+            
+        if not runchat_id or not api_key or not instance_id:
+            return False
+        
+        url = f"{RunChatAPI.BASE_URL}/{runchat_id}/status"
+        headers = RunChatAPI.get_headers(api_key)
+        data = {"runchat_instance_id": instance_id, "action": "cancel"}
+        
+        try:
+            response = transport.post(url, headers=headers, json=data, timeout=10)
+            
+            if response.status_code in (400, 404, 405, 501):
+                # Older servers only report status; the run simply finishes server-side
+                log_to_blender(f"Server does not support cancelling runs (status {response.status_code})")
+                return False
+            
+            response.raise_for_status()
+            log_to_blender(f"Cancel requested for instance {instance_id}")
+            return True
+            
+        except get_requests_module().exceptions.RequestException as e:
+            log_to_blender(f"Error requesting cancel: {e}")
+            return False
\ No newline at end of file
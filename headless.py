@@ -0,0 +1,346 @@
+# headless.py
+# Copyright (C) 2024 Runchat - Licensed under GPL v3
+
+"""
+Headless batch entry point for render farms
+Runs the jobs of a JSON or CSV manifest without any UI and writes a
+machine-readable results/timings report. Use it from a background Blender:
+
+    blender -b scene.blend --python-expr "from bl_ext.user_default.runchat_blender_addon import headless; headless.main()" -- --manifest jobs.json
+
+JSON manifest:
+    {
+        "runchat_id": "...",               default workflow for every job
+        "concurrency": 4,                  workflow runs at the same time
+        "output_dir": "//runchat_out",     where URL outputs are downloaded (optional)
+        "capture_input": "image_abc",      input fed by camera/frame captures (optional)
+        "width": 1920, "height": 1080, "quality": 90,
+        "jobs": [
+            {"name": "shot_a", "inputs": {"prompt_abc": "a castle"}, "files": {"image_abc": "//ref.png"}},
+            {"name": "cam", "camera": "Camera.001", "frames": "1-24:4", "inputs": {...}}
+        ]
+    }
+
+CSV manifest: one job per row with the columns name, runchat_id, camera, frame, frames;
+columns named input:<param_id> and file:<param_id> become inputs and files.
+Paths starting with // are relative to the .blend, other relative paths to the manifest.
+Settings that aren't per job can be passed on the command line.
+
+With --queue-dir it runs as one worker of a multi-process farm instead,
+claiming jobs from a file queue filled by scripts/runchat_farm.py.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+import bpy
+
+from . import api
+from . import preferences
+from . import utils
+from .operators.execution import collect_workflow_outputs
+from .utils import segmented_download
+from .utils import job_queue
+from .utils import workers
+from .utils.manifest import expand_jobs, load_manifest, resolve_path
+from .utils.cache_paths import atomic_write_bytes
+
+
+DEFAULT_CONCURRENCY = 3
+# Captures encoded or uploaded ahead of the running workflows, bounds memory on long frame ranges
+MAX_CAPTURES_AHEAD = 2
+WORKER_POLL_INTERVAL = 0.5
+
+
+def log(message):
+    print(f"[RunChat Headless] {message}", flush=True)
+
+
+def capture_job(spec, scene, width, height, quality):
+    """Capture the job's camera at its frame (main thread). Returns an encode Future."""
+    if spec['frame'] is not None:
+        scene.frame_set(spec['frame'])
+    
+    # Without a window there is no viewport to draw, so always render through a camera
+    camera = bpy.data.objects.get(spec['camera']) if spec['camera'] else scene.camera
+    if camera is None or camera.type != 'CAMERA':
+        raise ValueError(f"Camera not found: {spec['camera'] or 'scene camera'}")
+    
+    readback = utils.read_viewport_pixels(width, height, camera=camera)
+    if readback is None:
+        raise RuntimeError("Capture failed")
+    return utils.submit_encode(readback, quality)
+
+
+def download_outputs(outputs, output_dir, name):
+    """Save URL outputs as <name>_<output id>.<ext>; returns the written paths"""
+    paths = []
+    for output_id, value in outputs:
+        values = value if isinstance(value, list) else [value]
+        for item_index, item in enumerate(values):
+            if not (isinstance(item, str) and item.startswith('http')):
+                continue
+            ext = os.path.splitext(item.split('?', 1)[0])[1].lower() or '.bin'
+            suffix = f"_{item_index}" if len(values) > 1 else ""
+            path = os.path.join(output_dir, f"{name}_{bpy.path.clean_name(output_id)}{suffix}{ext}")
+            segmented_download.download(item, path, timeout=300)
+            paths.append(path)
+    return paths
+
+
+def new_entry(spec, timings):
+    """Report entry for a job, failed until the run succeeds"""
+    return {
+        'name': spec['name'],
+        'runchat_id': spec['runchat_id'],
+        'camera': spec['camera'],
+        'frame': spec['frame'],
+        'status': 'failed',
+        'error': None,
+        'outputs': {},
+        'files': [],
+        'timings': timings,
+    }
+
+
+def run_job(spec, api_key, file_uploads, encode_future, output_dir, timings):
+    """Worker: wait for uploads, run the workflow and download its outputs. Returns a report entry."""
+    entry = new_entry(spec, timings)
+    try:
+        inputs = dict(spec['inputs'])
+        start = time.perf_counter()
+        for key, path in spec['files'].items():
+            uploaded_url = file_uploads[path].result()
+            if not uploaded_url:
+                raise RuntimeError(f"Upload failed for {path}")
+            inputs[key] = uploaded_url
+        
+        if encode_future is not None:
+            encoded = encode_future.result()
+            if not encoded:
+                raise RuntimeError("Capture could not be encoded")
+            uploaded_url = api.RunChatAPI.upload_bytes(encoded['data'], f"{spec['name']}.jpg", api_key, encoded['digest'])
+            if not uploaded_url:
+                raise RuntimeError("Capture upload failed")
+            inputs[spec['capture_input']] = uploaded_url
+        timings['upload'] = round(time.perf_counter() - start, 3)
+        
+        start = time.perf_counter()
+        result = api.RunChatAPI.run_workflow_polled(spec['runchat_id'], api_key, inputs)
+        timings['run'] = round(time.perf_counter() - start, 3)
+        
+        if not result:
+            raise RuntimeError("No result returned")
+        if isinstance(result, dict) and result.get('error'):
+            raise RuntimeError(f"API Error ({result.get('status_code', 0)}): {result.get('message', 'Unknown error occurred')}")
+        
+        outputs = collect_workflow_outputs(result)
+        entry['outputs'] = {output_id: value for output_id, value in outputs}
+        
+        if output_dir:
+            start = time.perf_counter()
+            entry['files'] = download_outputs(outputs, output_dir, spec['name'])
+            timings['download'] = round(time.perf_counter() - start, 3)
+        
+        entry['status'] = 'ok'
+    except Exception as e:
+        entry['error'] = str(e)
+    return entry
+
+
+def submit_job(spec, scene, api_key, file_uploads, output_dir, capture_size):
+    """
+    Start one job: capture on this thread if it needs a camera view, upload files not yet
+    uploaded, then run it on the batch pool. Returns a Future of the report entry.
+    """
+    timings = {}
+    encode_future = None
+    try:
+        # Every distinct file is uploaded once, however many jobs use it
+        for path in spec['files'].values():
+            if path not in file_uploads:
+                if not os.path.exists(path):
+                    raise ValueError(f"File not found: {path}")
+                file_uploads[path] = workers.submit('upload', api.RunChatAPI.upload_file, path, api_key, os.path.basename(path))
+        
+        if spec['camera'] or spec['frame'] is not None:
+            if not spec['capture_input']:
+                raise ValueError("Job captures a camera but no capture_input is set")
+            start = time.perf_counter()
+            encode_future = capture_job(spec, scene, *capture_size)
+            timings['capture'] = round(time.perf_counter() - start, 3)
+    except Exception as e:
+        entry = new_entry(spec, timings)
+        entry['error'] = str(e)
+        failed = Future()
+        failed.set_result(entry)
+        return failed
+    
+    return workers.submit('batch', run_job, spec, api_key, file_uploads, encode_future, output_dir, timings)
+
+
+def resolve_api_key(manifest, api_key=None):
+    """Command line, then manifest, then RUNCHAT_API_KEY, then the addon preferences"""
+    return api_key or manifest.get('api_key') or os.environ.get('RUNCHAT_API_KEY') or preferences.get_api_key()
+
+
+def run_manifest(manifest_path, report_path=None, concurrency=None, output_dir=None, api_key=None):
+    """Run every job of a manifest and write the report. Returns the report dict."""
+    manifest = load_manifest(manifest_path)
+    specs = expand_jobs(manifest)
+    scene = bpy.context.scene
+    
+    api_key = resolve_api_key(manifest, api_key)
+    if not api_key:
+        raise ValueError("No API key: pass --api-key, set RUNCHAT_API_KEY or configure the addon preferences")
+    
+    # Same rule as the farm: // against the .blend, other relative paths against the manifest
+    blend_dir = os.path.dirname(bpy.data.filepath) or os.getcwd()
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    
+    concurrency = int(concurrency or manifest.get('concurrency') or DEFAULT_CONCURRENCY)
+    output_dir = output_dir or manifest.get('output_dir')
+    if output_dir:
+        output_dir = resolve_path(output_dir, blend_dir, manifest_dir)
+        os.makedirs(output_dir, exist_ok=True)
+    report_path = report_path or os.path.splitext(manifest_path)[0] + ".report.json"
+    
+    width = int(manifest.get('width') or 1920)
+    height = int(manifest.get('height') or 1080)
+    quality = int(manifest.get('quality') or 90)
+    
+    # Fail fast on manifest mistakes rather than part way through a long run
+    for spec in specs:
+        spec['files'] = {key: resolve_path(path, blend_dir, manifest_dir) for key, path in spec['files'].items()}
+        if (spec['camera'] or spec['frame'] is not None) and not spec['capture_input']:
+            raise ValueError(f"Job {spec['name']} captures a camera but no capture_input is set")
+        for path in spec['files'].values():
+            if not os.path.exists(path):
+                raise ValueError(f"File not found: {path}")
+    
+    log(f"{len(specs)} jobs from {manifest_path}, {concurrency} at a time")
+    workers.configure('batch', concurrency)
+    started_at = time.time()
+    
+    file_uploads = {}
+    entries = [None] * len(specs)
+    pending = {}
+    original_frame = scene.frame_current
+    try:
+        for index, spec in enumerate(specs):
+            # Captures run on this thread; keep only a few ahead of the workflows
+            while len(pending) >= concurrency + MAX_CAPTURES_AHEAD:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished = pending.pop(future)
+                    entries[finished] = future.result()
+                    log(f"{entries[finished]['name']}: {entries[finished]['status']}")
+            
+            future = submit_job(spec, scene, api_key, file_uploads, output_dir, (width, height, quality))
+            pending[future] = index
+        
+        for future in list(pending):
+            finished = pending.pop(future)
+            entries[finished] = future.result()
+            log(f"{entries[finished]['name']}: {entries[finished]['status']}")
+    finally:
+        scene.frame_set(original_frame)
+    
+    finished_at = time.time()
+    ok = sum(1 for entry in entries if entry['status'] == 'ok')
+    report = {
+        'manifest': os.path.abspath(manifest_path),
+        'blend_file': bpy.data.filepath,
+        'concurrency': concurrency,
+        'started_at': started_at,
+        'finished_at': finished_at,
+        'total_seconds': round(finished_at - started_at, 3),
+        'summary': {'total': len(entries), 'ok': ok, 'failed': len(entries) - ok},
+        'jobs': entries,
+    }
+    atomic_write_bytes(os.path.abspath(report_path), json.dumps(report, indent=2).encode('utf-8'))
+    log(f"Finished {ok}/{len(entries)} jobs in {report['total_seconds']:.1f}s, report: {report_path}")
+    return report
+
+
+def run_worker(queue_dir, worker_id, concurrency=None, api_key=None):
+    """
+    Farm worker: claim jobs from a file queue (see utils/job_queue.py) and run them until the
+    coordinator asks workers to stop and the queue is empty. Returns the number of jobs run.
+    """
+    settings = job_queue.read_settings(queue_dir)
+    scene = bpy.context.scene
+    
+    api_key = resolve_api_key(settings, api_key)
+    if not api_key:
+        raise ValueError("No API key: pass --api-key, set RUNCHAT_API_KEY or configure the addon preferences")
+    
+    concurrency = int(concurrency or settings.get('concurrency') or DEFAULT_CONCURRENCY)
+    output_dir = settings.get('output_dir')
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    capture_size = (int(settings.get('width') or 1920), int(settings.get('height') or 1080), int(settings.get('quality') or 90))
+    
+    log(f"Worker {worker_id} on {bpy.data.filepath or 'unsaved file'}, {concurrency} at a time")
+    workers.configure('batch', concurrency)
+    
+    file_uploads = {}
+    pending = {}
+    completed = 0
+    while True:
+        for future in [future for future in pending if future.done()]:
+            claimed_path, payload = pending.pop(future)
+            entry = future.result()
+            job_queue.complete(queue_dir, claimed_path, payload, entry, worker_id)
+            completed += 1
+            log(f"{entry['name']}: {entry['status']} (attempt {payload['attempt']})")
+        
+        # Only claim what can start soon, so idle workers can take the rest
+        if len(pending) < concurrency + MAX_CAPTURES_AHEAD:
+            claimed = job_queue.claim(queue_dir, worker_id)
+            if claimed is not None:
+                claimed_path, payload = claimed
+                future = submit_job(payload['spec'], scene, api_key, file_uploads, output_dir, capture_size)
+                pending[future] = (claimed_path, payload)
+                continue
+            if not pending and job_queue.stop_requested(queue_dir):
+                break
+        
+        if pending:
+            wait(pending, timeout=WORKER_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+        else:
+            time.sleep(WORKER_POLL_INTERVAL)
+    
+    log(f"Worker {worker_id} finished after {completed} jobs")
+    return completed
+
+
+def main(argv=None):
+    """Command line entry point; arguments come after Blender's own, following --"""
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    
+    parser = argparse.ArgumentParser(prog="runchat-headless", description="Run a Runchat job manifest without the UI")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--manifest', help="JSON or CSV job manifest")
+    mode.add_argument('--queue-dir', help="Run as a farm worker on this job queue (see scripts/runchat_farm.py)")
+    parser.add_argument('--worker-id', default=f"worker{os.getpid()}", help="Name of this worker in the job queue")
+    parser.add_argument('--report', help="Report path (default: <manifest>.report.json)")
+    parser.add_argument('--concurrency', type=int, help="Workflow runs at the same time")
+    parser.add_argument('--output-dir', help="Directory for downloaded outputs")
+    parser.add_argument('--api-key', help="Runchat API key")
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.queue_dir:
+            run_worker(args.queue_dir, args.worker_id, args.concurrency, args.api_key)
+            sys.exit(0)
+        report = run_manifest(args.manifest, args.report, args.concurrency, args.output_dir, args.api_key)
+    except (OSError, ValueError) as e:
+        log(f"Error: {e}")
+        sys.exit(2)
+    sys.exit(1 if report['summary']['failed'] else 0)
@@ -7,6 +7,11 @@ from . import media
 from . import upload  
 from . import utils
 from . import debug
+from . import live
+from . import batch
+from . import jobs
+from . import sweep
+from . import imports
 
 # Collect all classes from submodules
 classes = []
@@ -17,6 +22,10 @@ classes.extend(media.classes)
 classes.extend(upload.classes)
 classes.extend(utils.classes)
 classes.extend(debug.classes)
+classes.extend(live.classes)
+classes.extend(batch.classes)
+classes.extend(jobs.classes)
+classes.extend(sweep.classes)
 
 def register():
     """Register all operator classes"""
@@ -24,7 +33,19 @@ def register():
     
     # Execution operators
     bpy.utils.register_class(execution.RUNCHAT_OT_execute)
-
+    bpy.utils.register_class(execution.RUNCHAT_OT_cancel_execution)
+    bpy.utils.register_class(live.RUNCHAT_OT_toggle_live_mode)
+    bpy.utils.register_class(batch.RUNCHAT_OT_batch_cameras)
+    bpy.utils.register_class(batch.RUNCHAT_OT_batch_frames)
+    bpy.utils.register_class(batch.RUNCHAT_OT_view_batch_output)
+    bpy.utils.register_class(jobs.RUNCHAT_OT_queue_job)
+    bpy.utils.register_class(jobs.RUNCHAT_OT_cancel_job)
+    bpy.utils.register_class(jobs.RUNCHAT_OT_apply_job_outputs)
+    bpy.utils.register_class(jobs.RUNCHAT_OT_clear_finished_jobs)
+    jobs.register_handlers()
+    bpy.utils.register_class(sweep.RUNCHAT_OT_cancel_sweep)
+    bpy.utils.register_class(sweep.RUNCHAT_OT_view_sweep_grid)
+    bpy.utils.register_class(sweep.RUNCHAT_OT_view_sweep_output)
     
     # Schema operators
     bpy.utils.register_class(schema.RUNCHAT_OT_load_schema)
@@ -66,12 +87,27 @@ def register():
     bpy.utils.register_class(debug.RUNCHAT_OT_test_api_connection)
     bpy.utils.register_class(debug.RUNCHAT_OT_open_info_log)
     bpy.utils.register_class(debug.RUNCHAT_OT_clear_workflow)
+    bpy.utils.register_class(debug.RUNCHAT_OT_clear_upload_cache)
+    bpy.utils.register_class(debug.RUNCHAT_OT_clear_result_cache)
+    bpy.utils.register_class(debug.RUNCHAT_OT_purge_asset_cache)
+    bpy.utils.register_class(debug.RUNCHAT_OT_purge_output_images)
 
 def unregister():
     """Unregister all operator classes"""
     import bpy
     
+    # Stop live mode, any running workflow, the job scheduler, any sweep and pending imports before their operators go away
+    live.stop()
+    execution.cancel_active()
+    jobs.unregister_handlers()
+    sweep.stop_sweep()
+    imports.cancel_imports()
+    
     # Debug operators
+    bpy.utils.unregister_class(debug.RUNCHAT_OT_purge_output_images)
+    bpy.utils.unregister_class(debug.RUNCHAT_OT_purge_asset_cache)
+    bpy.utils.unregister_class(debug.RUNCHAT_OT_clear_result_cache)
+    bpy.utils.unregister_class(debug.RUNCHAT_OT_clear_upload_cache)
     bpy.utils.unregister_class(debug.RUNCHAT_OT_clear_workflow)
     bpy.utils.unregister_class(debug.RUNCHAT_OT_open_info_log)
     bpy.utils.unregister_class(debug.RUNCHAT_OT_test_api_connection)
@@ -113,5 +149,16 @@ def unregister():
     bpy.utils.unregister_class(schema.RUNCHAT_OT_load_schema)
     
     # Execution operators
-
+    bpy.utils.unregister_class(sweep.RUNCHAT_OT_view_sweep_output)
+    bpy.utils.unregister_class(sweep.RUNCHAT_OT_view_sweep_grid)
+    bpy.utils.unregister_class(sweep.RUNCHAT_OT_cancel_sweep)
+    bpy.utils.unregister_class(jobs.RUNCHAT_OT_clear_finished_jobs)
+    bpy.utils.unregister_class(jobs.RUNCHAT_OT_apply_job_outputs)
+    bpy.utils.unregister_class(jobs.RUNCHAT_OT_cancel_job)
+    bpy.utils.unregister_class(jobs.RUNCHAT_OT_queue_job)
+    bpy.utils.unregister_class(batch.RUNCHAT_OT_view_batch_output)
+    bpy.utils.unregister_class(batch.RUNCHAT_OT_batch_frames)
+    bpy.utils.unregister_class(batch.RUNCHAT_OT_batch_cameras)
+    bpy.utils.unregister_class(live.RUNCHAT_OT_toggle_live_mode)
+    bpy.utils.unregister_class(execution.RUNCHAT_OT_cancel_execution)
     bpy.utils.unregister_class(execution.RUNCHAT_OT_execute) 
\ No newline at end of file
@@ -0,0 +1,594 @@
+# operators/batch.py
+
+import bpy
+import json
+import os
+import time
+from bpy.types import Operator
+from bpy.props import IntProperty
+
+from .. import api
+from .. import preferences
+from .. import utils
+from ..utils import cancellation
+from ..utils import transport
+from ..utils import workers
+from ..utils.cache_paths import atomic_write_bytes
+from ..utils.upload_cache import get_upload_cache, hash_file
+from .execution import RUNCHAT_OT_execute, collect_workflow_outputs
+
+
+# Captures being encoded or uploaded at once; the next view renders while earlier ones upload and execute
+MAX_CAPTURES_AHEAD = 2
+BATCH_TICK = 0.05
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+FRAME_CHECKPOINT = "runchat_frames.json"
+
+# Set while a batch operator is running
+_batch_running = False
+
+
+def log_to_blender(message, level='INFO'):
+    print(f"[RunChat Batch] {message}")
+
+
+def is_batch_running():
+    """True while a camera or frame batch is in progress"""
+    return _batch_running
+
+
+def get_batch_cameras(context, scope):
+    """Camera objects for a batch run, in name order"""
+    objects = context.selected_objects if scope == 'SELECTED' else context.scene.objects
+    return sorted((obj for obj in objects if obj.type == 'CAMERA'), key=lambda obj: obj.name)
+
+
+def get_viewport_input_keys(runchat_props):
+    """Param IDs of image inputs fed by the viewport capture"""
+    return [
+        input_prop.param_id for input_prop in runchat_props.inputs
+        if input_prop.data_type.lower() == "image" and input_prop.use_viewport_capture and not input_prop.file_path
+    ]
+
+
+def run_batch_workflow(runchat_id, api_key, inputs, shared_uploads):
+    """Worker: wait for inputs shared by every job, then run the workflow once"""
+    for key, future in shared_uploads.items():
+        uploaded_url = future.result()
+        if not uploaded_url:
+            raise RuntimeError(f"Upload failed for input {key}")
+        inputs[key] = uploaded_url
+    
+    # No instance ID: parallel runs must not share workflow state
+    return api.RunChatAPI.run_workflow_polled(runchat_id, api_key, inputs)
+
+
+def find_image_url(result):
+    """First image URL among a workflow result's outputs, or None"""
+    for output_id, output_value in collect_workflow_outputs(result):
+        values = output_value if isinstance(output_value, list) else [output_value]
+        for value in values:
+            if isinstance(value, str) and value.startswith('http'):
+                if any(ext in value.lower() for ext in IMAGE_EXTENSIONS):
+                    return value
+    return None
+
+
+def run_frame_workflow(runchat_id, api_key, inputs, shared_uploads, output_base):
+    """Worker: run the workflow for one frame and save its image output next to output_base"""
+    result = run_batch_workflow(runchat_id, api_key, inputs, shared_uploads)
+    if not result or (isinstance(result, dict) and result.get('error')):
+        return {'result': result, 'path': None}
+    
+    image_url = find_image_url(result)
+    if not image_url:
+        return {'result': result, 'path': None}
+    
+    ext = os.path.splitext(image_url.split('?', 1)[0])[1].lower()
+    path = output_base + (ext if ext in IMAGE_EXTENSIONS else '.png')
+    
+    transport.download_to_file(image_url, path, timeout=120)
+    return {'result': result, 'path': path}
+
+
+class BatchPipelineMixin:
+    """
+    Runs the workflow once per captured view from a modal operator.
+    Each job moves queued -> encode -> upload -> execute -> done (or failed). Views are captured on
+    the main thread, one per tick, while earlier jobs encode, upload and execute on the worker pools.
+    Subclasses implement capture_job, submit_run, apply_job_result and set_job_status.
+    """
+    _timer = None
+    
+    def prepare_batch(self, context):
+        """Validate the workflow and resolve the inputs shared by every job. Returns False on error."""
+        runchat_props = context.scene.runchat_properties
+        
+        if _batch_running:
+            self.report({'WARNING'}, "A batch is already running")
+            return False
+        
+        if not runchat_props.schema_loaded:
+            self.report({'ERROR'}, "Please load schema first")
+            return False
+        
+        self._api_key = preferences.get_api_key()
+        if not self._api_key:
+            self.report({'ERROR'}, "Please set your RunChat API key in addon preferences")
+            return False
+        
+        self._viewport_keys = get_viewport_input_keys(runchat_props)
+        if not self._viewport_keys:
+            self.report({'ERROR'}, "Batch mode needs an image input set to viewport capture")
+            return False
+        
+        self._runchat_id = runchat_props.runchat_id
+        # Every request the batch makes runs with this token so cancel can abort it
+        self._token = cancellation.CancelToken(self.bl_label)
+        self._base_inputs = {}
+        self._shared_uploads = {}
+        # Content digests of the shared upload sources, so a checkpoint notices an edited file
+        self._shared_digests = {}
+        missing_required = []
+        upload_cache = get_upload_cache()
+        
+        for input_prop in runchat_props.inputs:
+            key = input_prop.param_id
+            if key in self._viewport_keys:
+                continue
+            
+            # Local files are uploaded once for the whole batch
+            if RUNCHAT_OT_execute.needs_upload(input_prop, upload_cache):
+                file_path = bpy.path.abspath(input_prop.file_path)
+                if not os.path.exists(file_path):
+                    self.report({'ERROR'}, f"File not found for input '{input_prop.name}': {file_path}")
+                    return False
+                self._shared_digests[key] = hash_file(file_path)
+                self._shared_uploads[key] = self.submit(
+                    'upload', api.RunChatAPI.upload_file, file_path, self._api_key, os.path.basename(file_path)
+                )
+                continue
+            
+            value = input_prop.uploaded_url or input_prop.text_value
+            if value:
+                self._base_inputs[key] = value
+            elif input_prop.required:
+                missing_required.append(input_prop.name)
+        
+        if missing_required:
+            self.report({'ERROR'}, f"Missing required inputs: {', '.join(missing_required)}")
+            return False
+        return True
+    
+    def submit(self, pool, fn, *args):
+        """Run fn on a worker pool with the batch's cancel token"""
+        return workers.submit(pool, cancellation.bind(self._token, fn), *args)
+    
+    def start_batch(self, context, jobs):
+        """Start the modal pipeline over jobs (dicts with at least a 'label')"""
+        global _batch_running
+        runchat_props = context.scene.runchat_properties
+        
+        for job in jobs:
+            job['stage'] = 'queued'
+            job['future'] = None
+        self._jobs = jobs
+        self._start_time = time.time()
+        
+        # Bounded in-flight window: enough to keep every workflow slot busy plus the captures ahead of them
+        workers.configure('batch', runchat_props.batch_max_parallel)
+        self._max_in_flight = runchat_props.batch_max_parallel + MAX_CAPTURES_AHEAD
+        
+        _batch_running = True
+        self.update_status(runchat_props)
+        log_to_blender(f"{self.bl_label}: {len(jobs)} jobs, {runchat_props.batch_max_parallel} parallel runs")
+        
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(BATCH_TICK, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+    
+    def execute(self, context):
+        self.report({'ERROR'}, "Batch runs need an open Blender window")
+        return {'CANCELLED'}
+    
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.cancel_batch(context)
+            self.report({'WARNING'}, "Batch cancelled")
+            return {'CANCELLED'}
+        
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        
+        runchat_props = context.scene.runchat_properties
+        self.advance_jobs(context)
+        self.start_next_capture(context, runchat_props)
+        self.update_status(runchat_props)
+        
+        for area in context.screen.areas:
+            if area.type == 'PROPERTIES':
+                area.tag_redraw()
+        
+        if all(job['stage'] in ('done', 'failed') for job in self._jobs):
+            self.finish(context)
+            failed = sum(1 for job in self._jobs if job['stage'] == 'failed')
+            if failed:
+                self.report({'WARNING'}, f"Batch finished: {failed} of {len(self._jobs)} failed")
+            else:
+                self.report({'INFO'}, f"Batch finished: {len(self._jobs)} completed")
+            return {'FINISHED'}
+        
+        return {'PASS_THROUGH'}
+    
+    def start_next_capture(self, context, runchat_props):
+        """Capture the next job on the main thread if the in-flight window has room"""
+        in_flight = [job for job in self._jobs if job['stage'] in ('encode', 'upload', 'execute')]
+        if len(in_flight) >= self._max_in_flight:
+            return
+        if sum(1 for job in in_flight if job['stage'] != 'execute') >= MAX_CAPTURES_AHEAD:
+            return
+        
+        job = next((job for job in self._jobs if job['stage'] == 'queued'), None)
+        if job is None:
+            return
+        
+        self.set_job_status(context, job, "Capturing...")
+        readback = self.capture_job(context, job)
+        if readback is None:
+            self.fail_job(context, job, "Capture failed")
+            return
+        
+        job['future'] = utils.submit_encode(readback, runchat_props.viewport_quality)
+        job['stage'] = 'encode'
+        self.set_job_status(context, job, "Encoding...")
+    
+    def advance_jobs(self, context):
+        """Move every job whose current stage finished on to the next one"""
+        for job in self._jobs:
+            future = job['future']
+            if future is None or not future.done():
+                continue
+            job['future'] = None
+            
+            try:
+                result = future.result()
+            except Exception as e:
+                self.fail_job(context, job, f"{job['stage'].capitalize()} failed: {e}")
+                continue
+            
+            if job['stage'] == 'encode':
+                if not result:
+                    self.fail_job(context, job, "Encoding failed")
+                    continue
+                filename = f"batch_{bpy.path.clean_name(job['label'])}.jpg"
+                job['future'] = self.submit(
+                    'upload', api.RunChatAPI.upload_bytes, result['data'], filename, self._api_key, result['digest']
+                )
+                job['stage'] = 'upload'
+                self.set_job_status(context, job, "Uploading...")
+            
+            elif job['stage'] == 'upload':
+                if not result:
+                    self.fail_job(context, job, "Upload failed")
+                    continue
+                job['uploaded_url'] = result
+                inputs = dict(self._base_inputs)
+                for key in self._viewport_keys:
+                    inputs[key] = result
+                job['future'] = self.submit_run(job, inputs)
+                job['stage'] = 'execute'
+                self.set_job_status(context, job, "Running workflow...")
+            
+            elif job['stage'] == 'execute':
+                self.apply_job_result(context, job, result)
+    
+    def check_result_error(self, context, job, result):
+        """Fail the job for an empty or error response. Returns True if the result is usable."""
+        if not result:
+            self.fail_job(context, job, "No result returned")
+            return False
+        
+        if isinstance(result, dict) and result.get('error'):
+            message = result.get('message', 'Unknown error occurred')
+            if result.get('is_credit_error'):
+                runchat_props = context.scene.runchat_properties
+                runchat_props.has_credit_error = True
+                runchat_props.credit_error_message = api.format_credit_error(message)
+            self.fail_job(context, job, f"API Error ({result.get('status_code', 0)}): {message}")
+            return False
+        return True
+    
+    def complete_job(self, context, job):
+        job['stage'] = 'done'
+        self.set_job_status(context, job, "Complete")
+        log_to_blender(f"{job['label']}: complete")
+    
+    def fail_job(self, context, job, message):
+        job['stage'] = 'failed'
+        self.set_job_status(context, job, message)
+        log_to_blender(f"{job['label']}: {message}", 'ERROR')
+    
+    def update_status(self, runchat_props):
+        done = sum(1 for job in self._jobs if job['stage'] in ('done', 'failed'))
+        running = sum(1 for job in self._jobs if job['stage'] == 'execute')
+        runchat_props.batch_status = f"Batch: {done}/{len(self._jobs)} finished, {running} running"
+    
+    def cancel_batch(self, context):
+        """Drop queued work and abort the requests already in flight"""
+        self._token.cancel()
+        for future in self._shared_uploads.values():
+            future.cancel()
+        for job in self._jobs:
+            if job['stage'] in ('done', 'failed'):
+                continue
+            if job['future'] is not None:
+                job['future'].cancel()
+                job['future'] = None
+            job['stage'] = 'failed'
+            self.set_job_status(context, job, "Cancelled")
+        self.finish(context)
+    
+    def finish(self, context):
+        global _batch_running
+        _batch_running = False
+        
+        if self._timer is not None:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        
+        runchat_props = context.scene.runchat_properties
+        self.update_status(runchat_props)
+        runchat_props.batch_status += f" in {time.time() - self._start_time:.1f}s"
+        log_to_blender(runchat_props.batch_status)
+        self.on_batch_finished(context)
+    
+    def on_batch_finished(self, context):
+        pass
+
+
+class RUNCHAT_OT_batch_cameras(BatchPipelineMixin, Operator):
+    """Capture the view through each camera and run the workflow for every one of them"""
+    bl_idname = "runchat.batch_cameras"
+    bl_label = "Batch Run Cameras"
+    
+    def invoke(self, context, event):
+        runchat_props = context.scene.runchat_properties
+        
+        cameras = get_batch_cameras(context, runchat_props.batch_camera_scope)
+        if not cameras:
+            self.report({'ERROR'}, "No cameras to capture")
+            return {'CANCELLED'}
+        
+        if not self.prepare_batch(context):
+            return {'CANCELLED'}
+        
+        # One result entry per camera, with the workflow's outputs as slots
+        runchat_props.batch_results.clear()
+        for camera in cameras:
+            item = runchat_props.batch_results.add()
+            item.camera_name = camera.name
+            item.status = "Queued"
+            for output_prop in runchat_props.outputs:
+                slot = item.outputs.add()
+                slot.param_id = output_prop.param_id
+                slot.node_id = output_prop.node_id
+                slot.name = output_prop.name
+                slot.data_type = output_prop.data_type
+        
+        jobs = [{'label': camera.name, 'index': index} for index, camera in enumerate(cameras)]
+        return self.start_batch(context, jobs)
+    
+    def capture_job(self, context, job):
+        runchat_props = context.scene.runchat_properties
+        camera = bpy.data.objects.get(job['label'])
+        if camera is None:
+            return None
+        return utils.read_viewport_pixels(runchat_props.viewport_width, runchat_props.viewport_height, camera=camera)
+    
+    def submit_run(self, job, inputs):
+        return self.submit('batch', run_batch_workflow, self._runchat_id, self._api_key, inputs, self._shared_uploads)
+    
+    def apply_job_result(self, context, job, result):
+        """Store one camera's workflow outputs in its result entry"""
+        if not self.check_result_error(context, job, result):
+            return
+        
+        runchat_props = context.scene.runchat_properties
+        item = runchat_props.batch_results[job['index']]
+        item.uploaded_url = job['uploaded_url']
+        for output_id, output_value in collect_workflow_outputs(result):
+            for slot in item.outputs:
+                if slot.param_id == output_id:
+                    RUNCHAT_OT_execute.process_output_static(slot, output_value, output_id, runchat_props)
+                    break
+        
+        self.complete_job(context, job)
+    
+    def set_job_status(self, context, job, message):
+        results = context.scene.runchat_properties.batch_results
+        if job['index'] < len(results):
+            results[job['index']].status = message
+
+
+class RUNCHAT_OT_batch_frames(BatchPipelineMixin, Operator):
+    """Run the workflow for every frame of the scene's frame range and save the results as an image sequence"""
+    bl_idname = "runchat.batch_frames"
+    bl_label = "Run Frame Range"
+    
+    def invoke(self, context, event):
+        scene = context.scene
+        runchat_props = scene.runchat_properties
+        
+        if not self.prepare_batch(context):
+            return {'CANCELLED'}
+        
+        self._output_dir = bpy.path.abspath(runchat_props.frame_output_path)
+        try:
+            os.makedirs(self._output_dir, exist_ok=True)
+        except OSError as e:
+            self.report({'ERROR'}, f"Cannot create output directory: {e}")
+            return {'CANCELLED'}
+        
+        self._frames = list(range(scene.frame_start, scene.frame_end + 1, scene.frame_step))
+        self._checkpoint_path = os.path.join(self._output_dir, FRAME_CHECKPOINT)
+        self._completed = self.load_checkpoint() if runchat_props.frame_resume else {}
+        
+        remaining = [frame for frame in self._frames if frame not in self._completed]
+        if not remaining:
+            self.report({'INFO'}, "All frames already completed (see checkpoint in the output directory)")
+            self.add_sequence_strip(context)
+            return {'FINISHED'}
+        
+        if self._completed:
+            log_to_blender(f"Resuming: {len(self._completed)} of {len(self._frames)} frames already completed")
+        
+        self._original_frame = scene.frame_current
+        self.save_checkpoint()
+        
+        jobs = [{'label': f"Frame {frame}", 'frame': frame} for frame in remaining]
+        return self.start_batch(context, jobs)
+    
+    def checkpoint_key(self):
+        """Identifies the run a checkpoint belongs to"""
+        return {
+            'runchat_id': self._runchat_id,
+            'frames': self._frames,
+            'inputs': [[key, value] for key, value in sorted(self._base_inputs.items())],
+            'uploads': [[key, digest] for key, digest in sorted(self._shared_digests.items())],
+        }
+    
+    def load_checkpoint(self):
+        """Completed frames from a previous run of the same workflow, inputs and range"""
+        try:
+            with open(self._checkpoint_path, 'r') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        
+        key = self.checkpoint_key()
+        if any(checkpoint.get(name) != value for name, value in key.items()):
+            log_to_blender("Checkpoint belongs to a different run, starting over")
+            return {}
+        
+        # Only trust frames whose files are still there
+        return {
+            int(frame): path for frame, path in checkpoint.get('completed', {}).items()
+            if os.path.exists(path)
+        }
+    
+    def save_checkpoint(self):
+        checkpoint = self.checkpoint_key()
+        checkpoint['completed'] = {str(frame): path for frame, path in sorted(self._completed.items())}
+        try:
+            atomic_write_bytes(self._checkpoint_path, json.dumps(checkpoint, indent=2).encode('utf-8'))
+        except OSError as e:
+            log_to_blender(f"Could not write checkpoint: {e}", 'WARNING')
+    
+    def capture_job(self, context, job):
+        scene = context.scene
+        runchat_props = scene.runchat_properties
+        scene.frame_set(job['frame'])
+        return utils.read_viewport_pixels(runchat_props.viewport_width, runchat_props.viewport_height)
+    
+    def submit_run(self, job, inputs):
+        output_base = os.path.join(self._output_dir, f"frame_{job['frame']:04d}")
+        return self.submit('batch', run_frame_workflow, self._runchat_id, self._api_key,
+                           inputs, self._shared_uploads, output_base)
+    
+    def apply_job_result(self, context, job, outcome):
+        if not self.check_result_error(context, job, outcome['result']):
+            return
+        if not outcome['path']:
+            self.fail_job(context, job, "Workflow returned no image")
+            return
+        
+        # Frames finish out of order; the checkpoint and sequence are keyed by frame number
+        self._completed[job['frame']] = outcome['path']
+        self.save_checkpoint()
+        self.complete_job(context, job)
+    
+    def set_job_status(self, context, job, message):
+        pass
+    
+    def update_status(self, runchat_props):
+        in_order = 0
+        for frame in self._frames:
+            if frame not in self._completed:
+                break
+            in_order += 1
+        running = sum(1 for job in self._jobs if job['stage'] == 'execute')
+        failed = sum(1 for job in self._jobs if job['stage'] == 'failed')
+        runchat_props.batch_status = (
+            f"Frames: {len(self._completed)}/{len(self._frames)} done ({in_order} in sequence), "
+            f"{running} running, {failed} failed"
+        )
+    
+    def on_batch_finished(self, context):
+        context.scene.frame_set(self._original_frame)
+        self.add_sequence_strip(context)
+    
+    def add_sequence_strip(self, context):
+        """Add the finished frames to the sequencer as one image strip (leading contiguous frames only)"""
+        scene = context.scene
+        if not scene.runchat_properties.frame_add_strip:
+            return
+        
+        paths = []
+        for frame in self._frames:
+            if frame not in self._completed:
+                break
+            paths.append(self._completed[frame])
+        if not paths:
+            return
+        
+        if len(paths) < len(self._frames):
+            self.report({'WARNING'}, f"Sequence strip stops at the first missing frame ({len(paths)} of {len(self._frames)})")
+        
+        try:
+            if not scene.sequence_editor:
+                scene.sequence_editor_create()
+            sequences = scene.sequence_editor.sequences
+            channel = max((strip.channel for strip in sequences), default=0) + 1
+            strip = sequences.new_image(
+                name="Runchat Frames", filepath=paths[0], channel=channel, frame_start=self._frames[0]
+            )
+            for path in paths[1:]:
+                strip.elements.append(os.path.basename(path))
+            log_to_blender(f"Added image strip with {len(paths)} frames on channel {channel}")
+        except Exception as e:
+            self.report({'WARNING'}, f"Could not add sequencer strip: {e}")
+
+
+class RUNCHAT_OT_view_batch_output(Operator):
+    """Open a batch output image in the Image Editor"""
+    bl_idname = "runchat.view_batch_output"
+    bl_label = "View Batch Output"
+    
+    result_index: IntProperty()
+    output_index: IntProperty()
+    
+    def execute(self, context):
+        runchat_props = context.scene.runchat_properties
+        if self.result_index >= len(runchat_props.batch_results):
+            self.report({'ERROR'}, f"Invalid batch result index: {self.result_index}")
+            return {'CANCELLED'}
+        
+        item = runchat_props.batch_results[self.result_index]
+        if self.output_index >= len(item.outputs) or not item.outputs[self.output_index].value.startswith('http'):
+            self.report({'ERROR'}, "Batch output has no image")
+            return {'CANCELLED'}
+        
+        output_prop = item.outputs[self.output_index]
+        # Downloaded and decoded in the background; the image opens once it is ready
+        utils.view_image_from_url(output_prop.value, f"{item.camera_name}_{output_prop.name}")
+        self.report({'INFO'}, "Loading batch output image...")
+        return {'FINISHED'}
+
+
+classes = [
+    RUNCHAT_OT_batch_cameras,
+    RUNCHAT_OT_batch_frames,
+    RUNCHAT_OT_view_batch_output,
+]
@@ -1,92 +1,263 @@
 # operators/capture.py
 
 import bpy
+from concurrent.futures import Future
 from bpy.types import Operator
 from bpy.props import IntProperty
 
 from .. import api
 from .. import preferences
 from .. import utils
+from ..utils import workers
+from ..utils import capture_cache
+from ..utils import datablocks
 
 
-class RUNCHAT_OT_preview_viewport(Operator):
+def read_viewport_for_upload(context):
+    """Read back the viewport at the configured upload size (main thread only)"""
+    try:
+        runchat_props = context.scene.runchat_properties
+        
+        print(f"Capturing viewport at {runchat_props.viewport_width}x{runchat_props.viewport_height}")
+        
+        # Render settings are left untouched on the offscreen path so the capture cache stays valid
+        readback = utils.read_viewport_pixels(runchat_props.viewport_width, runchat_props.viewport_height)
+        
+        if readback is None:
+            print("Failed to capture viewport - no data returned")
+        return readback
+    
+    except Exception as e:
+        print(f"Error capturing viewport: {e}")
+        import traceback
+        print(traceback.format_exc())
+        return None
+
+
+def get_viewport_capture_key(context):
+    """Capture cache key for the current viewport at the configured upload settings"""
+    runchat_props = context.scene.runchat_properties
+    return capture_cache.get_capture_key(
+        context, runchat_props.viewport_width, runchat_props.viewport_height, runchat_props.viewport_quality
+    )
+
+
+def capture_viewport_future(context):
+    """Read the viewport now and encode it on the worker pool. Returns a Future or None."""
+    # Reuse the encoded bytes if nothing changed since the last capture
+    key = get_viewport_capture_key(context)
+    cached = capture_cache.lookup_future(key)
+    if cached is not None:
+        print("Viewport unchanged - reusing cached capture")
+        return cached
+    
+    readback = read_viewport_for_upload(context)
+    if readback is None:
+        return None
+    
+    future = utils.submit_encode(readback, context.scene.runchat_properties.viewport_quality)
+    capture_cache.store_when_done(key, future)
+    return future
+
+
+def capture_viewport_for_upload(context):
+    """Capture the current viewport as JPEG bytes at the configured upload size (blocking)"""
+    key = get_viewport_capture_key(context)
+    cached = capture_cache.lookup(key)
+    if cached is not None:
+        print("Viewport unchanged - reusing cached capture")
+        return cached['data']
+    
+    readback = read_viewport_for_upload(context)
+    if readback is None:
+        return None
+    
+    encoded = utils.encode_readback(readback, context.scene.runchat_properties.viewport_quality)
+    if encoded:
+        capture_cache.store(key, encoded)
+        print(f"Viewport captured successfully (encoded in {encoded['seconds']:.2f}s)")
+        return encoded['data']
+    return None
+
+
+class FutureModalMixin:
+    """
+    Waits on background futures from a modal operator so the UI stays responsive.
+    Subclasses implement on_future_done(context, result) and return either another
+    Future to keep waiting on, or an operator result set to finish.
+    """
+    _future = None
+    _timer = None
+    
+    def await_future(self, context, future):
+        self._future = future
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.05, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self._future.cancel()
+            self._stop_timer(context)
+            self.on_future_cancelled(context)
+            return {'CANCELLED'}
+        
+        if event.type != 'TIMER' or not self._future.done():
+            return {'PASS_THROUGH'}
+        
+        try:
+            result = self._future.result()
+        except Exception as e:
+            print(f"Background task failed: {e}")
+            result = None
+        
+        outcome = self.on_future_done(context, result)
+        if isinstance(outcome, Future):
+            self._future = outcome
+            return {'PASS_THROUGH'}
+        
+        self._stop_timer(context)
+        return outcome
+    
+    def on_future_cancelled(self, context):
+        self.report({'WARNING'}, "Cancelled")
+    
+    def _stop_timer(self, context):
+        if self._timer is not None:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+
+
+class RUNCHAT_OT_preview_viewport(FutureModalMixin, Operator):
     """Preview viewport capture"""
     bl_idname = "runchat.preview_viewport"
     bl_label = "Preview Viewport"
     
     input_index: IntProperty()
     
+    def invoke(self, context, event):
+        if context.window is None:
+            return self.execute(context)
+        
+        future = capture_viewport_future(context)
+        if future is None:
+            self.report({'ERROR'}, "Failed to capture viewport")
+            return {'CANCELLED'}
+        
+        return self.await_future(context, future)
+    
+    def on_future_done(self, context, result):
+        if not result:
+            self.report({'ERROR'}, "Failed to capture viewport")
+            return {'CANCELLED'}
+        return self.show_preview(context, result['data'])
+    
     def execute(self, context):
         try:
-            scene = context.scene
-            runchat_props = scene.runchat_properties
-            
-            # Store original render settings
-            render = scene.render
-            original_resolution_x = render.resolution_x
-            original_resolution_y = render.resolution_y
-            original_percentage = render.resolution_percentage
-            
-            # Set custom viewport capture dimensions
-            render.resolution_x = runchat_props.viewport_width
-            render.resolution_y = runchat_props.viewport_height
-            render.resolution_percentage = 100
-            
-            print(f"Previewing viewport at {runchat_props.viewport_width}x{runchat_props.viewport_height}")
-            
-            # Capture viewport
-            image_data = utils.capture_viewport_image(quality=runchat_props.viewport_quality)
-            
-            # Restore original render settings
-            render.resolution_x = original_resolution_x
-            render.resolution_y = original_resolution_y
-            render.resolution_percentage = original_percentage
-            
-            if image_data:
-                # Load image into Blender for preview
-                image = utils.load_image_from_base64(image_data, "Viewport_Preview")
-                
-                if image:
-                    # Try to show in image editor
-                    for area in context.screen.areas:
-                        if area.type == 'IMAGE_EDITOR':
-                            area.spaces.active.image = image
-                            break
-                    
-                    self.report({'INFO'}, f"Viewport captured successfully at {runchat_props.viewport_width}x{runchat_props.viewport_height}")
-                else:
-                    self.report({'ERROR'}, "Failed to load viewport image")
-                    return {'CANCELLED'}
-            else:
+            image_data = capture_viewport_for_upload(context)
+            if not image_data:
                 self.report({'ERROR'}, "Failed to capture viewport")
                 return {'CANCELLED'}
-                
+            return self.show_preview(context, image_data)
+        
         except Exception as e:
             self.report({'ERROR'}, f"Error capturing viewport: {str(e)}")
             print(f"Preview viewport error: {e}")
             import traceback
             print(traceback.format_exc())
             return {'CANCELLED'}
+    
+    def show_preview(self, context, image_data):
+        """Load the encoded capture into Blender and show it in an Image Editor"""
+        runchat_props = context.scene.runchat_properties
+        image = utils.load_image_from_bytes(image_data, "Viewport_Preview")
         
+        if not image:
+            self.report({'ERROR'}, "Failed to load viewport image")
+            return {'CANCELLED'}
+        
+        # Try to show in image editor
+        if context.screen:
+            for area in context.screen.areas:
+                if area.type == 'IMAGE_EDITOR':
+                    area.spaces.active.image = image
+                    break
+        
+        self.report({'INFO'}, f"Viewport captured successfully at {runchat_props.viewport_width}x{runchat_props.viewport_height}")
         return {'FINISHED'}
 
 
-class RUNCHAT_OT_upload_viewport(Operator):
+class RUNCHAT_OT_upload_viewport(FutureModalMixin, Operator):
     """Capture viewport and upload to RunChat"""
     bl_idname = "runchat.upload_viewport"
     bl_label = "Upload Viewport"
     
     input_index: IntProperty()
     
-    def execute(self, context):
-        scene = context.scene
-        runchat_props = scene.runchat_properties
-        
+    def get_input(self, context):
+        runchat_props = context.scene.runchat_properties
         if self.input_index >= len(runchat_props.inputs):
+            return None
+        return runchat_props.inputs[self.input_index]
+    
+    def invoke(self, context, event):
+        if context.window is None:
+            return self.execute(context)
+        
+        input_prop = self.get_input(context)
+        if input_prop is None:
             self.report({'ERROR'}, "Invalid input index")
             return {'CANCELLED'}
         
-        input_prop = runchat_props.inputs[self.input_index]
+        self._api_key = preferences.get_api_key()
+        if not self._api_key:
+            self.report({'ERROR'}, "Please set your RunChat API key in addon preferences")
+            return {'CANCELLED'}
+        
+        # Pixel readback happens here on the main thread, encoding on the worker pool
+        input_prop.upload_status = "Capturing viewport..."
+        future = capture_viewport_future(context)
+        if future is None:
+            input_prop.upload_status = "Failed to capture viewport"
+            self.report({'ERROR'}, "Failed to capture viewport")
+            return {'CANCELLED'}
+        
+        input_prop.upload_status = "Encoding capture..."
+        self._stage = 'encode'
+        return self.await_future(context, future)
+    
+    def on_future_done(self, context, result):
+        input_prop = self.get_input(context)
+        if input_prop is None:
+            return {'CANCELLED'}
+        
+        if self._stage == 'encode':
+            if not result:
+                input_prop.upload_status = "Failed to capture viewport"
+                self.report({'ERROR'}, "Failed to capture viewport")
+                return {'CANCELLED'}
+            
+            # Upload to RunChat in the background too
+            input_prop.upload_status = "Uploading to RunChat..."
+            filename = f"viewport_capture_{input_prop.param_id}.jpg"
+            self._stage = 'upload'
+            return workers.submit('upload', api.RunChatAPI.upload_bytes,
+                                  result['data'], filename, self._api_key, result['digest'])
+        
+        return self.apply_uploaded_url(input_prop, result)
+    
+    def on_future_cancelled(self, context):
+        input_prop = self.get_input(context)
+        if input_prop is not None:
+            input_prop.upload_status = "Upload cancelled"
+        self.report({'WARNING'}, "Viewport upload cancelled")
+    
+    def execute(self, context):
+        input_prop = self.get_input(context)
+        if input_prop is None:
+            self.report({'ERROR'}, "Invalid input index")
+            return {'CANCELLED'}
         
         # Get API key
         api_key = preferences.get_api_key()
@@ -99,7 +270,7 @@ class RUNCHAT_OT_upload_viewport(Operator):
             input_prop.upload_status = "Capturing viewport..."
             
             # Capture viewport
-            image_data = self.capture_viewport(context)
+            image_data = capture_viewport_for_upload(context)
             if not image_data:
                 input_prop.upload_status = "Failed to capture viewport"
                 self.report({'ERROR'}, "Failed to capture viewport")
@@ -107,75 +278,60 @@ class RUNCHAT_OT_upload_viewport(Operator):
             
             # Upload to RunChat
             input_prop.upload_status = "Uploading to RunChat..."
-            filename = f"viewport_capture_{input_prop.param_id}.png"
+            filename = f"viewport_capture_{input_prop.param_id}.jpg"
             
-            uploaded_url = api.RunChatAPI.upload_image(image_data, filename, api_key)
-            
-            if uploaded_url:
-                input_prop.uploaded_url = uploaded_url
-                input_prop.text_value = uploaded_url  # Also set as text value for execution
-                input_prop.upload_status = "Upload successful!"
-                self.report({'INFO'}, f"Viewport uploaded successfully: {uploaded_url}")
-            else:
-                input_prop.upload_status = "Upload failed"
-                self.report({'ERROR'}, "Failed to upload image to RunChat")
-                return {'CANCELLED'}
-                
+            uploaded_url = api.RunChatAPI.upload_bytes(image_data, filename, api_key)
+            return self.apply_uploaded_url(input_prop, uploaded_url)
+        
         except Exception as e:
             input_prop.upload_status = f"Error: {str(e)}"
             self.report({'ERROR'}, f"Error uploading viewport: {str(e)}")
             return {'CANCELLED'}
-        
-        return {'FINISHED'}
     
-    def capture_viewport(self, context):
-        """Capture the current viewport as base64 image with custom dimensions"""
-        try:
-            scene = context.scene
-            runchat_props = scene.runchat_properties
-            
-            # Store original render settings
-            render = scene.render
-            original_resolution_x = render.resolution_x
-            original_resolution_y = render.resolution_y
-            original_percentage = render.resolution_percentage
-            
-            # Set custom viewport capture dimensions
-            render.resolution_x = runchat_props.viewport_width
-            render.resolution_y = runchat_props.viewport_height
-            render.resolution_percentage = 100
-            
-            print(f"Capturing viewport at {runchat_props.viewport_width}x{runchat_props.viewport_height}")
-            
-            # Use the proper viewport capture function from utils
-            base64_data = utils.capture_viewport_image(quality=runchat_props.viewport_quality)
-            
-            # Restore original render settings
-            render.resolution_x = original_resolution_x
-            render.resolution_y = original_resolution_y
-            render.resolution_percentage = original_percentage
-            
-            if base64_data:
-                print("Viewport captured successfully")
-                return base64_data
-            else:
-                print("Failed to capture viewport - no data returned")
-                return None
-            
-        except Exception as e:
-            print(f"Error capturing viewport: {e}")
-            import traceback
-            print(traceback.format_exc())
-            return None
+    def apply_uploaded_url(self, input_prop, uploaded_url):
+        if uploaded_url:
+            input_prop.uploaded_url = uploaded_url
+            input_prop.text_value = uploaded_url  # Also set as text value for execution
+            input_prop.upload_status = "Upload successful!"
+            self.report({'INFO'}, f"Viewport uploaded successfully: {uploaded_url}")
+            return {'FINISHED'}
+        
+        input_prop.upload_status = "Upload failed"
+        self.report({'ERROR'}, "Failed to upload image to RunChat")
+        return {'CANCELLED'}
 
 
-class RUNCHAT_OT_preview_image(Operator):
+class RUNCHAT_OT_preview_image(FutureModalMixin, Operator):
     """Preview input image"""
     bl_idname = "runchat.preview_image"
     bl_label = "Preview Image"
     
     input_index: IntProperty()
     
+    def invoke(self, context, event):
+        runchat_props = context.scene.runchat_properties
+        if context.window is None or self.input_index >= len(runchat_props.inputs):
+            return self.execute(context)
+        
+        input_prop = runchat_props.inputs[self.input_index]
+        if not input_prop.use_viewport_capture:
+            return self.execute(context)
+        
+        # Capture now, encode in the background
+        future = capture_viewport_future(context)
+        if future is None:
+            self.report({'ERROR'}, "Failed to capture viewport")
+            return {'FINISHED'}
+        
+        return self.await_future(context, future)
+    
+    def on_future_done(self, context, result):
+        if not result:
+            self.report({'ERROR'}, "Failed to capture viewport")
+            return {'FINISHED'}
+        self.show_capture(context, result['data'])
+        return {'FINISHED'}
+    
     def execute(self, context):
         scene = context.scene
         runchat_props = scene.runchat_properties
@@ -185,14 +341,9 @@ class RUNCHAT_OT_preview_image(Operator):
             
             if input_prop.use_viewport_capture:
                 # Capture and preview viewport
-                image_data = self.capture_viewport(context)
+                image_data = capture_viewport_for_upload(context)
                 if image_data:
-                    image = utils.load_image_from_base64(image_data, f"Preview_{input_prop.name}")
-                    if image:
-                        utils.setup_image_viewer(image.name)
-                        self.report({'INFO'}, f"Viewport captured and loaded: {image.name}")
-                    else:
-                        self.report({'ERROR'}, "Failed to load captured image")
+                    self.show_capture(context, image_data)
                 else:
                     self.report({'ERROR'}, "Failed to capture viewport")
             
@@ -200,7 +351,8 @@ class RUNCHAT_OT_preview_image(Operator):
                 # Load and preview file
                 try:
                     image = bpy.data.images.load(input_prop.file_path)
-                    image.name = f"Preview_{input_prop.name}"
+                    # Replaces the last preview of this input rather than adding Preview_Name.001
+                    datablocks.adopt_image(f"Preview_{input_prop.name}", image)
                     utils.setup_image_viewer(image.name)
                     self.report({'INFO'}, f"Image loaded: {image.name}")
                 except Exception as e:
@@ -211,40 +363,21 @@ class RUNCHAT_OT_preview_image(Operator):
         
         return {'FINISHED'}
     
-    def capture_viewport(self, context):
-        """Capture current viewport as image"""
-        try:
-            scene = context.scene
-            runchat_props = scene.runchat_properties
-            
-            # Store original render settings
-            render = scene.render
-            original_resolution_x = render.resolution_x
-            original_resolution_y = render.resolution_y
-            original_percentage = render.resolution_percentage
-            
-            # Set custom viewport capture dimensions
-            render.resolution_x = runchat_props.viewport_width
-            render.resolution_y = runchat_props.viewport_height
-            render.resolution_percentage = 100
-            
-            # Use the proper viewport capture function from utils
-            base64_data = utils.capture_viewport_image(quality=runchat_props.viewport_quality)
-            
-            # Restore original render settings
-            render.resolution_x = original_resolution_x
-            render.resolution_y = original_resolution_y
-            render.resolution_percentage = original_percentage
-            
-            return base64_data
-            
-        except Exception as e:
-            print(f"Error capturing viewport: {e}")
-            return None
+    def show_capture(self, context, image_data):
+        """Load an encoded viewport capture and show it in the Image Editor"""
+        runchat_props = context.scene.runchat_properties
+        input_prop = runchat_props.inputs[self.input_index]
+        
+        image = utils.load_image_from_bytes(image_data, f"Preview_{input_prop.name}")
+        if image:
+            utils.setup_image_viewer(image.name)
+            self.report({'INFO'}, f"Viewport captured and loaded: {image.name}")
+        else:
+            self.report({'ERROR'}, "Failed to load captured image")
 
 
 classes = [
     RUNCHAT_OT_preview_viewport,
     RUNCHAT_OT_upload_viewport,
     RUNCHAT_OT_preview_image,
-] 
\ No newline at end of file
+]
@@ -3,13 +3,12 @@
 import bpy
 import os
 from bpy.types import Operator
+from bpy.props import BoolProperty, IntProperty
 
 from .. import api
 from .. import preferences
-from ..utils.dependencies import get_requests, check_dependencies
-
-# Get bundled requests
-requests, _ = get_requests()
+from ..utils import transport
+from ..utils.dependencies import check_dependencies
 
 
 def log_to_blender(message, level='INFO'):
@@ -49,7 +48,7 @@ class RUNCHAT_OT_test_api_connection(Operator):
         # Test basic HTTP connectivity
         try:
             log_to_blender("Testing basic HTTP connectivity...")
-            response = requests.get("https://httpbin.org/get", timeout=10)
+            response = transport.get("https://httpbin.org/get", timeout=10)
             log_to_blender(f"HTTP test successful: {response.status_code}")
         except Exception as e:
             log_to_blender(f"HTTP test failed: {e}", 'ERROR')
@@ -76,6 +75,12 @@ class RUNCHAT_OT_test_api_connection(Operator):
             log_to_blender("No Runchat ID set - skipping schema test", 'WARNING')
             self.report({'INFO'}, "Basic connectivity OK - set Runchat ID to test schema API")
         
+        # Report connection reuse for the shared transport
+        stats = transport.get_pool_stats()
+        log_to_blender(f"Connection pool: {stats['requests']} requests, {stats['hits']} reused, {stats['misses']} new connections")
+        for host in stats['hosts']:
+            log_to_blender(f"  {host['host']}: {host['requests']} requests, {host['hits']} reused, {host['idle_connections']} idle")
+        
         log_to_blender("=== API CONNECTION TEST COMPLETE ===")
         return {'FINISHED'}
 
@@ -164,6 +169,114 @@ class RUNCHAT_OT_clear_workflow(Operator):
         return {'FINISHED'}
 
 
+class RUNCHAT_OT_clear_upload_cache(Operator):
+    """Forget cached upload URLs so every image is uploaded again"""
+    bl_idname = "runchat.clear_upload_cache"
+    bl_label = "Clear Upload Cache"
+    bl_description = "Clear the content-addressed upload cache and its hit/miss counters"
+    
+    def execute(self, context):
+        try:
+            from ..utils.upload_cache import get_upload_cache
+            upload_cache = get_upload_cache()
+            entries = upload_cache.stats()['entries']
+            upload_cache.clear()
+            log_to_blender(f"Cleared {entries} cached uploads")
+            self.report({'INFO'}, f"Cleared {entries} cached uploads")
+        except Exception as e:
+            log_to_blender(f"Error clearing upload cache: {e}", 'ERROR')
+            self.report({'ERROR'}, f"Error clearing upload cache: {e}")
+            return {'CANCELLED'}
+        
+        return {'FINISHED'}
+
+
+class RUNCHAT_OT_clear_result_cache(Operator):
+    """Forget cached workflow results so every run goes to the server again"""
+    bl_idname = "runchat.clear_result_cache"
+    bl_label = "Clear Result Cache"
+    bl_description = "Clear the workflow result cache and its hit/miss counters"
+    
+    def execute(self, context):
+        try:
+            from ..utils.result_cache import get_result_cache
+            cache = get_result_cache()
+            entries = cache.stats()['entries']
+            cache.clear()
+            log_to_blender(f"Cleared {entries} cached results")
+            self.report({'INFO'}, f"Cleared {entries} cached results")
+        except Exception as e:
+            log_to_blender(f"Error clearing result cache: {e}", 'ERROR')
+            self.report({'ERROR'}, f"Error clearing result cache: {e}")
+            return {'CANCELLED'}
+        
+        return {'FINISHED'}
+
+
+class RUNCHAT_OT_purge_asset_cache(Operator):
+    """Delete downloaded output files so they are fetched again when next used"""
+    bl_idname = "runchat.purge_asset_cache"
+    bl_label = "Purge Asset Cache"
+    bl_description = "Delete cached output files and reset the asset cache hit/miss counters"
+    
+    include_pinned: BoolProperty(
+        name="Include Pinned",
+        description="Also delete files that imported video strips still play from",
+        default=False
+    )
+    
+    def execute(self, context):
+        try:
+            from ..utils.asset_cache import get_asset_cache
+            cache = get_asset_cache()
+            before = cache.stats()
+            cache.purge(include_pinned=self.include_pinned)
+            after = cache.stats()
+            freed = (before['cached_bytes'] - after['cached_bytes']) / (1024 * 1024)
+            message = f"Purged {before['entries'] - after['entries']} cached assets ({freed:.1f} MB)"
+            log_to_blender(message)
+            self.report({'INFO'}, message)
+        except Exception as e:
+            log_to_blender(f"Error purging asset cache: {e}", 'ERROR')
+            self.report({'ERROR'}, f"Error purging asset cache: {e}")
+            return {'CANCELLED'}
+        
+        return {'FINISHED'}
+
+
+class RUNCHAT_OT_purge_output_images(Operator):
+    """Free earlier generations of output images kept by the image history"""
+    bl_idname = "runchat.purge_output_images"
+    bl_label = "Purge Output Images"
+    bl_description = "Remove earlier generations of output images, and unused Name.001 copies, that nothing else uses"
+    
+    keep_generations: IntProperty(
+        name="Keep Generations",
+        description="Earlier generations to keep per output",
+        default=0,
+        min=0
+    )
+    include_duplicates: BoolProperty(
+        name="Include Duplicates",
+        description="Also remove unused Name.001 copies of outputs that were loaded from the addon's downloads",
+        default=True
+    )
+    
+    def execute(self, context):
+        try:
+            from ..utils import datablocks
+            freed = datablocks.purge(keep_generations=self.keep_generations, duplicates=self.include_duplicates)
+            message = f"Freed {freed['images']} output images ({freed['bytes'] / (1024 * 1024):.1f} MB)"
+            log_to_blender(message)
+            self.report({'INFO'}, message)
+        except Exception as e:
+            log_to_blender(f"Error purging output images: {e}", 'ERROR')
+            self.report({'ERROR'}, f"Error purging output images: {e}")
+            return {'CANCELLED'}
+        
+        return {'FINISHED'}
+
+
 class RUNCHAT_OT_test_dependencies(Operator):
     """Test and report on bundled dependencies"""
     bl_idname = "runchat.test_dependencies" 
@@ -230,5 +343,9 @@ classes = [
     RUNCHAT_OT_test_api_connection,
     RUNCHAT_OT_open_info_log,
     RUNCHAT_OT_clear_workflow,
+    RUNCHAT_OT_clear_upload_cache,
+    RUNCHAT_OT_clear_result_cache,
+    RUNCHAT_OT_purge_asset_cache,
+    RUNCHAT_OT_purge_output_images,
     RUNCHAT_OT_test_dependencies,
 ] 
\ No newline at end of file
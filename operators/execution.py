@@ -1,13 +1,24 @@
 # operators/execution.py
 
 import bpy
+import os
 import threading
 import time
+from concurrent.futures import as_completed
 from bpy.types import Operator
-from bpy.props import IntProperty
+from bpy.props import BoolProperty, IntProperty
 
 from .. import api
 from .. import preferences
+from ..utils import cancellation
+from ..utils import dispatch
+from ..utils import result_cache
+from ..utils import workers
+from ..utils.blender_utils import get_screen
+from ..utils.result_cache import get_result_cache
+from ..utils.upload_cache import get_upload_cache
+from . import imports
+from .capture import capture_viewport_future
 
 
 def log_to_blender(message, level='INFO', operator=None):
@@ -22,33 +33,130 @@ def log_to_blender(message, level='INFO', operator=None):
             pass
 
 
-class RUNCHAT_OT_execute(Operator):
-    """Execute RunChat workflow"""
-    bl_idname = "runchat.execute"
-    bl_label = "Execute RunChat"
+# Thread of the most recent execution (used by live mode to keep one request in flight)
+_active_thread = None
+# Cancel token of the most recent execution (see runchat.cancel_execution)
+_active_token = None
+
+
+def is_execution_running():
+    """True while a workflow started by runchat.execute is uploading or running"""
+    return _active_thread is not None and _active_thread.is_alive()
+
+
+def register_job_timer(token, function, first_interval=0.0):
+    """Register a timer that belongs to a cancellable run; cancelling the run unregisters it (main thread)"""
+    if token.cancelled:
+        return
+    bpy.app.timers.register(function, first_interval=first_interval)
     
-    def execute(self, context):
-        scene = context.scene
-        runchat_props = scene.runchat_properties
-        
-        if not runchat_props.schema_loaded:
-            self.report({'ERROR'}, "Please load schema first")
-            log_to_blender("Execution failed: Schema not loaded", 'ERROR')
-            return {'CANCELLED'}
-        
-        api_key = preferences.get_api_key()
-        if not api_key:
-            self.report({'ERROR'}, "Please set your RunChat API key in addon preferences")
-            log_to_blender("Execution failed: No API key set", 'ERROR')
-            return {'CANCELLED'}
-        
-        # Prepare inputs
+    def unregister():
+        # Cancel can come from any thread; the timer API is main-thread only
+        dispatch.post(unregister_timer, function)
+    token.on_cancel(unregister)
+
+
+def unregister_timer(function):
+    if bpy.app.timers.is_registered(function):
+        bpy.app.timers.unregister(function)
+
+
+def apply_unless_cancelled(token, function, *args):
+    """Apply a posted background result only if its run wasn't cancelled meanwhile (main thread)"""
+    if not token.cancelled:
+        function(*args)
+
+
+def cancel_active():
+    """Abort the running execution without touching scene data (addon unregister)"""
+    if _active_token is not None:
+        _active_token.cancel()
+
+
+def cancel_execution(runchat_props):
+    """Cancel the run started by runchat.execute. Returns False if nothing is running."""
+    token = _active_token
+    if token is None or token.cancelled or not is_execution_running():
+        return False
+    
+    # Aborts in-flight requests, drops queued uploads and unregisters the run's timers
+    token.cancel()
+    
+    runchat_props.status = "Cancelled"
+    runchat_props.progress = 0.0
+    runchat_props.progress_message = ""
+    for input_prop in runchat_props.inputs:
+        if input_prop.upload_status in ("Queued for upload...", "Uploading to RunChat..."):
+            input_prop.upload_status = "Cancelled"
+    
+    # Best effort: let the server stop the instance too (not every server supports it). Only the
+    # instance this run was submitted as; runchat_props.instance_id still names the previous run's
+    api_key = preferences.get_api_key()
+    if api_key and runchat_props.runchat_id and token.instance_id:
+        workers.submit('upload', api.RunChatAPI.cancel_workflow,
+                       runchat_props.runchat_id, api_key, token.instance_id)
+    
+    log_to_blender("Execution cancelled")
+    return True
+
+
+def collect_workflow_outputs(result):
+    """
+    Flatten a workflow result into (output_id, value) pairs.
+    Handles both the 'data' array format and the id->value dict format; single-item arrays are unwrapped.
+    """
+    data_content = result.get('data') if isinstance(result, dict) else None
+    outputs = []
+    
+    if isinstance(data_content, list):
+        for output_item in data_content:
+            if isinstance(output_item, dict) and 'id' in output_item:
+                output_data = output_item.get('data', [])
+                if isinstance(output_data, list) and len(output_data) == 1:
+                    output_data = output_data[0]
+                outputs.append((output_item['id'], output_data))
+    elif isinstance(data_content, dict):
+        outputs.extend(data_content.items())
+    
+    return outputs
+
+
+def set_input_fields(runchat_props, index, **values):
+    """Update an input property by index (main thread; the input may have been removed meanwhile)"""
+    if index < len(runchat_props.inputs):
+        input_prop = runchat_props.inputs[index]
+        for name, value in values.items():
+            setattr(input_prop, name, value)
+
+
+class WorkflowInputsMixin:
+    """Collects workflow inputs from the input properties for operators that start a run"""
+    
+    force_rerun: BoolProperty(
+        name="Force Re-run",
+        description="Run the workflow even if these inputs already have a cached result",
+        default=False,
+        options={'SKIP_SAVE'}
+    )
+    
+    def gather_inputs(self, context, runchat_props, show_status=True):
+        """
+        Returns (inputs, upload_jobs), or None after reporting an error.
+        Without show_status the inputs' upload status is left untouched (queued jobs track their own).
+        """
         inputs = {}
         missing_required = []
+        pending_uploads = []
+        upload_cache = get_upload_cache()
         
-        for input_prop in runchat_props.inputs:
+        for index, input_prop in enumerate(runchat_props.inputs):
             key = input_prop.param_id  # Use the full ID (paramId_nodeId) directly
             
+            # Image inputs with a local source but no usable URL are uploaded right before execution
+            if self.needs_upload(input_prop, upload_cache):
+                pending_uploads.append(index)
+                continue
+            
             # Determine what value to use for this input
             value = None
             
@@ -59,8 +167,8 @@ class RUNCHAT_OT_execute(Operator):
             elif input_prop.text_value:
                 # Use manual text input if no uploaded URL
                 value = input_prop.text_value
-            elif input_prop.required:
-                # Missing required input
+            elif input_prop.required and not (runchat_props.sweep_enabled and input_prop.sweep_values.strip()):
+                # Missing required input (a swept input gets its value per run)
                 missing_required.append(input_prop.name)
             
             if value:
@@ -71,8 +179,106 @@ class RUNCHAT_OT_execute(Operator):
             error_msg = f"Missing required inputs: {', '.join(missing_required)}"
             self.report({'ERROR'}, error_msg)
             log_to_blender(f"Execution failed: {error_msg}", 'ERROR')
+            return None
+        
+        # Read files / capture the viewport on the main thread; the uploads themselves run in the background
+        upload_jobs = self.prepare_uploads(context, runchat_props, pending_uploads, show_status)
+        if upload_jobs is None:
+            return None
+        return inputs, upload_jobs
+    
+    @staticmethod
+    def needs_upload(input_prop, upload_cache):
+        """True for image inputs with a file or viewport source but no fresh uploaded URL"""
+        if input_prop.data_type.lower() != "image":
+            return False
+        if not (input_prop.file_path or input_prop.use_viewport_capture):
+            return False
+        if input_prop.uploaded_url and upload_cache.is_url_fresh(input_prop.uploaded_url):
+            return False
+        return True
+    
+    def prepare_uploads(self, context, runchat_props, pending_uploads, show_status=True):
+        """Resolve files and capture the viewport (main thread). Returns upload jobs or None on error."""
+        upload_jobs = []
+        viewport_future = None
+        
+        def status(input_prop, message):
+            if show_status:
+                input_prop.upload_status = message
+        
+        for index in pending_uploads:
+            input_prop = runchat_props.inputs[index]
+            job = {
+                'index': index,
+                'key': input_prop.param_id,
+                'name': input_prop.name,
+            }
+            
+            if input_prop.file_path:
+                file_path = bpy.path.abspath(input_prop.file_path)
+                if not os.path.exists(file_path):
+                    status(input_prop, "File not found")
+                    self.report({'ERROR'}, f"File not found for input '{input_prop.name}': {file_path}")
+                    log_to_blender(f"Execution failed: file not found for {input_prop.name}", 'ERROR')
+                    return None
+                job['source'] = file_path
+                job['filename'] = os.path.basename(file_path)
+            else:
+                # All viewport inputs share one capture; it is encoded on the worker pool
+                if viewport_future is None:
+                    status(input_prop, "Capturing viewport...")
+                    viewport_future = capture_viewport_future(context)
+                if viewport_future is None:
+                    status(input_prop, "Failed to capture viewport")
+                    self.report({'ERROR'}, f"Failed to capture viewport for input '{input_prop.name}'")
+                    log_to_blender(f"Execution failed: viewport capture failed for {input_prop.name}", 'ERROR')
+                    return None
+                job['source'] = viewport_future
+                job['filename'] = f"viewport_capture_{input_prop.param_id}.jpg"
+            
+            status(input_prop, "Queued for upload...")
+            upload_jobs.append(job)
+        
+        return upload_jobs
+
+
+class RUNCHAT_OT_execute(WorkflowInputsMixin, Operator):
+    """Execute RunChat workflow"""
+    bl_idname = "runchat.execute"
+    bl_label = "Execute RunChat"
+    
+    def execute(self, context):
+        scene = context.scene
+        runchat_props = scene.runchat_properties
+        
+        if not runchat_props.schema_loaded:
+            self.report({'ERROR'}, "Please load schema first")
+            log_to_blender("Execution failed: Schema not loaded", 'ERROR')
             return {'CANCELLED'}
         
+        # One run at a time: a second run would take over the cancel token and write into the same outputs
+        if is_execution_running():
+            self.report({'WARNING'}, "A workflow is already running - cancel it or wait for it to finish")
+            log_to_blender("Execution refused: a run is already active", 'WARNING')
+            return {'CANCELLED'}
+        
+        api_key = preferences.get_api_key()
+        if not api_key:
+            self.report({'ERROR'}, "Please set your RunChat API key in addon preferences")
+            log_to_blender("Execution failed: No API key set", 'ERROR')
+            return {'CANCELLED'}
+        
+        gathered = self.gather_inputs(context, runchat_props)
+        if gathered is None:
+            return {'CANCELLED'}
+        inputs, upload_jobs = gathered
+        
+        # Sweep mode runs every combination of the inputs' sweep values instead of a single run
+        if runchat_props.sweep_enabled and any(input_prop.sweep_values.strip() for input_prop in runchat_props.inputs):
+            from . import sweep
+            return sweep.start_sweep(self, context, runchat_props, api_key, inputs, upload_jobs)
+        
         log_to_blender("=== EXECUTION DEBUG INFO ===")
         log_to_blender(f"RunChat ID: {runchat_props.runchat_id}")
         log_to_blender(f"API Key present: {'Yes' if api_key else 'No'}")
@@ -80,9 +286,10 @@ class RUNCHAT_OT_execute(Operator):
         log_to_blender(f"Inputs prepared: {inputs}")
         log_to_blender(f"Number of inputs: {len(inputs)}")
         log_to_blender(f"Instance ID: {runchat_props.instance_id}")
+        log_to_blender(f"Inputs to upload first: {[job['name'] for job in upload_jobs]}")
         
         # Set initial status and start progress monitoring
-        runchat_props.status = "Starting execution..."
+        runchat_props.status = "Uploading inputs..." if upload_jobs else "Starting execution..."
         runchat_props.progress = 0.0
         runchat_props.progress_message = "Initializing..."
         
@@ -90,79 +297,214 @@ class RUNCHAT_OT_execute(Operator):
         runchat_props.has_credit_error = False
         runchat_props.credit_error_message = ""
         
-        # Clear previous output values to show running status
+        # Clear previous output values to show running status; imports still pending from the last run are stale
+        imports.cancel_imports()
         for output_prop in runchat_props.outputs:
             output_prop.value = ""
             output_prop.is_processed = False
             output_prop.output_type = "text"  # Reset to default type
+            output_prop.imported_value = ""
         
-        # Execute in background
-        thread = threading.Thread(target=self.execute_async, args=(runchat_props, api_key, inputs))
+        # Execute in background (after uploading any pending image inputs); the thread reports back through the dispatch queue
+        token = cancellation.CancelToken("Workflow execution")
+        dispatch.begin_job()
+        thread = threading.Thread(
+            target=self.upload_then_execute,
+            args=(runchat_props, api_key, inputs, upload_jobs, runchat_props.runchat_id, runchat_props.instance_id, token,
+                  runchat_props.schema_version, self.force_rerun)
+        )
         thread.daemon = True
         thread.start()
         
+        global _active_thread, _active_token
+        _active_thread = thread
+        _active_token = token
+        
         # Register a timer to update the UI periodically during execution
         def check_execution_progress():
             # Force UI redraw to show progress updates
-            for area in bpy.context.screen.areas:
+            screen = get_screen()
+            for area in screen.areas if screen else []:
                 if area.type == 'PROPERTIES':
                     area.tag_redraw()
             
-            # Continue checking if we're still executing
-            if runchat_props.progress < 1.0 and "Executing" in runchat_props.status:
+            # Continue checking if we're still uploading or executing
+            if runchat_props.progress < 1.0 and any(state in runchat_props.status for state in ("Starting", "Executing", "Uploading")):
                 return 0.5  # Check again in 0.5 seconds
             else:
                 return None  # Stop the timer
         
-        bpy.app.timers.register(check_execution_progress, first_interval=0.1)
+        register_job_timer(token, check_execution_progress, first_interval=0.1)
         
         self.report({'INFO'}, "Executing RunChat workflow...")
         log_to_blender("Execution thread started")
         log_to_blender(f"Thread daemon: {thread.daemon}, Thread alive: {thread.is_alive()}")
         return {'FINISHED'}
     
-    def execute_async(self, runchat_props, api_key, inputs):
-        """Execute workflow asynchronously in a separate thread"""
+    @staticmethod
+    def upload_input_static(runchat_props, job, api_key):
+        """Upload one prepared input on the upload pool and return its URL"""
+        dispatch.post(set_input_fields, runchat_props, job['index'], upload_status="Uploading to RunChat...")
+        return RUNCHAT_OT_execute.upload_source_static(job, api_key)
+    
+    @staticmethod
+    def upload_source_static(job, api_key):
+        """Upload a prepared input's file or viewport capture without touching any properties"""
+        if isinstance(job['source'], str):
+            return api.RunChatAPI.upload_file(job['source'], api_key, job['filename'])
+        
+        # Viewport capture: wait for the encode worker
+        encoded = job['source'].result()
+        if not encoded:
+            log_to_blender(f"Viewport capture could not be encoded for {job['name']}", 'ERROR')
+            return None
+        return api.RunChatAPI.upload_bytes(encoded['data'], job['filename'], api_key, encoded['digest'])
+    
+    def upload_then_execute(self, runchat_props, api_key, inputs, upload_jobs, runchat_id, instance_id, token,
+                            schema_version, force_rerun):
+        """Thread target: upload any pending image inputs, then run the workflow"""
+        try:
+            # Requests made on this thread are registered with the token so cancel can abort them
+            with cancellation.use_token(token):
+                if upload_jobs and not self.upload_inputs(runchat_props, api_key, inputs, upload_jobs):
+                    return
+                self.execute_async(runchat_props, api_key, inputs, runchat_id, instance_id, schema_version, force_rerun)
+        except cancellation.OperationCancelled:
+            log_to_blender("Execution thread stopped after cancel")
+        finally:
+            # Lets the dispatch timer stop once the last message is applied
+            dispatch.end_job()
+    
+    def upload_inputs(self, runchat_props, api_key, inputs, upload_jobs):
+        """Upload all pending image inputs concurrently. Returns True once the last one lands."""
+        log_to_blender(f"=== UPLOADING {len(upload_jobs)} INPUTS ===")
+        start_time = time.time()
+        token = cancellation.current()
+        
+        try:
+            dispatch.set_attrs(runchat_props, progress_message=f"Uploading {len(upload_jobs)} images...")
+            # Upload workers run with this run's token; cancel drops the uploads that haven't started
+            upload = cancellation.bind(token, RUNCHAT_OT_execute.upload_input_static)
+            futures = {workers.submit('upload', upload, runchat_props, job, api_key): job for job in upload_jobs}
+            for future in futures:
+                token.on_cancel(future.cancel)
+            
+            failed = []
+            for completed, future in enumerate(as_completed(futures), 1):
+                token.raise_if_cancelled()
+                job = futures[future]
+                try:
+                    uploaded_url = future.result()
+                except Exception as e:
+                    log_to_blender(f"Upload error for {job['name']}: {e}", 'ERROR')
+                    uploaded_url = None
+                
+                if uploaded_url:
+                    inputs[job['key']] = uploaded_url
+                    # Also set as text value for execution
+                    dispatch.post(set_input_fields, runchat_props, job['index'], uploaded_url=uploaded_url,
+                                  text_value=uploaded_url, upload_status="Upload successful!")
+                    log_to_blender(f"Uploaded {job['name']} ({completed}/{len(futures)}): {uploaded_url}")
+                else:
+                    failed.append(job['name'])
+                    dispatch.post(set_input_fields, runchat_props, job['index'], upload_status="Upload failed")
+                
+                dispatch.set_attrs(runchat_props, progress=0.1 * completed / len(futures),
+                                   progress_message=f"Uploaded {completed}/{len(futures)} images")
+            
+            log_to_blender(f"Uploads finished in {time.time() - start_time:.2f}s")
+            
+            if failed:
+                dispatch.set_attrs(runchat_props, progress=0.0, progress_message="",
+                                   status=f"Upload failed: {', '.join(failed)}")
+                log_to_blender(f"Execution cancelled - upload failed for: {', '.join(failed)}", 'ERROR')
+                return False
+            
+        except cancellation.OperationCancelled:
+            raise
+        except Exception as e:
+            log_to_blender(f"Exception while uploading inputs: {e}", 'ERROR')
+            import traceback
+            log_to_blender(f"Traceback: {traceback.format_exc()}", 'ERROR')
+            
+            dispatch.set_attrs(runchat_props, progress=0.0, progress_message="", status=f"Upload failed: {str(e)}")
+            return False
+        
+        return True
+    
+    def execute_async(self, runchat_props, api_key, inputs, runchat_id, instance_id, schema_version="", force_rerun=False):
+        """Run the workflow on the background thread; results are applied on the main thread"""
         log_to_blender("=== ASYNC EXECUTION STARTED ===")
         log_to_blender(f"Thread ID: {threading.current_thread().ident}")
         log_to_blender(f"Inputs: {inputs}")
         
         try:
-            log_to_blender(f"RunChat ID: {runchat_props.runchat_id}")
-            log_to_blender(f"Instance ID: {runchat_props.instance_id}")
+            log_to_blender(f"RunChat ID: {runchat_id}")
+            log_to_blender(f"Instance ID: {instance_id}")
+            token = cancellation.current()
+            
+            # Unchanged inputs: reuse the stored result instead of running (and paying for) the workflow again
+            cache_key = result_cache.make_key(runchat_id, schema_version, inputs)
+            cached = None if force_rerun else get_result_cache().lookup(cache_key)
+            if cached is not None:
+                log_to_blender("Inputs unchanged since an earlier run, using the cached result")
+                dispatch.post(apply_unless_cancelled, token, RUNCHAT_OT_execute.apply_result_static, runchat_props, cached)
+                return
             
             # Better progress updates
             def update_progress(progress, message):
-                runchat_props.progress = progress
-                runchat_props.progress_message = message
+                dispatch.set_attrs(runchat_props, progress=progress, progress_message=message)
                 log_to_blender(f"Progress: {int(progress*100)}% - {message}")
             
             # Set initial status
             update_progress(0.1, "Initializing...")
-            runchat_props.status = "Executing workflow..."
+            dispatch.set_attrs(runchat_props, status="Executing workflow...")
             
             update_progress(0.2, "Sending request to RunChat...")
             log_to_blender("Making API call to RunChat...")
             
-            # Start progress simulation timer
+            # Start progress simulation timer (until the status endpoint reports real progress)
             progress_step = 0.2
             max_progress = 0.8
+            real_progress = False
             
             def simulate_progress():
                 nonlocal progress_step
-                if progress_step < max_progress and "Executing" in runchat_props.status:
+                if not real_progress and progress_step < max_progress and "Executing" in runchat_props.status:
                     progress_step += 0.05  # Increment by 5%
                     update_progress(progress_step, f"Workflow executing... ({int(progress_step*100)}%)")
                     return 2.0  # Check again in 2 seconds
                 return None  # Stop timer
             
-            # Start progress simulation
-            bpy.app.timers.register(simulate_progress, first_interval=2.0)
+            # Start progress simulation (timers can only be registered from the main thread)
+            dispatch.post(register_job_timer, token, simulate_progress, 2.0)
             
             # Execute the workflow (this will block until complete)
             log_to_blender("Starting workflow execution (this may take a while)...")
             
-            result = api.RunChatAPI.run_workflow(runchat_props.runchat_id, api_key, inputs, runchat_props.instance_id)
+            def report_progress(fraction, message):
+                nonlocal real_progress
+                real_progress = True
+                update_progress(0.2 + 0.6 * fraction, f"Workflow executing: {message} ({int(fraction*100)}%)")
+            
+            def report_partial(status):
+                dispatch.post(apply_unless_cancelled, token, RUNCHAT_OT_execute.apply_partial_outputs_static,
+                              runchat_props, status)
+            
+            def report_stream_event(event):
+                if event['type'] == 'progress':
+                    report_progress(api.normalize_progress(event.get('progress')), event.get('message') or "running")
+                else:
+                    # Each output is shown and imported as soon as it arrives
+                    dispatch.post(apply_unless_cancelled, token, RUNCHAT_OT_execute.apply_streamed_output_static,
+                                  runchat_props, event['id'], event.get('data'))
+            
+            if api.RunChatAPI.streaming_enabled:
+                result = api.RunChatAPI.stream_workflow(runchat_id, api_key, inputs, instance_id,
+                                                        on_event=report_stream_event)
+            else:
+                result = api.RunChatAPI.run_workflow_polled(runchat_id, api_key, inputs, instance_id,
+                                                           on_progress=report_progress, on_partial=report_partial)
             
             log_to_blender(f"Workflow execution completed. Result type: {type(result)}")
             if result:
@@ -172,6 +514,52 @@ class RUNCHAT_OT_execute(Operator):
             else:
                 log_to_blender("No result returned from API")
             
+            # Outputs are written to Blender data on the main thread
+            token.raise_if_cancelled()
+            get_result_cache().store(cache_key, result)
+            dispatch.post(apply_unless_cancelled, token, RUNCHAT_OT_execute.apply_result_static, runchat_props, result)
+                
+        except cancellation.OperationCancelled:
+            raise
+        except Exception as e:
+            log_to_blender(f"Exception in execution thread: {e}", 'ERROR')
+            import traceback
+            log_to_blender(f"Traceback: {traceback.format_exc()}", 'ERROR')
+            
+            dispatch.set_attrs(runchat_props, progress=0.0, progress_message="", status=f"Execution failed: {str(e)}")
+    
+    @staticmethod
+    def apply_partial_outputs_static(runchat_props, status):
+        """Show outputs that are already finished while the workflow is still running (main thread)"""
+        for output_id, output_value in collect_workflow_outputs(status):
+            if output_value in (None, "", []):
+                continue
+            for output_prop in runchat_props.outputs:
+                if output_prop.param_id == output_id:
+                    RUNCHAT_OT_execute.process_output_static(output_prop, output_value, output_id, runchat_props)
+                    break
+    
+    @staticmethod
+    def apply_streamed_output_static(runchat_props, output_id, output_value):
+        """Process one streamed output and start its auto-import right away (main thread)"""
+        if isinstance(output_value, list) and len(output_value) == 1:
+            output_value = output_value[0]
+        for index, output_prop in enumerate(runchat_props.outputs):
+            if output_prop.param_id == output_id:
+                RUNCHAT_OT_execute.process_output_static(output_prop, output_value, output_id, runchat_props)
+                RUNCHAT_OT_execute.schedule_safe_auto_imports(runchat_props, output_indices=[index])
+                return
+        log_to_blender(f"No matching output property found for streamed output: {output_id}", 'WARNING')
+    
+    @staticmethod
+    def apply_result_static(runchat_props, result):
+        """Apply a workflow result to the output properties (main thread, via the dispatch queue)"""
+        def update_progress(progress, message):
+            runchat_props.progress = progress
+            runchat_props.progress_message = message
+            log_to_blender(f"Progress: {int(progress*100)}% - {message}")
+        
+        try:
             # Check for error responses first
             if result and isinstance(result, dict) and result.get('error'):
                 log_to_blender("Detected error response from API", 'ERROR')
@@ -322,8 +710,12 @@ class RUNCHAT_OT_execute(Operator):
                         log_to_blender(f"Error scheduling auto-imports: {e}", 'WARNING')
                     
                     # Final completion
-                    update_progress(1.0, "Complete! Outputs auto-imported.")
-                    runchat_props.status = "Ready"
+                    if result.get('partial'):
+                        update_progress(1.0, "Stream interrupted - some outputs may be missing")
+                        runchat_props.status = "Stream interrupted"
+                    else:
+                        update_progress(1.0, "Complete! Outputs auto-imported.")
+                        runchat_props.status = "Ready"
                     
                     # Clear progress after delay
                     def clear_progress():
@@ -344,7 +736,7 @@ class RUNCHAT_OT_execute(Operator):
                 log_to_blender("Execution failed - no result returned", 'ERROR')
                 
         except Exception as e:
-            log_to_blender(f"Exception in execution thread: {e}", 'ERROR')
+            log_to_blender(f"Exception while applying workflow result: {e}", 'ERROR')
             import traceback
             log_to_blender(f"Traceback: {traceback.format_exc()}", 'ERROR')
             
@@ -494,70 +886,40 @@ class RUNCHAT_OT_execute(Operator):
         pass
     
     @staticmethod
-    def schedule_safe_auto_imports(runchat_props):
-        """Schedule safe auto-imports for outputs without blocking threads"""
+    def schedule_safe_auto_imports(runchat_props, output_indices=None):
+        """Prefetch and import outputs (all, or output_indices) through the import scheduler without blocking the UI"""
         log_to_blender("=== SCHEDULING SAFE AUTO-IMPORTS ===")
         
         images_scheduled = 0
         videos_scheduled = 0
         models_scheduled = 0
+        to_import = []
         
         for i, output_prop in enumerate(runchat_props.outputs):
+            if output_indices is not None and i not in output_indices:
+                continue
+            if output_prop.imported_value and output_prop.imported_value == output_prop.value:
+                # Already imported when it was streamed
+                continue
             if (output_prop.is_processed and 
                 output_prop.value and 
                 output_prop.value not in ["No output yet", "Processing...", ""]):
                 log_to_blender(f"Checking output {i}: {output_prop.name} (type: {output_prop.output_type})")
+                if output_prop.output_type in ('image', 'video', 'model'):
+                    output_prop.imported_value = output_prop.value
                 
                 if output_prop.output_type == 'image':
-                    # Images are safe to auto-import
-                    def import_image_delayed(output_index=i):
-                        def do_import():
-                            try:
-                                log_to_blender(f"Auto-importing image for output {output_index}")
-                                bpy.ops.runchat.view_image('EXEC_DEFAULT', output_index=output_index)
-                                log_to_blender(f"✅ Auto-imported image for output {output_index}")
-                            except Exception as e:
-                                log_to_blender(f"Failed to auto-import image {output_index}: {e}", 'WARNING')
-                            return None
-                        return do_import
-                    
-                    # Schedule image import with a small delay
-                    bpy.app.timers.register(import_image_delayed(), first_interval=0.5 + (i * 0.2))
                     images_scheduled += 1
-                
                 elif output_prop.output_type == 'video':
-                    # Auto-import videos to Video Sequencer
-                    def import_video_delayed(output_index=i):
-                        def do_import():
-                            try:
-                                log_to_blender(f"Auto-importing video for output {output_index}")
-                                bpy.ops.runchat.import_video('EXEC_DEFAULT', output_index=output_index)
-                                log_to_blender(f"✅ Auto-imported video for output {output_index}")
-                            except Exception as e:
-                                log_to_blender(f"Failed to auto-import video {output_index}: {e}", 'WARNING')
-                            return None
-                        return do_import
-                    
-                    # Schedule video import with a longer delay to ensure image imports complete first
-                    bpy.app.timers.register(import_video_delayed(), first_interval=1.0 + (i * 0.3))
                     videos_scheduled += 1
-                
                 elif output_prop.output_type == 'model':
-                    # Auto-import 3D models to scene
-                    def import_model_delayed(output_index=i):
-                        def do_import():
-                            try:
-                                log_to_blender(f"Auto-importing 3D model for output {output_index}")
-                                bpy.ops.runchat.import_model('EXEC_DEFAULT', output_index=output_index)
-                                log_to_blender(f"✅ Auto-imported 3D model for output {output_index}")
-                            except Exception as e:
-                                log_to_blender(f"Failed to auto-import model {output_index}: {e}", 'WARNING')
-                            return None
-                        return do_import
-                    
-                    # Schedule model import with the longest delay to ensure other imports complete first
-                    bpy.app.timers.register(import_model_delayed(), first_interval=1.5 + (i * 0.3))
                     models_scheduled += 1
+                else:
+                    continue
+                to_import.append((i, output_prop.output_type, output_prop.value))
+        
+        # Downloads start now, in parallel; each import runs on the main thread once its file is here
+        imports.schedule_imports(runchat_props, to_import)
         
         # Log summary of scheduled imports
         total_scheduled = images_scheduled + videos_scheduled + models_scheduled
@@ -573,6 +935,22 @@ class RUNCHAT_OT_execute(Operator):
             log_to_blender("No outputs found for auto-import")
 
 
+class RUNCHAT_OT_cancel_execution(Operator):
+    """Cancel the running workflow and abort its in-flight requests"""
+    bl_idname = "runchat.cancel_execution"
+    bl_label = "Cancel Execution"
+    
+    def execute(self, context):
+        runchat_props = context.scene.runchat_properties
+        if not cancel_execution(runchat_props):
+            self.report({'WARNING'}, "No workflow is running")
+            return {'CANCELLED'}
+        
+        self.report({'INFO'}, "Workflow execution cancelled")
+        return {'FINISHED'}
+
+
 classes = [
     RUNCHAT_OT_execute,
+    RUNCHAT_OT_cancel_execution,
 ]
\ No newline at end of file
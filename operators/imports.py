@@ -0,0 +1,167 @@
+# operators/imports.py
+
+"""
+Auto-import scheduler
+When results arrive, every image, model and video output is prefetched in
+parallel on the download pool into the asset cache (outputs already cached
+are not downloaded again), and images are decoded there too. A main-thread
+timer then runs the import step
+of each finished download in priority order (images first), as many per tick
+as fit the time budget, so one large asset doesn't hold up the others and the
+UI keeps redrawing while they download.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+import bpy
+
+from .. import utils
+from ..utils import cancellation
+from ..utils import workers
+from ..utils.asset_cache import get_asset_cache
+
+IMPORT_TICK = 0.05
+# Main-thread time per tick; at least one import runs per tick even if it takes longer
+TICK_BUDGET = 0.015
+DOWNLOAD_TIMEOUT = 60
+
+# Lower runs first: images are quick to load and what the user looks at first
+PRIORITY = {'image': 0, 'model': 1, 'video': 2}
+IMPORT_OPERATORS = {'image': 'view_image', 'model': 'import_model', 'video': 'import_video'}
+DEFAULT_EXTENSIONS = {'image': '.png', 'model': '.glb', 'video': '.mp4'}
+
+# Finished downloads waiting for their import step, as (priority, sequence, item)
+_ready = []
+_ready_lock = threading.Lock()
+_sequence = itertools.count()
+# Downloads still running; guarded by _ready_lock
+_downloading = 0
+# Cancels the prefetches of the current results
+_token = None
+
+
+def log_to_blender(message, level='INFO'):
+    print(f"[RunChat Import] {message}")
+
+
+def schedule_imports(runchat_props, outputs):
+    """Prefetch outputs, given as (output_index, kind, url), and import each as its download completes (main thread)"""
+    global _token, _downloading
+    if not outputs:
+        return 0
+    if _token is None or _token.cancelled:
+        _token = cancellation.CancelToken("imports")
+    
+    for output_index, kind, url in outputs:
+        item = {
+            'runchat_props': runchat_props,
+            'output_index': output_index,
+            'kind': kind,
+            'url': url,
+            'path': "",
+            'token': _token,
+            'error': None,
+        }
+        if not url.startswith('http'):
+            # Inline data (base64 images) needs no download, the operator decodes it
+            with _ready_lock:
+                heapq.heappush(_ready, (PRIORITY[kind], next(_sequence), item))
+            continue
+        
+        with _ready_lock:
+            _downloading += 1
+        workers.submit('download', cancellation.bind(_token, prefetch), item)
+    
+    if not bpy.app.timers.is_registered(import_tick):
+        bpy.app.timers.register(import_tick, first_interval=0.0)
+    return len(outputs)
+
+
+def prefetch(item):
+    """Fetch one output into the asset cache, then queue its import step (download pool)"""
+    global _downloading
+    token = item['token']
+    started = time.perf_counter()
+    try:
+        item['path'] = get_asset_cache().fetch(item['url'], timeout=DOWNLOAD_TIMEOUT,
+                                               default_ext=DEFAULT_EXTENSIONS[item['kind']])
+        if item['kind'] == 'image':
+            # None if numpy/PIL can't decode it, view_image then loads the file itself
+            item['decoded'] = utils.decode_image(item['path'])
+        log_to_blender(f"Prefetched {item['kind']} for output {item['output_index']} in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        if token.cancelled:
+            with _ready_lock:
+                _downloading -= 1
+            return
+        item['error'] = str(e)
+    
+    with _ready_lock:
+        _downloading -= 1
+        heapq.heappush(_ready, (PRIORITY[item['kind']], next(_sequence), item))
+
+
+def import_tick():
+    """Timer: run finished imports in priority order within the tick budget"""
+    deadline = time.perf_counter() + TICK_BUDGET
+    while True:
+        with _ready_lock:
+            if not _ready:
+                break
+            item = heapq.heappop(_ready)[2]
+        run_import(item)
+        if time.perf_counter() >= deadline:
+            break
+    
+    with _ready_lock:
+        if _ready or _downloading > 0:
+            return IMPORT_TICK
+    return None
+
+
+def run_import(item):
+    """Main-thread import step of one prefetched output"""
+    output_index = item['output_index']
+    kind = item['kind']
+    try:
+        if item['token'].cancelled:
+            return
+        if item['error']:
+            log_to_blender(f"Failed to download {kind} for output {output_index}: {item['error']}", 'WARNING')
+            return
+        
+        outputs = item['runchat_props'].outputs
+        if output_index >= len(outputs) or outputs[output_index].value != item['url']:
+            # A newer run replaced this output while it downloaded
+            return
+        
+        log_to_blender(f"Auto-importing {kind} for output {output_index}")
+        decoded = item.pop('decoded', None)
+        if decoded is not None:
+            # Decoded on the download worker; the main thread only copies the pixels in
+            image = utils.image_from_decoded(decoded, outputs[output_index].name, history=True)
+            bpy.ops.runchat.view_image('EXEC_DEFAULT', output_index=output_index, image_name=image.name)
+        else:
+            operator = getattr(bpy.ops.runchat, IMPORT_OPERATORS[kind])
+            operator('EXEC_DEFAULT', output_index=output_index, filepath=item['path'])
+        log_to_blender(f"✅ Auto-imported {kind} for output {output_index}")
+    except ReferenceError:
+        # The scene was removed or the file reloaded before the download finished
+        pass
+    except Exception as e:
+        log_to_blender(f"Failed to auto-import {kind} {output_index}: {e}", 'WARNING')
+
+
+def cancel_imports():
+    """Abort running prefetches and drop imports that haven't run yet (new run, addon unregister)"""
+    global _token
+    if _token is not None:
+        _token.cancel()
+        _token = None
+    with _ready_lock:
+        _ready.clear()
+    if bpy.app.timers.is_registered(import_tick):
+        bpy.app.timers.unregister(import_tick)
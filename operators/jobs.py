@@ -0,0 +1,374 @@
+# operators/jobs.py
+
+import bpy
+import heapq
+import itertools
+import json
+import time
+from concurrent.futures import as_completed
+from bpy.app.handlers import persistent
+from bpy.types import Operator
+from bpy.props import IntProperty
+
+from .. import api
+from .. import preferences
+from ..utils import cancellation
+from ..utils import dispatch
+from ..utils import result_cache
+from ..utils import workers
+from .execution import RUNCHAT_OT_execute, WorkflowInputsMixin, collect_workflow_outputs
+
+
+SCHEDULER_TICK = 0.25
+
+# Waiting jobs as (-priority, sequence, scene name, job_id): higher priority first, FIFO within a priority
+_queue = []
+_sequence = itertools.count()
+# (scene name, job_id) -> what the worker needs: inputs, pending uploads, API key
+_payloads = {}
+# (scene name, job_id) -> Future of the running job
+_running = {}
+# (scene name, job_id) -> CancelToken of the running job
+_tokens = {}
+
+
+def log_to_blender(message, level='INFO'):
+    print(f"[RunChat Jobs] {message}")
+
+
+def find_job(scene_name, job_id):
+    """Job property by ID, or None if the scene or job is gone"""
+    scene = bpy.data.scenes.get(scene_name)
+    if scene is None:
+        return None
+    for job in scene.runchat_properties.jobs:
+        if job.job_id == job_id:
+            return job
+    return None
+
+
+def set_job_fields(key, **values):
+    """Update a running job's properties (main thread; the job may have finished or been removed meanwhile)"""
+    job = find_job(*key)
+    if job is not None and job.state == 'RUNNING':
+        for name, value in values.items():
+            setattr(job, name, value)
+
+
+def queued_count():
+    return len(_queue)
+
+
+def running_count():
+    return len(_running)
+
+
+def run_job(key, runchat_id, api_key, inputs, upload_jobs, schema_version="", force_rerun=False):
+    """
+    Worker: upload the job's pending image inputs, then run the workflow (or reuse a cached result).
+    Upload progress and URLs go on the job's own item; the scene's inputs may already belong to the next job.
+    """
+    try:
+        if upload_jobs:
+            token = cancellation.current()
+            upload = cancellation.bind(token, RUNCHAT_OT_execute.upload_source_static)
+            futures = {workers.submit('upload', upload, job, api_key): job for job in upload_jobs}
+            for future in futures:
+                token.on_cancel(future.cancel)
+            for done, future in enumerate(as_completed(futures), 1):
+                token.raise_if_cancelled()
+                job = futures[future]
+                uploaded_url = future.result()
+                if not uploaded_url:
+                    raise RuntimeError(f"Upload failed for {job['name']}")
+                inputs[job['key']] = uploaded_url
+                dispatch.post(set_job_fields, key, inputs_json=json.dumps(inputs),
+                              message=f"Uploaded {done}/{len(upload_jobs)} inputs")
+            dispatch.post(set_job_fields, key, message="Running workflow...")
+        
+        cache = result_cache.get_result_cache()
+        cache_key = result_cache.make_key(runchat_id, schema_version, inputs)
+        cached = None if force_rerun else cache.lookup(cache_key)
+        if cached is not None:
+            log_to_blender("Inputs unchanged since an earlier run, using the cached result")
+            return cached
+        
+        # Each job is its own workflow instance so concurrent jobs don't share state
+        result = api.RunChatAPI.run_workflow_polled(runchat_id, api_key, inputs)
+        cache.store(cache_key, result)
+        return result
+    finally:
+        dispatch.end_job()
+
+
+def _ensure_scheduler():
+    if not bpy.app.timers.is_registered(_scheduler_tick):
+        bpy.app.timers.register(_scheduler_tick, first_interval=0.0)
+
+
+def _start_job(key):
+    """Hand a queued job to the jobs pool"""
+    payload = _payloads.pop(key, None)
+    job = find_job(*key)
+    if payload is None or job is None or job.state != 'QUEUED':
+        return
+    
+    job.state = 'RUNNING'
+    job.started_at = time.time()
+    job.message = "Uploading inputs..." if payload['upload_jobs'] else "Running workflow..."
+    
+    token = cancellation.CancelToken(job.name)
+    _tokens[key] = token
+    dispatch.begin_job()
+    _running[key] = workers.submit(
+        'jobs', cancellation.bind(token, run_job), key, payload['runchat_id'], payload['api_key'],
+        payload['inputs'], payload['upload_jobs'], payload['schema_version'], payload['force_rerun']
+    )
+    log_to_blender(f"Started {job.name} (priority {job.priority})")
+
+
+def _finish_job(key, future):
+    """Store a finished job's outputs (main thread)"""
+    job = find_job(*key)
+    if job is None or job.state == 'CANCELLED':
+        return
+    
+    job.finished_at = time.time()
+    try:
+        result = future.result()
+    except Exception as e:
+        job.state = 'FAILED'
+        job.message = str(e)
+        log_to_blender(f"{job.name} failed: {e}", 'ERROR')
+        return
+    
+    if not result:
+        job.state = 'FAILED'
+        job.message = "No result returned"
+        return
+    
+    if isinstance(result, dict) and result.get('error'):
+        message = result.get('message', 'Unknown error occurred')
+        job.state = 'FAILED'
+        job.message = f"API Error ({result.get('status_code', 0)}): {message}"
+        if result.get('is_credit_error'):
+            runchat_props = bpy.data.scenes[key[0]].runchat_properties
+            runchat_props.has_credit_error = True
+            runchat_props.credit_error_message = api.format_credit_error(message)
+        return
+    
+    runchat_props = bpy.data.scenes[key[0]].runchat_properties
+    for output_id, output_value in collect_workflow_outputs(result):
+        for slot in job.outputs:
+            if slot.param_id == output_id:
+                RUNCHAT_OT_execute.process_output_static(slot, output_value, output_id, runchat_props)
+                break
+    
+    job.state = 'DONE'
+    job.message = f"Finished in {job.finished_at - job.started_at:.1f}s"
+    log_to_blender(f"{job.name}: {job.message}")
+
+
+def _scheduler_tick():
+    """Timer: collect finished jobs, then start queued ones while slots are free"""
+    for key, future in list(_running.items()):
+        if future.done():
+            del _running[key]
+            _tokens.pop(key, None)
+            _finish_job(key, future)
+    
+    max_jobs = preferences.get_max_concurrent_jobs()
+    while _queue and len(_running) < max_jobs:
+        _, _, scene_name, job_id = heapq.heappop(_queue)
+        _start_job((scene_name, job_id))
+    
+    try:
+        for area in bpy.context.screen.areas:
+            if area.type == 'PROPERTIES':
+                area.tag_redraw()
+    except AttributeError:
+        pass
+    
+    if not _queue and not _running:
+        return None
+    return SCHEDULER_TICK
+
+
+def cancel_job(scene_name, job_id):
+    """Cancel a queued or running job. A running job's requests are aborted and its uploads dropped."""
+    key = (scene_name, job_id)
+    job = find_job(scene_name, job_id)
+    
+    if key in _payloads:
+        del _payloads[key]
+        _queue[:] = [entry for entry in _queue if (entry[2], entry[3]) != key]
+        heapq.heapify(_queue)
+    
+    token = _tokens.pop(key, None)
+    if token is not None:
+        token.cancel()
+    
+    future = _running.pop(key, None)
+    if future is not None and future.cancel():
+        # The worker never started, so it won't end its dispatch job itself
+        dispatch.end_job()
+    
+    if job is not None and job.state in ('QUEUED', 'RUNNING'):
+        job.state = 'CANCELLED'
+        job.finished_at = time.time()
+        job.message = "Cancelled"
+
+
+def cancel_all():
+    """Abort every running job's requests (file reload, addon unregister)"""
+    for token in _tokens.values():
+        token.cancel()
+    _tokens.clear()
+
+
+@persistent
+def _on_load_post(*args):
+    """Jobs saved while queued or running can't resume after the file is reopened"""
+    cancel_all()
+    _queue.clear()
+    _payloads.clear()
+    _running.clear()
+    for scene in bpy.data.scenes:
+        for job in scene.runchat_properties.jobs:
+            if job.state in ('QUEUED', 'RUNNING'):
+                job.state = 'FAILED'
+                job.message = "Interrupted (file was reloaded)"
+
+
+def register_handlers():
+    if _on_load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_on_load_post)
+
+
+def unregister_handlers():
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    if bpy.app.timers.is_registered(_scheduler_tick):
+        bpy.app.timers.unregister(_scheduler_tick)
+    cancel_all()
+    _queue.clear()
+    _payloads.clear()
+    _running.clear()
+
+
+class RUNCHAT_OT_queue_job(WorkflowInputsMixin, Operator):
+    """Snapshot the current inputs and queue a workflow run; it starts when a job slot is free"""
+    bl_idname = "runchat.queue_job"
+    bl_label = "Queue Job"
+    
+    def execute(self, context):
+        scene = context.scene
+        runchat_props = scene.runchat_properties
+        
+        if not runchat_props.schema_loaded:
+            self.report({'ERROR'}, "Please load schema first")
+            return {'CANCELLED'}
+        
+        api_key = preferences.get_api_key()
+        if not api_key:
+            self.report({'ERROR'}, "Please set your RunChat API key in addon preferences")
+            return {'CANCELLED'}
+        
+        # Files are resolved and the viewport captured now, so later edits don't affect this job
+        gathered = self.gather_inputs(context, runchat_props, show_status=False)
+        if gathered is None:
+            return {'CANCELLED'}
+        inputs, upload_jobs = gathered
+        
+        job_id = max((job.job_id for job in runchat_props.jobs), default=0) + 1
+        job = runchat_props.jobs.add()
+        job.job_id = job_id
+        job.name = f"Job {job_id}"
+        job.priority = runchat_props.job_priority
+        job.state = 'QUEUED'
+        job.queued_at = time.time()
+        job.message = f"Queued ({len(_queue) + 1} waiting)"
+        job.inputs_json = json.dumps(dict(inputs, **{upload['key']: f"<{upload['filename']}>" for upload in upload_jobs}))
+        for output_prop in runchat_props.outputs:
+            slot = job.outputs.add()
+            slot.param_id = output_prop.param_id
+            slot.node_id = output_prop.node_id
+            slot.name = output_prop.name
+            slot.data_type = output_prop.data_type
+        runchat_props.active_job_index = len(runchat_props.jobs) - 1
+        
+        key = (scene.name, job_id)
+        _payloads[key] = {
+            'runchat_id': runchat_props.runchat_id,
+            'api_key': api_key,
+            'inputs': inputs,
+            'upload_jobs': upload_jobs,
+            'schema_version': runchat_props.schema_version,
+            'force_rerun': self.force_rerun,
+        }
+        heapq.heappush(_queue, (-job.priority, next(_sequence), scene.name, job_id))
+        _ensure_scheduler()
+        
+        self.report({'INFO'}, f"{job.name} queued")
+        return {'FINISHED'}
+
+
+class RUNCHAT_OT_cancel_job(Operator):
+    """Cancel a queued or running job"""
+    bl_idname = "runchat.cancel_job"
+    bl_label = "Cancel Job"
+    
+    job_id: IntProperty()
+    
+    def execute(self, context):
+        cancel_job(context.scene.name, self.job_id)
+        return {'FINISHED'}
+
+
+class RUNCHAT_OT_apply_job_outputs(Operator):
+    """Copy a finished job's outputs into the Outputs panel and import them"""
+    bl_idname = "runchat.apply_job_outputs"
+    bl_label = "Use Job Outputs"
+    
+    job_id: IntProperty()
+    
+    def execute(self, context):
+        runchat_props = context.scene.runchat_properties
+        job = find_job(context.scene.name, self.job_id)
+        if job is None or job.state != 'DONE':
+            self.report({'ERROR'}, "Job has no outputs")
+            return {'CANCELLED'}
+        
+        slots = {slot.param_id: slot for slot in job.outputs}
+        for output_prop in runchat_props.outputs:
+            slot = slots.get(output_prop.param_id)
+            if slot is not None:
+                output_prop.value = slot.value
+                output_prop.output_type = slot.output_type
+                output_prop.is_processed = slot.is_processed
+        
+        RUNCHAT_OT_execute.schedule_safe_auto_imports(runchat_props)
+        self.report({'INFO'}, f"Using outputs of {job.name}")
+        return {'FINISHED'}
+
+
+class RUNCHAT_OT_clear_finished_jobs(Operator):
+    """Remove finished, failed and cancelled jobs from the list"""
+    bl_idname = "runchat.clear_finished_jobs"
+    bl_label = "Clear Finished Jobs"
+    
+    def execute(self, context):
+        runchat_props = context.scene.runchat_properties
+        for index in reversed(range(len(runchat_props.jobs))):
+            if runchat_props.jobs[index].state not in ('QUEUED', 'RUNNING'):
+                runchat_props.jobs.remove(index)
+        runchat_props.active_job_index = min(runchat_props.active_job_index, max(0, len(runchat_props.jobs) - 1))
+        return {'FINISHED'}
+
+
+classes = [
+    RUNCHAT_OT_queue_job,
+    RUNCHAT_OT_cancel_job,
+    RUNCHAT_OT_apply_job_outputs,
+    RUNCHAT_OT_clear_finished_jobs,
+]
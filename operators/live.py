@@ -0,0 +1,398 @@
+# operators/live.py
+
+import bpy
+import time
+from bpy.app.handlers import persistent
+from bpy.types import Operator
+
+from .. import api
+from .. import preferences
+from .. import utils
+from ..utils import workers
+from ..utils import pixel_utils
+from ..utils.capture_cache import IGNORED_IMAGE_PREFIXES
+from ..utils.image_utils import readback_to_rgb8
+from ..utils.upload_cache import hash_bytes
+from . import execution
+
+
+# How often the live controller checks for work (seconds)
+LIVE_TICK = 0.1
+# Scene changes right after a run come from importing its outputs, not the user
+LIVE_SETTLE_SECONDS = 3.0
+LIVE_FILENAME = "live_viewport_capture.jpg"
+
+
+_state = {
+    'active': False,
+    'dirty': False,            # Scene changed since the last capture
+    'last_change': 0.0,        # time.monotonic() of the last relevant change
+    'stage': None,             # None, 'analyse' or 'upload'
+    'future': None,            # Future of the running stage
+    'capture_time': 0.0,       # When the frame in the running stage was read back
+    'signature': None,         # Luma signature of the last submitted frame
+    'pending_signature': None,
+    'executing': False,        # A live-triggered workflow is running
+    'pending': False,          # Changes arrived while the workflow was running
+    'settle_until': 0.0,
+    'rebaseline': False,       # Next capture only refreshes the reference signature
+    'submitted': 0,
+    'skipped': 0,
+}
+
+
+def log_to_blender(message, level='INFO'):
+    print(f"[RunChat Live] {message}")
+
+
+def is_active():
+    """True while live mode is running"""
+    return _state['active']
+
+
+def get_live_inputs(runchat_props):
+    """Indices of image inputs fed by the viewport (upload section open, no file chosen)"""
+    return [
+        index for index, input_prop in enumerate(runchat_props.inputs)
+        if input_prop.data_type.lower() == "image" and input_prop.use_viewport_capture and not input_prop.file_path
+    ]
+
+
+def _set_status(message):
+    try:
+        bpy.context.scene.runchat_properties.live_status = message
+    except Exception:
+        pass
+
+
+def _is_relevant_update(update):
+    """Ignore updates that can't change the viewport: our preview images and plain property edits on the Scene"""
+    id_data = getattr(update, 'id', None)
+    if isinstance(id_data, bpy.types.Image) and id_data.name.startswith(IGNORED_IMAGE_PREFIXES):
+        return False
+    if isinstance(id_data, bpy.types.Scene):
+        return update.is_updated_geometry or update.is_updated_transform or update.is_updated_shading
+    return True
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    if not _state['active']:
+        return
+    try:
+        if not any(_is_relevant_update(update) for update in depsgraph.updates):
+            return
+    except Exception:
+        pass
+    _state['dirty'] = True
+    _state['last_change'] = time.monotonic()
+
+
+@persistent
+def _on_load_post(*args):
+    stop()
+
+
+def start(context):
+    """Start watching the scene; the first capture becomes the reference frame"""
+    if _state['active']:
+        return
+    
+    _state.update({
+        'active': True,
+        # Submit the current view right away
+        'dirty': True,
+        'last_change': 0.0,
+        'stage': None,
+        'future': None,
+        'signature': None,
+        'pending_signature': None,
+        'executing': False,
+        'pending': False,
+        'settle_until': 0.0,
+        'rebaseline': False,
+        'submitted': 0,
+        'skipped': 0,
+    })
+    
+    if _on_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    if _on_load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_on_load_post)
+    if not bpy.app.timers.is_registered(_live_tick):
+        bpy.app.timers.register(_live_tick, first_interval=LIVE_TICK)
+    
+    _set_status("Live: watching viewport")
+    log_to_blender("Live mode started")
+
+
+def stop():
+    """Stop live mode; a stage that is already running finishes but its result is dropped"""
+    if not _state['active']:
+        return
+    _state['active'] = False
+    
+    future = _state['future']
+    if future is not None:
+        future.cancel()
+    _state['future'] = None
+    _state['stage'] = None
+    
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    if bpy.app.timers.is_registered(_live_tick):
+        bpy.app.timers.unregister(_live_tick)
+    
+    _set_status("")
+    log_to_blender(f"Live mode stopped ({_state['submitted']} frames submitted, {_state['skipped']} skipped)")
+
+
+def _analyse_frame(readback, quality, previous_signature, threshold, rebaseline):
+    """Worker: signature + diff against the last submitted frame, encode only if it changed enough"""
+    rgb8, bottom_up = readback_to_rgb8(readback)
+    height, width = rgb8.shape[:2]
+    
+    signature = pixel_utils.luma_signature(rgb8, bottom_up=bottom_up)
+    distance = pixel_utils.signature_distance(previous_signature, signature)
+    result = {'signature': signature, 'distance': distance, 'rebaseline': rebaseline, 'data': None}
+    
+    if rebaseline or distance < threshold:
+        return result
+    
+    data = pixel_utils.encode_rgb8(rgb8, width, height, quality, flip=bottom_up)
+    result['data'] = data
+    result['digest'] = hash_bytes(data)
+    return result
+
+
+def _view3d_override():
+    """Context members of a 3D viewport to draw from; timers run without a screen of their own"""
+    wm = bpy.context.window_manager
+    for window in wm.windows:
+        for area in window.screen.areas:
+            if area.type != 'VIEW_3D':
+                continue
+            for region in area.regions:
+                if region.type == 'WINDOW':
+                    return {'window': window, 'screen': window.screen, 'area': area, 'region': region}
+    return None
+
+
+def _start_capture(runchat_props):
+    """Read back a reduced-resolution frame on the main thread and analyse it on the encode pool"""
+    scale = runchat_props.live_resolution_scale
+    width = max(64, int(runchat_props.viewport_width * scale))
+    height = max(64, int(runchat_props.viewport_height * scale))
+    
+    override = _view3d_override()
+    readback = None
+    if override is not None:
+        # Offscreen draw only: an OpenGL render per frame would write files and need a scene camera
+        with bpy.context.temp_override(**override):
+            readback = utils.read_viewport_pixels(width, height, fallback=False)
+    if readback is None:
+        log_to_blender("No 3D viewport to capture from, stopping live mode", 'ERROR')
+        stop()
+        _set_status("Live: stopped, viewport capture failed")
+        return
+    
+    rebaseline = _state['rebaseline']
+    _state['rebaseline'] = False
+    _state['capture_time'] = time.monotonic()
+    _state['stage'] = 'analyse'
+    _state['future'] = workers.submit(
+        'encode', _analyse_frame, readback, runchat_props.viewport_quality,
+        _state['signature'], runchat_props.live_threshold, rebaseline
+    )
+
+
+def _is_stale():
+    """The scene changed after the frame in flight was captured"""
+    return _state['dirty'] and _state['last_change'] > _state['capture_time']
+
+
+def _finish_stage(runchat_props, future):
+    stage = _state['stage']
+    _state['stage'] = None
+    
+    try:
+        result = future.result()
+    except Exception as e:
+        log_to_blender(f"Live {stage} failed: {e}", 'ERROR')
+        _set_status(f"Live: {stage} failed")
+        return
+    
+    if stage == 'analyse':
+        if result['rebaseline']:
+            _state['signature'] = result['signature']
+            _set_status("Live: watching viewport")
+            return
+        
+        if result['data'] is None:
+            _state['skipped'] += 1
+            _set_status(f"Live: change below threshold ({result['distance']:.3f})")
+            return
+        
+        if _is_stale():
+            # A newer frame supersedes this one, drop it before spending an upload
+            _set_status("Live: scene changed, recapturing...")
+            return
+        
+        api_key = preferences.get_api_key()
+        if not api_key:
+            _set_status("Live: no API key set")
+            return
+        
+        _state['pending_signature'] = result['signature']
+        _state['stage'] = 'upload'
+        _state['future'] = workers.submit(
+            'upload', api.RunChatAPI.upload_bytes, result['data'], LIVE_FILENAME, api_key, result['digest']
+        )
+        _set_status(f"Live: uploading frame (change {result['distance']:.3f})...")
+        return
+    
+    # Upload finished
+    uploaded_url = result
+    if not uploaded_url:
+        _set_status("Live: upload failed")
+        return
+    
+    for index in get_live_inputs(runchat_props):
+        input_prop = runchat_props.inputs[index]
+        input_prop.uploaded_url = uploaded_url
+        input_prop.text_value = uploaded_url
+        input_prop.upload_status = "Live frame uploaded"
+    
+    _state['signature'] = _state['pending_signature']
+    
+    if _is_stale():
+        _set_status("Live: scene changed, recapturing...")
+        return
+    
+    _run_workflow()
+
+
+def _run_workflow():
+    """Start the workflow through the regular execute operator"""
+    wm = bpy.context.window_manager
+    window = bpy.context.window or (wm.windows[0] if wm.windows else None)
+    
+    try:
+        if window is not None:
+            with bpy.context.temp_override(window=window, screen=window.screen):
+                result = bpy.ops.runchat.execute()
+        else:
+            result = bpy.ops.runchat.execute()
+    except Exception as e:
+        log_to_blender(f"Could not start workflow: {e}", 'ERROR')
+        _set_status("Live: execution failed to start")
+        return
+    
+    if 'FINISHED' in result:
+        _state['executing'] = True
+        _state['submitted'] += 1
+        _set_status(f"Live: running workflow (frame {_state['submitted']})...")
+    else:
+        _set_status("Live: execution failed to start")
+
+
+def _live_tick():
+    """Main-thread state machine: debounce -> capture -> analyse -> upload -> execute"""
+    if not _state['active']:
+        return None
+    
+    try:
+        runchat_props = bpy.context.scene.runchat_properties
+    except AttributeError:
+        return LIVE_TICK
+    
+    now = time.monotonic()
+    
+    # A capture or upload stage is running
+    future = _state['future']
+    if future is not None:
+        if not future.done():
+            return LIVE_TICK
+        _state['future'] = None
+        _finish_stage(runchat_props, future)
+        return LIVE_TICK
+    
+    # One workflow in flight at a time; changes made meanwhile are coalesced into one follow-up
+    if _state['executing']:
+        if execution.is_execution_running():
+            return LIVE_TICK
+        _state['executing'] = False
+        _state['pending'] = _state['dirty']
+        _state['settle_until'] = now + LIVE_SETTLE_SECONDS
+        return LIVE_TICK
+    
+    if now < _state['settle_until']:
+        # Outputs being imported into the scene
+        _state['dirty'] = False
+        return LIVE_TICK
+    
+    if _state['settle_until']:
+        _state['settle_until'] = 0.0
+        if _state['pending']:
+            _state['dirty'] = True
+        else:
+            # Take the scene with imported outputs as the new reference
+            _state['rebaseline'] = True
+        _state['pending'] = False
+    
+    if not (_state['dirty'] or _state['rebaseline']):
+        return LIVE_TICK * 2
+    
+    # Debounce: wait until the scene has been still for a moment
+    if _state['dirty'] and now - _state['last_change'] < runchat_props.live_debounce:
+        return LIVE_TICK
+    
+    # A manual execution is running
+    if execution.is_execution_running():
+        return LIVE_TICK
+    
+    _state['dirty'] = False
+    _start_capture(runchat_props)
+    # A failed capture stops live mode
+    return LIVE_TICK if _state['active'] else None
+
+
+class RUNCHAT_OT_toggle_live_mode(Operator):
+    """Re-run the workflow automatically when the viewport changes"""
+    bl_idname = "runchat.toggle_live_mode"
+    bl_label = "Toggle Live Mode"
+    
+    def execute(self, context):
+        if is_active():
+            stop()
+            self.report({'INFO'}, "Live mode stopped")
+            return {'FINISHED'}
+        
+        runchat_props = context.scene.runchat_properties
+        
+        if not runchat_props.schema_loaded:
+            self.report({'ERROR'}, "Please load schema first")
+            return {'CANCELLED'}
+        
+        if not preferences.get_api_key():
+            self.report({'ERROR'}, "Please set your RunChat API key in addon preferences")
+            return {'CANCELLED'}
+        
+        if not get_live_inputs(runchat_props):
+            self.report({'ERROR'}, "Live mode needs an image input set to viewport capture")
+            return {'CANCELLED'}
+        
+        if not pixel_utils.numpy_available():
+            self.report({'ERROR'}, "Live mode requires numpy")
+            return {'CANCELLED'}
+        
+        start(context)
+        self.report({'INFO'}, "Live mode started")
+        return {'FINISHED'}
+
+
+classes = [
+    RUNCHAT_OT_toggle_live_mode,
+]
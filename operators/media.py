@@ -3,17 +3,25 @@
 import bpy
 import webbrowser
 import os
-import tempfile
-import time
 from bpy.types import Operator
 from bpy.props import IntProperty, StringProperty
 
 from .. import utils
 from .. import preferences
-from ..utils.dependencies import get_requests
+from ..utils.asset_cache import get_asset_cache
 
-# Get bundled requests
-requests, _ = get_requests()
+
+def print_download_progress(label, step=0.1):
+    """on_progress callback for transport.download_to_file that prints every 10% (every 10 MB without a size)"""
+    state = {'next': step}
+    
+    def report(done, total):
+        fraction = done / total if total else done / (100 * 1024 * 1024)
+        if fraction >= state['next']:
+            size = f"{done / (1024 * 1024):.1f} MB"
+            print(f"{label} download: {int(fraction * 100)}% ({size})" if total else f"{label} download: {size}")
+            state['next'] = (int(fraction / step) + 1) * step
+    return report
 
 
 class RUNCHAT_OT_view_image(Operator):
@@ -22,6 +30,10 @@ class RUNCHAT_OT_view_image(Operator):
     bl_label = "View Image"
     
     output_index: IntProperty()
+    # Local copy of the output, set by the import scheduler after it prefetched the URL
+    filepath: StringProperty(options={'SKIP_SAVE'})
+    # Image the import scheduler already filled from pixels it decoded in the background
+    image_name: StringProperty(options={'SKIP_SAVE'})
     
     def execute(self, context):
         scene = context.scene
@@ -36,10 +48,16 @@ class RUNCHAT_OT_view_image(Operator):
                     self.report({'INFO'}, f"Output property value: '{output_prop.value[:100]}...'")
                     
                     # Check if value is a URL or base64 data
-                    if output_prop.value.startswith('http'):
+                    if self.image_name and self.image_name in bpy.data.images:
+                        image = bpy.data.images[self.image_name]
+                    elif self.filepath:
+                        self.report({'INFO'}, "Loading prefetched image...")
+                        image = utils.load_image_from_file(self.filepath, output_prop.name, operator=self)
+                    elif output_prop.value.startswith('http'):
+                        # Downloaded and decoded in the background; the image opens once it is ready
+                        utils.view_image_from_url(output_prop.value, output_prop.name)
                         self.report({'INFO'}, "Loading image from URL...")
-                        # Load image from URL
-                        image = utils.load_image_from_url(output_prop.value, output_prop.name, operator=self)
+                        return {'FINISHED'}
                     else:
                         self.report({'INFO'}, "Loading image from base64...")
                         # Load image data (assuming base64)
@@ -108,13 +126,8 @@ class RUNCHAT_OT_save_image(Operator):
                     full_path = os.path.join(save_path, filename)
                     
                     if output_prop.value.startswith('http'):
-                        # Download and save image from URL
-                        response = requests.get(output_prop.value, timeout=30)
-                        response.raise_for_status()
-                        
-                        with open(full_path, 'wb') as f:
-                            f.write(response.content)
-                        
+                        # Link or copy the image out of the asset cache (downloading it on a miss)
+                        get_asset_cache().copy_out(output_prop.value, full_path, timeout=30)
                         saved_path = full_path
                     else:
                         # Save base64 image data to disk
@@ -299,10 +312,6 @@ class RUNCHAT_OT_save_video(Operator):
             output_prop = runchat_props.outputs[self.output_index]
             if output_prop.value:
                 try:
-                    # Download video
-                    response = requests.get(output_prop.value, timeout=60)
-                    response.raise_for_status()
-                    
                     # Determine file extension
                     url_lower = output_prop.value.lower()
                     if '.mp4' in url_lower:
@@ -333,8 +342,9 @@ class RUNCHAT_OT_save_video(Operator):
                     filename = f"{output_prop.name}{ext}"
                     full_path = os.path.join(save_path, filename)
                     
-                    with open(full_path, 'wb') as f:
-                        f.write(response.content)
+                    # Link or copy the video out of the asset cache (downloading it on a miss)
+                    get_asset_cache().copy_out(output_prop.value, full_path, timeout=60,
+                                               on_progress=print_download_progress("Video"))
                     
                     self.report({'INFO'}, f"Video saved to: {full_path}")
                 except Exception as e:
@@ -347,6 +357,10 @@ def force_video_sequencer_interface():
     """Force the Video Sequencer interface by opening a new window"""
     print("=== OPENING NEW VIDEO SEQUENCER WINDOW ===")
     
+    # Headless runs have no windows to open or convert
+    if utils.get_screen() is None:
+        return "No user interface available, video not shown"
+    
     try:
         # Open a new window
         bpy.ops.wm.window_new()
@@ -420,7 +434,8 @@ def force_video_sequencer_interface_fallback():
     largest_area = None
     largest_size = 0
     
-    for area in bpy.context.screen.areas:
+    screen = utils.get_screen()
+    for area in screen.areas if screen else []:
         area_size = area.width * area.height
         # Skip essential areas and small areas
         if (area.type not in ['PROPERTIES', 'OUTLINER', 'FILE_BROWSER', 'INFO'] 
@@ -467,6 +482,8 @@ class RUNCHAT_OT_import_model(Operator):
     bl_label = "Import Model"
     
     output_index: IntProperty()
+    # Local copy of the output, set by the import scheduler after it prefetched the URL
+    filepath: StringProperty(options={'SKIP_SAVE'})
     
     def execute(self, context):
         scene = context.scene
@@ -476,10 +493,6 @@ class RUNCHAT_OT_import_model(Operator):
             output_prop = runchat_props.outputs[self.output_index]
             if output_prop.value:
                 try:
-                    # Download model file
-                    response = requests.get(output_prop.value, timeout=60)
-                    response.raise_for_status()
-                    
                     # Determine file extension
                     url_lower = output_prop.value.lower()
                     if '.gltf' in url_lower or '.glb' in url_lower:
@@ -501,18 +514,16 @@ class RUNCHAT_OT_import_model(Operator):
                         self.report({'ERROR'}, f"Unsupported model format: {output_prop.value}")
                         return {'CANCELLED'}
                     
-                    # Create temporary file
-                    with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as temp_file:
-                        temp_file.write(response.content)
-                        temp_filepath = temp_file.name
+                    if self.filepath:
+                        # Already prefetched into the asset cache by the import scheduler
+                        model_filepath = self.filepath
+                    else:
+                        model_filepath = get_asset_cache().fetch(output_prop.value, timeout=60, default_ext=ext,
+                                                                 on_progress=print_download_progress("Model"))
                     
-                    try:
-                        # Import the model
-                        import_func(temp_filepath)
-                        self.report({'INFO'}, f"Successfully imported model '{output_prop.name}'")
-                    finally:
-                        # Clean up
-                        os.unlink(temp_filepath)
+                    # Import the model
+                    import_func(model_filepath)
+                    self.report({'INFO'}, f"Successfully imported model '{output_prop.name}'")
                         
                 except Exception as e:
                     self.report({'ERROR'}, f"Error importing model: {e}")
@@ -603,6 +614,8 @@ class RUNCHAT_OT_import_video(Operator):
     bl_label = "Import to Video Sequencer"
     
     output_index: IntProperty()
+    # Local copy of the output, set by the import scheduler after it prefetched the URL
+    filepath: StringProperty(options={'SKIP_SAVE'})
     
     def execute(self, context):
         scene = context.scene
@@ -621,110 +634,94 @@ class RUNCHAT_OT_import_video(Operator):
         self.report({'INFO'}, f"Importing video: {output_prop.name}")
         
         try:
-            # Download the video to a temporary file
-            print(f"Downloading video from: {output_prop.value}")
-            self.report({'INFO'}, "Downloading video...")
-            
-            response = requests.get(output_prop.value, timeout=60)
-            response.raise_for_status()
-            print(f"Video downloaded successfully. Size: {len(response.content)} bytes")
-            
-            # Determine file extension
-            url_lower = output_prop.value.lower()
-            if '.mp4' in url_lower:
-                ext = '.mp4'
-            elif '.mov' in url_lower:
-                ext = '.mov'
-            elif '.avi' in url_lower:
-                ext = '.avi'
-            elif '.mkv' in url_lower:
-                ext = '.mkv'
-            elif '.webm' in url_lower:
-                ext = '.webm'
-            elif '.m4v' in url_lower:
-                ext = '.m4v'
+            if self.filepath:
+                # Prefetched into the asset cache by the import scheduler
+                permanent_filepath = self.filepath
+                print(f"Using prefetched video: {permanent_filepath}")
             else:
-                ext = '.mp4'  # Default
+                # Determine file extension
+                url_lower = output_prop.value.lower()
+                if '.mp4' in url_lower:
+                    ext = '.mp4'
+                elif '.mov' in url_lower:
+                    ext = '.mov'
+                elif '.avi' in url_lower:
+                    ext = '.avi'
+                elif '.mkv' in url_lower:
+                    ext = '.mkv'
+                elif '.webm' in url_lower:
+                    ext = '.webm'
+                elif '.m4v' in url_lower:
+                    ext = '.m4v'
+                else:
+                    ext = '.mp4'  # Default
+                
+                print(f"Detected video format: {ext}")
+                
+                # Fetch the video into the asset cache, which keeps it instead of the temp directory
+                print(f"Downloading video from: {output_prop.value}")
+                self.report({'INFO'}, "Downloading video...")
+                
+                permanent_filepath = get_asset_cache().fetch(output_prop.value, timeout=60, default_ext=ext,
+                                                             on_progress=print_download_progress("Video"))
+                print(f"Video cached at: {permanent_filepath}")
+            
+            # Force Video Sequencer interface FIRST
+            status_message = force_video_sequencer_interface()
+            
+            # Ensure we have a Video Sequencer scene setup
+            print(f"Scene has sequence editor: {scene.sequence_editor is not None}")
+            if not scene.sequence_editor:
+                print("Creating sequence editor...")
+                scene.sequence_editor_create()
+                self.report({'INFO'}, "Created Video Sequencer for scene")
             
-            print(f"Detected video format: {ext}")
+            # Find or use the sequence editor area
+            sequencer_area = None
+            for area in bpy.context.screen.areas:
+                if area.type == 'SEQUENCE_EDITOR':
+                    sequencer_area = area
+                    break
             
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as temp_file:
-                temp_file.write(response.content)
-                temp_filepath = temp_file.name
+            if not sequencer_area:
+                raise Exception("Could not find Sequence Editor area after forcing interface")
             
-            print(f"Video saved to temporary file: {temp_filepath}")
+            print(f"Using sequence editor area: {sequencer_area}")
             
-            # Copy to a more permanent location in user's temp directory
-            import shutil
-            permanent_filename = f"runchat_video_{output_prop.name}_{int(time.time())}{ext}"
-            permanent_filepath = os.path.join(tempfile.gettempdir(), permanent_filename)
-            shutil.copy2(temp_filepath, permanent_filepath)
-            print(f"Video copied to permanent location: {permanent_filepath}")
+            # Get the space data for proper context
+            sequencer_space = None
+            for space in sequencer_area.spaces:
+                if space.type == 'SEQUENCE_EDITOR':
+                    sequencer_space = space
+                    break
+            
+            # Set the context and import the video
+            with bpy.context.temp_override(area=sequencer_area, space_data=sequencer_space):
+                # Import the video into the sequencer
+                print("Adding movie strip to sequencer...")
+                bpy.ops.sequencer.movie_strip_add(
+                    filepath=permanent_filepath,
+                    frame_start=1,
+                    channel=1
+                )
+                print("Movie strip added successfully")
+            
+            # The strip reads the video from the cache, so eviction must leave the file alone
+            get_asset_cache().pin(permanent_filepath)
+            
+            # Set the scene frame range to match the video
+            if scene.sequence_editor.sequences:
+                last_sequence = scene.sequence_editor.sequences[-1]
+                print(f"Video sequence length: {last_sequence.frame_final_end} frames")
+                scene.frame_end = last_sequence.frame_final_end
+                self.report({'INFO'}, f"Set scene length to {last_sequence.frame_final_end} frames")
+            
+            success_msg = f"Successfully imported video '{output_prop.name}' to Video Sequencer"
+            print(success_msg)
+            self.report({'INFO'}, success_msg)
+            self.report({'INFO'}, status_message)
+            self.report({'INFO'}, f"Video file location: {permanent_filepath}")
             
-            try:
-                # Force Video Sequencer interface FIRST
-                status_message = force_video_sequencer_interface()
-                
-                # Ensure we have a Video Sequencer scene setup
-                print(f"Scene has sequence editor: {scene.sequence_editor is not None}")
-                if not scene.sequence_editor:
-                    print("Creating sequence editor...")
-                    scene.sequence_editor_create()
-                    self.report({'INFO'}, "Created Video Sequencer for scene")
-                
-                # Find or use the sequence editor area
-                sequencer_area = None
-                for area in bpy.context.screen.areas:
-                    if area.type == 'SEQUENCE_EDITOR':
-                        sequencer_area = area
-                        break
-                
-                if not sequencer_area:
-                    raise Exception("Could not find Sequence Editor area after forcing interface")
-                
-                print(f"Using sequence editor area: {sequencer_area}")
-                
-                # Get the space data for proper context
-                sequencer_space = None
-                for space in sequencer_area.spaces:
-                    if space.type == 'SEQUENCE_EDITOR':
-                        sequencer_space = space
-                        break
-                
-                # Set the context and import the video
-                with bpy.context.temp_override(area=sequencer_area, space_data=sequencer_space):
-                    # Import the video into the sequencer
-                    print("Adding movie strip to sequencer...")
-                    bpy.ops.sequencer.movie_strip_add(
-                        filepath=permanent_filepath,
-                        frame_start=1,
-                        channel=1
-                    )
-                    print("Movie strip added successfully")
-                
-                # Set the scene frame range to match the video
-                if scene.sequence_editor.sequences:
-                    last_sequence = scene.sequence_editor.sequences[-1]
-                    print(f"Video sequence length: {last_sequence.frame_final_end} frames")
-                    scene.frame_end = last_sequence.frame_final_end
-                    self.report({'INFO'}, f"Set scene length to {last_sequence.frame_final_end} frames")
-                
-                success_msg = f"Successfully imported video '{output_prop.name}' to Video Sequencer"
-                print(success_msg)
-                self.report({'INFO'}, success_msg)
-                self.report({'INFO'}, status_message)
-                self.report({'INFO'}, f"Video file location: {permanent_filepath}")
-                
-            finally:
-                # Clean up only the temporary file, keep the permanent one
-                try:
-                    os.unlink(temp_filepath)
-                    print(f"Cleaned up temporary file: {temp_filepath}")
-                    print(f"Permanent video file kept at: {permanent_filepath}")
-                except Exception as cleanup_error:
-                    print(f"Failed to cleanup temp file: {cleanup_error}")
-                    
         except Exception as e:
             error_msg = f"Error importing video: {e}"
             print(error_msg)
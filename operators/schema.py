@@ -6,6 +6,7 @@ from bpy.props import StringProperty
 
 from .. import api
 from .. import preferences
+from ..utils import result_cache
 
 
 class RUNCHAT_OT_load_schema(Operator):
@@ -33,6 +34,7 @@ class RUNCHAT_OT_load_schema(Operator):
         
         # Reset state
         runchat_props.schema_loaded = False
+        runchat_props.schema_version = ""
         runchat_props.status = "Loading schema..."
         
         # Clear existing inputs/outputs and instance ID (fresh start for new workflow)
@@ -59,6 +61,8 @@ class RUNCHAT_OT_load_schema(Operator):
                 
                 runchat_props.status = "Parsing schema..."
                 
+                runchat_props.schema_version = result_cache.schema_version(raw_schema)
+                
                 # Parse the schema into a consistent format
                 try:
                     schema = self.parse_schema_format(raw_schema)
@@ -254,10 +258,10 @@ class RUNCHAT_OT_test_connection(Operator):
         try:
             runchat_props.status = "Testing connection..."
             
-            # Load bundled requests
+            # Load the shared HTTP transport (bundled requests)
             try:
-                from ..utils.dependencies import get_requests
-                requests, _ = get_requests()
+                from ..utils import transport
+                transport.get_session()
                 print("✅ Bundled requests loaded successfully")
             except ImportError as e:
                 runchat_props.status = "Missing bundled dependencies"
@@ -269,7 +273,7 @@ class RUNCHAT_OT_test_connection(Operator):
             print("🔍 Testing basic connectivity...")
             try:
                 # Try a simple HTTP request to a reliable server
-                test_response = requests.get("https://httpbin.org/get", timeout=5)
+                test_response = transport.get("https://httpbin.org/get", timeout=5)
                 print(f"✅ Basic internet connectivity: OK (status: {test_response.status_code})")
             except Exception as e:
                 print(f"❌ Basic connectivity test failed: {e}")
@@ -285,15 +289,8 @@ class RUNCHAT_OT_test_connection(Operator):
             print(f"   URL: {url}")
             print(f"   Headers: {headers}")
             
-            # Configure requests session with better settings for Blender
-            session = requests.Session()
-            session.headers.update(headers)
-            
-            # Add SSL and proxy handling
-            import ssl
-            session.verify = True  # Verify SSL certificates
-            
-            response = session.get(url, timeout=15)
+            # Use the shared pooled session (SSL certificates are verified by default)
+            response = transport.get(url, headers=headers, timeout=15)
             
             print(f"📡 Response received:")
             print(f"   Status: {response.status_code}")
@@ -0,0 +1,400 @@
+# operators/sweep.py
+
+import bpy
+import itertools
+import json
+import math
+import time
+from bpy.types import Operator
+from bpy.props import IntProperty
+
+from .. import api
+from .. import utils
+from ..utils import cancellation
+from ..utils import dispatch
+from ..utils import pixel_utils
+from ..utils import transport
+from ..utils import workers
+from .batch import find_image_url, run_batch_workflow
+from .execution import RUNCHAT_OT_execute, collect_workflow_outputs, set_input_fields
+
+
+# Upper bound on the cartesian product, a typo in a range shouldn't start thousands of runs
+MAX_SWEEP_CELLS = 100
+SWEEP_TICK = 0.1
+GRID_IMAGE_NAME = "Runchat_Sweep_Grid"
+
+# State of the running sweep, or None
+_sweep = None
+
+
+def log_to_blender(message, level='INFO'):
+    print(f"[RunChat Sweep] {message}")
+
+
+def is_sweep_running():
+    return _sweep is not None
+
+
+def format_number(value):
+    """Shortest text for a range value (2.0 -> '2', 0.30000000000000004 -> '0.3')"""
+    return f"{round(value, 6):g}"
+
+
+def parse_sweep_values(spec):
+    """
+    Values of one sweep axis. Entries are separated by |; an entry written start..stop
+    or start..stop:step expands to an inclusive numeric range.
+    Raises ValueError for a malformed range.
+    """
+    values = []
+    for entry in spec.split('|'):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if '..' not in entry:
+            values.append(entry)
+            continue
+        
+        bounds, _, step_text = entry.partition(':')
+        start_text, _, stop_text = bounds.partition('..')
+        start, stop = float(start_text), float(stop_text)
+        step = float(step_text) if step_text else 1.0
+        if step <= 0:
+            raise ValueError(f"Step must be positive in '{entry}'")
+        
+        count = int(math.floor(abs(stop - start) / step + 1e-9)) + 1
+        if count > MAX_SWEEP_CELLS:
+            raise ValueError(f"Range '{entry}' has more than {MAX_SWEEP_CELLS} values")
+        direction = 1 if stop >= start else -1
+        values.extend(format_number(start + direction * step * i) for i in range(count))
+    return values
+
+
+def get_sweep_axes(runchat_props):
+    """(input name, param_id, values) for every input with sweep values. Raises ValueError on bad input."""
+    axes = []
+    for input_prop in runchat_props.inputs:
+        if not input_prop.sweep_values.strip():
+            continue
+        try:
+            values = parse_sweep_values(input_prop.sweep_values)
+        except ValueError as e:
+            raise ValueError(f"{input_prop.name}: {e}")
+        if values:
+            axes.append((input_prop.name, input_prop.param_id, values))
+    return axes
+
+
+def run_sweep_cell(runchat_id, api_key, inputs, shared_uploads):
+    """Worker: run one combination and fetch its first image output for the grid"""
+    result = run_batch_workflow(runchat_id, api_key, inputs, shared_uploads)
+    image = None
+    if result and not (isinstance(result, dict) and result.get('error')):
+        image_url = find_image_url(result)
+        if image_url:
+            try:
+                response = transport.get(image_url, timeout=120)
+                response.raise_for_status()
+                image = response.content
+            except Exception as e:
+                # The cell's outputs are still valid, it just leaves a blank grid cell
+                log_to_blender(f"Could not fetch grid image: {e}", 'WARNING')
+    return {'result': result, 'image': image}
+
+
+def start_sweep(operator, context, runchat_props, api_key, inputs, upload_jobs):
+    """Queue every combination of the sweep axes on the batch pool (called from runchat.execute)"""
+    global _sweep
+    
+    if _sweep is not None:
+        operator.report({'WARNING'}, "A sweep is already running")
+        return {'CANCELLED'}
+    
+    try:
+        axes = get_sweep_axes(runchat_props)
+    except ValueError as e:
+        operator.report({'ERROR'}, f"Invalid sweep values for {e}")
+        return {'CANCELLED'}
+    
+    combinations = list(itertools.product(*(values for _, _, values in axes)))
+    if len(combinations) > MAX_SWEEP_CELLS:
+        operator.report({'ERROR'}, f"Sweep has {len(combinations)} combinations, the limit is {MAX_SWEEP_CELLS}")
+        return {'CANCELLED'}
+    
+    # One token for the whole sweep: cancelling it aborts every cell's in-flight requests
+    token = cancellation.CancelToken("Sweep")
+    
+    # Image inputs are uploaded once and every cell waits on the same futures
+    dispatch.begin_job()
+    shared_uploads = {}
+    pending_uploads = []
+    upload = cancellation.bind(token, RUNCHAT_OT_execute.upload_input_static)
+    for job in upload_jobs:
+        future = workers.submit('upload', upload, runchat_props, job, api_key)
+        shared_uploads[job['key']] = future
+        pending_uploads.append((job, future))
+    
+    workers.configure('batch', runchat_props.batch_max_parallel)
+    runchat_props.sweep_cells.clear()
+    runchat_props.sweep_grid_image = ""
+    runchat_props.has_credit_error = False
+    runchat_props.credit_error_message = ""
+    
+    cells = []
+    for index, combination in enumerate(combinations):
+        cell_inputs = dict(inputs)
+        values = {}
+        for (name, param_id, _), value in zip(axes, combination):
+            cell_inputs[param_id] = value
+            values[name] = value
+        
+        item = runchat_props.sweep_cells.add()
+        item.label = ", ".join(f"{name}={value}" for name, value in values.items())
+        item.values_json = json.dumps(values)
+        item.status = "Queued"
+        for output_prop in runchat_props.outputs:
+            slot = item.outputs.add()
+            slot.param_id = output_prop.param_id
+            slot.node_id = output_prop.node_id
+            slot.name = output_prop.name
+            slot.data_type = output_prop.data_type
+        
+        future = workers.submit('batch', cancellation.bind(token, run_sweep_cell),
+                                runchat_props.runchat_id, api_key, cell_inputs, shared_uploads)
+        cells.append({'index': index, 'label': item.label, 'future': future, 'stage': 'running', 'image': None})
+    
+    # The last axis runs along a row, so two axes read as a table
+    if len(axes) >= 2:
+        columns = len(axes[-1][2])
+    else:
+        columns = max(1, math.ceil(math.sqrt(len(cells))))
+    
+    _sweep = {
+        'scene_name': context.scene.name,
+        'cells': cells,
+        'pending_uploads': pending_uploads,
+        'columns': columns,
+        'cell_size': runchat_props.sweep_cell_size,
+        'grid_future': None,
+        'token': token,
+        'start_time': time.time(),
+    }
+    update_status(runchat_props)
+    bpy.app.timers.register(_sweep_tick, first_interval=SWEEP_TICK)
+    
+    log_to_blender(f"Started sweep over {len(axes)} inputs: {len(cells)} runs, {runchat_props.batch_max_parallel} parallel")
+    operator.report({'INFO'}, f"Sweep started: {len(cells)} runs")
+    return {'FINISHED'}
+
+
+def update_status(runchat_props):
+    cells = _sweep['cells']
+    done = sum(1 for cell in cells if cell['stage'] == 'done')
+    failed = sum(1 for cell in cells if cell['stage'] == 'failed')
+    runchat_props.sweep_status = f"Sweep: {done + failed}/{len(cells)} finished, {failed} failed"
+
+
+def _apply_uploads(runchat_props):
+    """Show finished shared uploads on their inputs"""
+    still_pending = []
+    for job, future in _sweep['pending_uploads']:
+        if not future.done():
+            still_pending.append((job, future))
+            continue
+        try:
+            uploaded_url = future.result()
+        except Exception:
+            uploaded_url = None
+        if uploaded_url:
+            set_input_fields(runchat_props, job['index'], uploaded_url=uploaded_url,
+                             text_value=uploaded_url, upload_status="Upload successful!")
+        else:
+            set_input_fields(runchat_props, job['index'], upload_status="Upload failed")
+    _sweep['pending_uploads'] = still_pending
+
+
+def _finish_cell(runchat_props, cell):
+    """Store one combination's outputs in its cell entry"""
+    item = runchat_props.sweep_cells[cell['index']] if cell['index'] < len(runchat_props.sweep_cells) else None
+    try:
+        outcome = cell['future'].result()
+    except Exception as e:
+        cell['stage'] = 'failed'
+        if item is not None:
+            item.status = f"Failed: {e}"
+        log_to_blender(f"{cell['label']}: {e}", 'ERROR')
+        return
+    
+    result = outcome['result']
+    if not result or (isinstance(result, dict) and result.get('error')):
+        cell['stage'] = 'failed'
+        message = result.get('message', 'Unknown error occurred') if isinstance(result, dict) else "No result returned"
+        if isinstance(result, dict) and result.get('is_credit_error'):
+            runchat_props.has_credit_error = True
+            runchat_props.credit_error_message = api.format_credit_error(message)
+        if item is not None:
+            item.status = f"Failed: {message}"
+        return
+    
+    cell['stage'] = 'done'
+    cell['image'] = outcome['image']
+    if item is not None:
+        for output_id, output_value in collect_workflow_outputs(result):
+            for slot in item.outputs:
+                if slot.param_id == output_id:
+                    RUNCHAT_OT_execute.process_output_static(slot, output_value, output_id, runchat_props)
+                    break
+        item.status = "Complete"
+
+
+def _sweep_tick():
+    """Timer: collect finished cells, then build the grid image once all are in"""
+    if _sweep is None:
+        return None
+    
+    scene = bpy.data.scenes.get(_sweep['scene_name'])
+    if scene is None:
+        stop_sweep()
+        return None
+    runchat_props = scene.runchat_properties
+    
+    _apply_uploads(runchat_props)
+    for cell in _sweep['cells']:
+        if cell['stage'] == 'running' and cell['future'].done():
+            _finish_cell(runchat_props, cell)
+    update_status(runchat_props)
+    
+    try:
+        for area in bpy.context.screen.areas:
+            if area.type == 'PROPERTIES':
+                area.tag_redraw()
+    except AttributeError:
+        pass
+    
+    if any(cell['stage'] == 'running' for cell in _sweep['cells']):
+        return SWEEP_TICK
+    
+    images = [cell['image'] for cell in _sweep['cells']]
+    if _sweep['grid_future'] is None and any(images):
+        runchat_props.sweep_status = "Building sweep grid..."
+        labels = [cell['label'] for cell in _sweep['cells']]
+        _sweep['grid_future'] = workers.submit(
+            'encode', pixel_utils.compose_grid, images, _sweep['columns'], _sweep['cell_size'], labels
+        )
+        return SWEEP_TICK
+    
+    if _sweep['grid_future'] is not None:
+        if not _sweep['grid_future'].done():
+            return SWEEP_TICK
+        _load_grid(runchat_props, _sweep['grid_future'])
+    
+    update_status(runchat_props)
+    runchat_props.sweep_status += f" in {time.time() - _sweep['start_time']:.1f}s"
+    log_to_blender(runchat_props.sweep_status)
+    stop_sweep()
+    return None
+
+
+def _load_grid(runchat_props, future):
+    try:
+        grid_data = future.result()
+    except Exception as e:
+        log_to_blender(f"Could not build sweep grid: {e}", 'ERROR')
+        return
+    
+    # The registry updates the previous sweep's grid in place instead of adding Runchat_Sweep_Grid.001
+    image = utils.load_image_from_bytes(grid_data, GRID_IMAGE_NAME)
+    if image is not None:
+        image.pack()
+        runchat_props.sweep_grid_image = image.name
+
+
+def stop_sweep():
+    """Drop the running sweep and abort its in-flight requests"""
+    global _sweep
+    if _sweep is None:
+        return
+    
+    _sweep['token'].cancel()
+    for _, future in _sweep['pending_uploads']:
+        future.cancel()
+    for cell in _sweep['cells']:
+        if cell['stage'] == 'running':
+            cell['future'].cancel()
+            cell['stage'] = 'failed'
+    if _sweep['grid_future'] is not None:
+        _sweep['grid_future'].cancel()
+    
+    _sweep = None
+    dispatch.end_job()
+    if bpy.app.timers.is_registered(_sweep_tick):
+        bpy.app.timers.unregister(_sweep_tick)
+
+
+class RUNCHAT_OT_cancel_sweep(Operator):
+    """Cancel the running parameter sweep"""
+    bl_idname = "runchat.cancel_sweep"
+    bl_label = "Cancel Sweep"
+    
+    def execute(self, context):
+        if _sweep is None:
+            return {'CANCELLED'}
+        
+        runchat_props = context.scene.runchat_properties
+        for cell in _sweep['cells']:
+            if cell['stage'] == 'running' and cell['index'] < len(runchat_props.sweep_cells):
+                runchat_props.sweep_cells[cell['index']].status = "Cancelled"
+        stop_sweep()
+        runchat_props.sweep_status += " (cancelled)"
+        self.report({'WARNING'}, "Sweep cancelled")
+        return {'FINISHED'}
+
+
+class RUNCHAT_OT_view_sweep_grid(Operator):
+    """Open the sweep grid image in the Image Editor"""
+    bl_idname = "runchat.view_sweep_grid"
+    bl_label = "View Sweep Grid"
+    
+    def execute(self, context):
+        image_name = context.scene.runchat_properties.sweep_grid_image
+        if not image_name or image_name not in bpy.data.images:
+            self.report({'ERROR'}, "No sweep grid image")
+            return {'CANCELLED'}
+        
+        if not utils.setup_image_viewer(image_name):
+            bpy.ops.runchat.popup_image_viewer('INVOKE_DEFAULT', image_name=image_name)
+        return {'FINISHED'}
+
+
+class RUNCHAT_OT_view_sweep_output(Operator):
+    """Open a sweep cell's output image in the Image Editor"""
+    bl_idname = "runchat.view_sweep_output"
+    bl_label = "View Sweep Output"
+    
+    cell_index: IntProperty()
+    output_index: IntProperty()
+    
+    def execute(self, context):
+        runchat_props = context.scene.runchat_properties
+        if self.cell_index >= len(runchat_props.sweep_cells):
+            self.report({'ERROR'}, f"Invalid sweep cell index: {self.cell_index}")
+            return {'CANCELLED'}
+        
+        item = runchat_props.sweep_cells[self.cell_index]
+        if self.output_index >= len(item.outputs) or not item.outputs[self.output_index].value.startswith('http'):
+            self.report({'ERROR'}, "Sweep output has no image")
+            return {'CANCELLED'}
+        
+        output_prop = item.outputs[self.output_index]
+        # Downloaded and decoded in the background; the image opens once it is ready
+        utils.view_image_from_url(output_prop.value, f"Sweep_{self.cell_index + 1}_{output_prop.name}")
+        self.report({'INFO'}, "Loading sweep output image...")
+        return {'FINISHED'}
+
+
+classes = [
+    RUNCHAT_OT_cancel_sweep,
+    RUNCHAT_OT_view_sweep_grid,
+    RUNCHAT_OT_view_sweep_output,
+]
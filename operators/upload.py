@@ -1,7 +1,6 @@
 # operators/upload.py
 
 import bpy
-import base64
 import os
 from bpy.types import Operator
 from bpy.props import IntProperty
@@ -41,22 +40,18 @@ class RUNCHAT_OT_upload_file(Operator):
             # Update status
             input_prop.upload_status = "Reading file..."
             
-            # Read and encode file
+            # Resolve file path
             file_path = bpy.path.abspath(input_prop.file_path)
             if not os.path.exists(file_path):
                 input_prop.upload_status = "File not found"
                 self.report({'ERROR'}, "File not found")
                 return {'CANCELLED'}
             
-            with open(file_path, 'rb') as f:
-                image_bytes = f.read()
-                base64_data = base64.b64encode(image_bytes).decode('utf-8')
-            
-            # Upload to RunChat
+            # Upload to RunChat (streamed from disk, no base64 copy in memory)
             input_prop.upload_status = "Uploading to RunChat..."
             filename = os.path.basename(file_path)
             
-            uploaded_url = api.RunChatAPI.upload_image(base64_data, filename, api_key)
+            uploaded_url = api.RunChatAPI.upload_file(file_path, api_key, filename)
             
             if uploaded_url:
                 input_prop.uploaded_url = uploaded_url
@@ -3,9 +3,59 @@
 
 import bpy
 from bpy.types import AddonPreferences
-from bpy.props import StringProperty
+from bpy.props import StringProperty, IntProperty, BoolProperty
 import webbrowser
 
+
+def _update_network_settings(self, context):
+    """Push connection pool sizes to the shared HTTP transport"""
+    from .utils import transport
+    transport.configure(self.pool_connections, self.pool_maxsize)
+
+
+def _update_upload_workers(self, context):
+    """Resize the background upload pool"""
+    from .utils import workers
+    workers.configure('upload', self.max_upload_workers)
+
+
+def _update_job_workers(self, context):
+    """Resize the pool that runs scheduled jobs"""
+    from .utils import workers
+    workers.configure('jobs', self.max_concurrent_jobs)
+
+
+def _update_status_polling(self, context):
+    """Switch between submit-then-poll and blocking workflow runs"""
+    from .api import RunChatAPI
+    RunChatAPI.status_polling_enabled = self.use_status_polling
+
+
+def _update_streaming(self, context):
+    """Switch streamed execution on or off"""
+    from .api import RunChatAPI
+    RunChatAPI.streaming_enabled = self.use_streaming
+
+
+def _update_result_cache(self, context):
+    """Resize (or disable) the workflow result cache"""
+    from .utils.result_cache import get_result_cache
+    get_result_cache().set_max_bytes(self.result_cache_mb * 1024 * 1024)
+
+
+def _update_asset_cache(self, context):
+    """Resize the downloaded output cache"""
+    from .utils.asset_cache import get_asset_cache
+    get_asset_cache().set_max_bytes(self.asset_cache_mb * 1024 * 1024)
+
+
+def _update_image_history(self, context):
+    """Apply the output image history limits and free what no longer fits"""
+    from .utils import datablocks
+    datablocks.configure(self.image_history, self.image_history_mb * 1024 * 1024)
+    datablocks.enforce_limits()
+
+
 class RunChatPreferences(AddonPreferences):
     bl_idname = __package__
 
@@ -16,6 +66,87 @@ class RunChatPreferences(AddonPreferences):
         subtype='PASSWORD'
     )
 
+    pool_connections: IntProperty(
+        name="Pooled Hosts",
+        description="Number of hosts (API, upload, CDN) that keep open connections",
+        default=4,
+        min=1,
+        max=32,
+        update=_update_network_settings
+    )
+    pool_maxsize: IntProperty(
+        name="Connections per Host",
+        description="Maximum keep-alive connections kept open to each host",
+        default=8,
+        min=1,
+        max=64,
+        update=_update_network_settings
+    )
+    max_upload_workers: IntProperty(
+        name="Parallel Uploads",
+        description="Maximum number of image inputs uploaded at the same time before a workflow runs",
+        default=4,
+        min=1,
+        max=16,
+        update=_update_upload_workers
+    )
+    max_concurrent_jobs: IntProperty(
+        name="Concurrent Jobs",
+        description="Maximum number of queued jobs that run at the same time; the rest wait in the job queue",
+        default=3,
+        min=1,
+        max=16,
+        update=_update_job_workers
+    )
+    use_status_polling: BoolProperty(
+        name="Poll Run Progress",
+        description="Submit workflows and poll their status for real progress and early outputs, "
+                    "instead of waiting on one long request (falls back automatically if the server can't)",
+        default=True,
+        update=_update_status_polling
+    )
+    use_streaming: BoolProperty(
+        name="Stream Outputs",
+        description="Ask the server to stream each output as soon as it is ready (SSE or NDJSON) "
+                    "and import it right away, instead of waiting for the whole workflow",
+        default=False,
+        update=_update_streaming
+    )
+    result_cache_mb: IntProperty(
+        name="Result Cache (MB)",
+        description="Disk space for results of earlier runs, reused when a workflow runs again with unchanged inputs (0 disables)",
+        default=64,
+        min=0,
+        max=4096,
+        update=_update_result_cache
+    )
+    asset_cache_mb: IntProperty(
+        name="Asset Cache (MB)",
+        description="Disk space for downloaded output images, models and videos, so viewing, saving and "
+                    "importing an output downloads it only once (0 keeps only the file in use)",
+        default=1024,
+        min=0,
+        max=65536,
+        update=_update_asset_cache
+    )
+    image_history: IntProperty(
+        name="Image History",
+        description="Earlier generations of each output image kept in the .blend as 'Name [n]' "
+                    "(0 updates each output's image in place)",
+        default=2,
+        min=0,
+        max=100,
+        update=_update_image_history
+    )
+    image_history_mb: IntProperty(
+        name="Image History (MB)",
+        description="Memory the earlier generations may use together before the oldest are freed (0 for no limit)",
+        default=1024,
+        min=0,
+        max=65536,
+        update=_update_image_history
+    )
+
     def draw(self, context):
         layout = self.layout
         
@@ -29,6 +160,30 @@ class RunChatPreferences(AddonPreferences):
         row = box.row()
         row.operator("runchat.open_api_keys", text="Get API Key", icon='URL')
         row.operator("runchat.open_docs", text="Documentation", icon='HELP')
+        
+        # Network section
+        box = layout.box()
+        box.label(text="Network:", icon='LINKED')
+        
+        row = box.row()
+        row.prop(self, "pool_connections")
+        row.prop(self, "pool_maxsize")
+        
+        row = box.row()
+        row.prop(self, "max_upload_workers")
+        row.prop(self, "max_concurrent_jobs")
+        
+        row = box.row()
+        row.prop(self, "use_status_polling")
+        row.prop(self, "use_streaming")
+        
+        row = box.row()
+        row.prop(self, "result_cache_mb")
+        row.prop(self, "asset_cache_mb")
+        
+        row = box.row()
+        row.prop(self, "image_history")
+        row.prop(self, "image_history_mb")
 
 class RUNCHAT_OT_OpenApiKeys(bpy.types.Operator):
     """Open Runchat API keys page"""
@@ -57,6 +212,33 @@ def get_api_key():
         print("Warning: Runchat addon preferences not found")
         return ""
 
+def get_max_concurrent_jobs():
+    """Job scheduler concurrency limit from preferences"""
+    try:
+        return bpy.context.preferences.addons[__package__].preferences.max_concurrent_jobs
+    except (KeyError, AttributeError):
+        return 3
+
+def apply_network_settings():
+    """Configure the shared HTTP transport and worker pools from the saved preferences"""
+    try:
+        preferences = bpy.context.preferences.addons[__package__].preferences
+    except (KeyError, AttributeError):
+        return
+    from .utils import transport, workers
+    transport.configure(preferences.pool_connections, preferences.pool_maxsize)
+    workers.configure('upload', preferences.max_upload_workers)
+    workers.configure('jobs', preferences.max_concurrent_jobs)
+    from .api import RunChatAPI
+    RunChatAPI.status_polling_enabled = preferences.use_status_polling
+    RunChatAPI.streaming_enabled = preferences.use_streaming
+    from .utils.result_cache import get_result_cache
+    get_result_cache().set_max_bytes(preferences.result_cache_mb * 1024 * 1024)
+    from .utils.asset_cache import get_asset_cache
+    get_asset_cache().set_max_bytes(preferences.asset_cache_mb * 1024 * 1024)
+    from .utils import datablocks
+    datablocks.configure(preferences.image_history, preferences.image_history_mb * 1024 * 1024)
+
 classes = [
     RunChatPreferences,
     RUNCHAT_OT_OpenApiKeys,
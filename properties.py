@@ -43,6 +43,11 @@ class RunChatInputProperty(PropertyGroup):
     
     uploaded_url: StringProperty(name="Uploaded URL")
     upload_status: StringProperty(name="Upload Status", default="")
+    sweep_values: StringProperty(
+        name="Sweep Values",
+        description="Values to sweep in sweep mode, separated by |. Numeric ranges: start..stop or start..stop:step",
+        default=""
+    )
 
 
 
@@ -55,11 +60,52 @@ class RunChatOutputProperty(PropertyGroup):
     
     output_type: StringProperty(name="Output Type")
     is_processed: BoolProperty(name="Is Processed", default=False)
+    # Value last scheduled for auto-import, so a streamed output isn't imported again with the final result
+    imported_value: StringProperty(name="Imported Value")
+
+class RunChatBatchResultProperty(PropertyGroup):
+    """Outputs of one camera in a batch run"""
+    camera_name: StringProperty(name="Camera")
+    status: StringProperty(name="Status", default="Queued")
+    uploaded_url: StringProperty(name="Uploaded URL")
+    outputs: CollectionProperty(type=RunChatOutputProperty)
+
+class RunChatSweepCellProperty(PropertyGroup):
+    """Outputs of one combination in a parameter sweep"""
+    label: StringProperty(name="Label")
+    values_json: StringProperty(name="Values")  # Store as JSON string
+    status: StringProperty(name="Status", default="Queued")
+    outputs: CollectionProperty(type=RunChatOutputProperty)
+
+class RunChatJobProperty(PropertyGroup):
+    """One run in the job scheduler"""
+    job_id: IntProperty(name="Job ID")
+    name: StringProperty(name="Name")
+    state: EnumProperty(
+        name="State",
+        items=[
+            ('QUEUED', "Queued", "Waiting for a free slot"),
+            ('RUNNING', "Running", "Uploading inputs or running the workflow"),
+            ('DONE', "Done", "Finished successfully"),
+            ('FAILED', "Failed", "Finished with an error"),
+            ('CANCELLED', "Cancelled", "Cancelled before it finished"),
+        ],
+        default='QUEUED'
+    )
+    priority: IntProperty(name="Priority", default=0)
+    message: StringProperty(name="Message", default="")
+    inputs_json: StringProperty(name="Inputs")  # Store as JSON string
+    queued_at: FloatProperty(name="Queued At")
+    started_at: FloatProperty(name="Started At")
+    finished_at: FloatProperty(name="Finished At")
+    outputs: CollectionProperty(type=RunChatOutputProperty)
 
 class RunChatProperties(PropertyGroup):
     runchat_id: StringProperty(name="Runchat ID", description="The unique identifier for the Runchat workflow", default="")
     schema_loaded: BoolProperty(name="Schema Loaded", default=False)
     workflow_name: StringProperty(name="Workflow Name", default="")
+    # Part of the result cache key, so results from an older version of the workflow aren't reused
+    schema_version: StringProperty(name="Schema Version", default="")
     status: StringProperty(name="Status", default="Ready")
     instance_id: StringProperty(name="Instance ID", default="")
     
@@ -67,6 +113,10 @@ class RunChatProperties(PropertyGroup):
     outputs: CollectionProperty(type=RunChatOutputProperty)
     examples: CollectionProperty(type=RunChatExampleProperty)
     release_notes: CollectionProperty(type=RunChatReleaseNoteProperty)
+    batch_results: CollectionProperty(type=RunChatBatchResultProperty)
+    jobs: CollectionProperty(type=RunChatJobProperty)
+    active_job_index: IntProperty(name="Active Job", default=0)
+    job_priority: IntProperty(name="Priority", description="Priority of the next queued job; higher runs first, equal priorities run in order", default=0, min=-10, max=10)
     
     show_inputs: BoolProperty(name="Show Inputs", default=True)
     show_outputs: BoolProperty(name="Show Outputs", default=True)
@@ -107,6 +157,37 @@ class RunChatProperties(PropertyGroup):
     viewport_height: IntProperty(name="Capture Height", default=1080, min=64, max=8192)
     viewport_quality: IntProperty(name="Image Quality", default=90, min=1, max=100)
     
+    # Live mode settings
+    live_debounce: FloatProperty(name="Debounce", description="Seconds the scene must stay still before a live capture", default=0.75, min=0.1, max=10.0, subtype='TIME_ABSOLUTE', unit='TIME_ABSOLUTE')
+    live_resolution_scale: FloatProperty(name="Resolution Scale", description="Live captures are taken at this fraction of the capture size", default=0.5, min=0.1, max=1.0)
+    live_threshold: FloatProperty(name="Change Threshold", description="How much the view must change before the workflow re-runs (0 = any change)", default=0.03, min=0.0, max=1.0)
+    live_status: StringProperty(name="Live Status", default="")
+    
+    # Multi-camera batch settings
+    batch_camera_scope: EnumProperty(
+        name="Cameras",
+        description="Which cameras a batch run captures",
+        items=[
+            ('SELECTED', "Selected", "Only selected cameras"),
+            ('ALL', "All", "Every camera in the scene"),
+        ],
+        default='ALL'
+    )
+    batch_max_parallel: IntProperty(name="Parallel Runs", description="Workflow runs submitted at the same time during a batch", default=3, min=1, max=16)
+    batch_status: StringProperty(name="Batch Status", default="")
+    show_batch_results: BoolProperty(name="Show Batch Results", default=True)
+    frame_output_path: StringProperty(name="Frame Output", description="Directory for the numbered image sequence of a frame range run", default="//runchat_frames/", subtype='DIR_PATH')
+    frame_resume: BoolProperty(name="Resume", description="Skip frames already completed by a previous run with the same workflow, inputs and range", default=True)
+    frame_add_strip: BoolProperty(name="Add Sequencer Strip", description="Add the finished frames to the Video Sequencer as an image strip", default=False)
+    
+    # Parameter sweep settings
+    sweep_enabled: BoolProperty(name="Sweep Mode", description="Execute runs every combination of the inputs' sweep values instead of a single run", default=False)
+    sweep_cells: CollectionProperty(type=RunChatSweepCellProperty)
+    sweep_status: StringProperty(name="Sweep Status", default="")
+    sweep_grid_image: StringProperty(name="Sweep Grid Image", default="")
+    sweep_cell_size: IntProperty(name="Grid Cell Size", description="Size in pixels of each cell in the sweep grid image", default=384, min=64, max=2048)
+    show_sweep_cells: BoolProperty(name="Show Sweep Cells", default=True)
+    
     progress: FloatProperty(name="Progress", min=0.0, max=1.0, default=0.0)
     progress_message: StringProperty(name="Progress Message", default="")
     
@@ -128,6 +209,9 @@ classes = [
     RunChatReleaseNoteProperty,
     RunChatInputProperty,
     RunChatOutputProperty,
+    RunChatBatchResultProperty,
+    RunChatSweepCellProperty,
+    RunChatJobProperty,
     RunChatProperties,
 ]
 
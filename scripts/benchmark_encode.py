@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Image encoding benchmark for the Runchat Blender addon
+Compares the legacy temp-file path (PNG written to disk, reopened with PIL,
+alpha composited with paste, re-encoded to JPEG) with the in-memory path in
+utils/pixel_utils.py (float pixels -> vectorised uint8 -> frombuffer -> JPEG).
+
+Blender itself isn't needed: a synthetic float RGBA buffer in Blender's layout
+stands in for Image.pixels, and PIL's PNG writer at compress_level=1 stands in
+for image.save_render (Blender's default 15% PNG compression).
+
+With --parallel N it also encodes N captures serially and on a thread pool,
+showing how far PIL's GIL-free JPEG encoder scales across cores.
+
+Usage: python scripts/benchmark_encode.py [--sizes 1080p 4k 8k] [--repeat 3] [--parallel 4]
+Requires numpy and Pillow in the Python running the script.
+"""
+
+import argparse
+import concurrent.futures
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+RESOLUTIONS = {
+    '1080p': (1920, 1080),
+    '4k': (3840, 2160),
+    '8k': (7680, 4320),
+}
+QUALITY = 90
+
+
+def load_pixel_utils():
+    """Load utils/pixel_utils.py directly (the utils package itself needs bpy)"""
+    path = Path(__file__).resolve().parent.parent / "utils" / "pixel_utils.py"
+    spec = importlib.util.spec_from_file_location("runchat_pixel_utils", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_pixels(width, height):
+    """Float RGBA gradient with noise and a semi-transparent band, bottom row first"""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    rgba = np.empty((height, width, 4), dtype=np.float32)
+    rgba[..., 0] = x / width
+    rgba[..., 1] = y / height
+    rgba[..., 2] = 0.5
+    rgba[..., :3] += rng.normal(0.0, 0.02, (height, width, 3)).astype(np.float32)
+    np.clip(rgba[..., :3], 0.0, 1.0, out=rgba[..., :3])
+    rgba[..., 3] = 1.0
+    rgba[height // 3:height // 2, :, 3] = 0.4
+    return rgba.reshape(-1)
+
+
+def legacy_encode(source, width, height, temp_dir):
+    """Old path: save_render to PNG, reopen, composite onto white, JPEG encode"""
+    # Stand-in for image.save_render (Blender's own float -> byte conversion + PNG write)
+    rgba8 = (np.clip(source.reshape(height, width, 4), 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)[::-1]
+    temp_path = os.path.join(temp_dir, "capture.png")
+    Image.fromarray(rgba8, 'RGBA').save(temp_path, compress_level=1)
+    del rgba8
+
+    # image_to_bytes
+    with Image.open(temp_path) as img:
+        rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+        rgb_img.paste(img, mask=img.split()[-1])
+        buffer = io.BytesIO()
+        rgb_img.save(buffer, format='JPEG', quality=QUALITY, optimize=True)
+    os.unlink(temp_path)
+    return buffer.getvalue()
+
+
+def memory_encode(pixel_utils, source, width, height, linear):
+    """New path: foreach_get into a reused buffer, vectorised conversion, frombuffer"""
+    buffer = pixel_utils.acquire_pixel_buffer(source.size)
+    np.copyto(buffer, source)  # stands in for image.pixels.foreach_get(buffer)
+    rgb8 = pixel_utils.rgba_float_to_rgb8(buffer, width, height, linear=linear)
+    pixel_utils.release_pixel_buffer(buffer)
+    return pixel_utils.encode_rgb8(rgb8, width, height, QUALITY)
+
+
+def best_of(repeat, fn):
+    """Fastest of several runs, plus the last result"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def parallel_scaling(pixel_utils, count, workers):
+    """Encode `count` 4K captures one after another, then on a pool of `workers` threads"""
+    width, height = RESOLUTIONS['4k']
+    sources = [make_pixels(width, height) for _ in range(count)]
+
+    start = time.perf_counter()
+    for source in sources:
+        memory_encode(pixel_utils, source, width, height, True)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda source: memory_encode(pixel_utils, source, width, height, True), sources))
+    pooled = time.perf_counter() - start
+
+    print(f"\n{count} x 4K captures: serial {serial:.3f}s, pool of {workers} {pooled:.3f}s ({serial / pooled:.2f}x)")
+
+
+def decode(jpeg_bytes):
+    with Image.open(io.BytesIO(jpeg_bytes)) as img:
+        return np.asarray(img.convert('RGB'), dtype=np.int16)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Runchat image encoding paths")
+    parser.add_argument('--sizes', nargs='+', choices=list(RESOLUTIONS), default=list(RESOLUTIONS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--parallel', type=int, default=0, help="Also compare serial vs pooled encoding of N 4K captures")
+    args = parser.parse_args()
+
+    pixel_utils = load_pixel_utils()
+
+    print("🚀 Runchat encode benchmark (best of %d)" % args.repeat)
+    print(f"{'size':>6} {'legacy (s)':>11} {'memory (s)':>11} {'memory+sRGB (s)':>16} {'speedup':>8} {'max diff':>9}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in args.sizes:
+            width, height = RESOLUTIONS[name]
+            source = make_pixels(width, height)
+
+            legacy_time, legacy_jpeg = best_of(args.repeat, lambda: legacy_encode(source, width, height, temp_dir))
+            memory_time, memory_jpeg = best_of(args.repeat, lambda: memory_encode(pixel_utils, source, width, height, False))
+            linear_time, _ = best_of(args.repeat, lambda: memory_encode(pixel_utils, source, width, height, True))
+
+            # Both paths should produce the same picture (up to rounding and JPEG noise)
+            max_diff = int(np.abs(decode(legacy_jpeg) - decode(memory_jpeg)).max())
+
+            print(f"{name:>6} {legacy_time:>11.3f} {memory_time:>11.3f} {linear_time:>16.3f} "
+                  f"{legacy_time / memory_time:>7.2f}x {max_diff:>9}")
+
+            pixel_utils.clear_pixel_buffers()
+
+    if args.parallel:
+        workers = max(1, min(4, (os.cpu_count() or 2) - 1))
+        parallel_scaling(pixel_utils, args.parallel, workers)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
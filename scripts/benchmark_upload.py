@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Upload benchmark for the Runchat Blender addon
+Compares the legacy base64-in-JSON upload with the streaming multipart
+upload (from disk and from a memory buffer) against a local sink server.
+
+Each case runs in its own subprocess so peak RSS is measured in isolation.
+
+Usage: python scripts/benchmark_upload.py [--sizes 1 10 50]
+Requires the `requests` package in the Python running the script.
+"""
+
+import argparse
+import base64
+import importlib.util
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+MODES = ["base64-json", "multipart-file", "multipart-buffer"]
+
+
+class SinkHandler(BaseHTTPRequestHandler):
+    """Drains the request body and answers like the upload route"""
+
+    def do_POST(self):
+        remaining = int(self.headers.get('Content-Length', 0))
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+        body = json.dumps({"url": "http://localhost/uploaded.jpg"}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    if platform.system() == 'Darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def load_multipart_module():
+    """Load utils/multipart.py directly (the utils package itself needs bpy)"""
+    path = Path(__file__).resolve().parent.parent / "utils" / "multipart.py"
+    spec = importlib.util.spec_from_file_location("runchat_multipart", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_case(mode, file_path, url):
+    """Run a single upload in this process and print a JSON result line"""
+    import requests
+    multipart = load_multipart_module()
+
+    session = requests.Session()
+    baseline_rss = peak_rss_mb()
+    start = time.perf_counter()
+
+    if mode == "base64-json":
+        with open(file_path, 'rb') as f:
+            base64_image = base64.b64encode(f.read()).decode('utf-8')
+        response = session.post(url, json={"base64Image": base64_image, "filename": "bench.jpg"}, timeout=120)
+    elif mode == "multipart-file":
+        body = multipart.MultipartStream(file_path, "bench.jpg", fields={"filename": "bench.jpg"})
+        response = session.post(url, data=body, headers={"Content-Type": body.content_type}, timeout=120)
+    else:
+        # Encoded image already in memory (e.g. a viewport capture)
+        with open(file_path, 'rb') as f:
+            buffer = f.read()
+        baseline_rss = peak_rss_mb()
+        start = time.perf_counter()
+        body = multipart.MultipartStream(buffer, "bench.jpg", fields={"filename": "bench.jpg"})
+        response = session.post(url, data=body, headers={"Content-Type": body.content_type}, timeout=120)
+
+    response.raise_for_status()
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "mode": mode,
+        "seconds": elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+        "rss_growth_mb": peak_rss_mb() - baseline_rss,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Runchat upload paths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 50], help="Payload sizes in MB")
+    parser.add_argument('--case', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--file', help=argparse.SUPPRESS)
+    parser.add_argument('--url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case, args.file, args.url)
+        return 0
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SinkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/upload"
+
+    print("🚀 Runchat upload benchmark")
+    print(f"{'size':>6} {'mode':<18} {'time (s)':>9} {'peak RSS':>10} {'RSS growth':>11}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size_mb in args.sizes:
+            file_path = os.path.join(temp_dir, f"payload_{size_mb}mb.bin")
+            with open(file_path, 'wb') as f:
+                f.write(os.urandom(size_mb * 1024 * 1024))
+
+            for mode in MODES:
+                result = subprocess.run(
+                    [sys.executable, __file__, '--case', mode, '--file', file_path, '--url', url],
+                    capture_output=True, text=True
+                )
+                if result.returncode != 0:
+                    print(f"❌ {mode} failed for {size_mb} MB:\n{result.stderr}")
+                    continue
+                data = json.loads(result.stdout.strip().splitlines()[-1])
+                print(f"{size_mb:>4}MB {mode:<18} {data['seconds']:>9.3f} "
+                      f"{data['peak_rss_mb']:>8.1f}MB {data['rss_growth_mb']:>9.1f}MB")
+
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
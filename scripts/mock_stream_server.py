@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Local mock of the Runchat run endpoints for testing streamed and polled execution
+Serves one two-output workflow whose preview image is ready quickly and whose
+final image arrives later, in every mode the addon speaks:
+    POST /api/v1/<id>          {"stream": true}  -> SSE or NDJSON events (Accept header or --format)
+                               {"async": true}   -> queued, then poll /status
+                               otherwise         -> one blocking JSON result
+    POST /api/v1/<id>/status   progress and partial outputs of a queued run
+    GET  /api/v1/<id>/schema   the workflow's inputs and outputs
+    GET  /files/<name>.png     the output images
+
+Usage:
+    python scripts/mock_stream_server.py --port 8765 --format sse
+Then point the addon at it from Blender's Python console:
+    import bl_ext.user_default.runchat_blender_addon.api as api
+    api.RunChatAPI.BASE_URL = "http://127.0.0.1:8765/api/v1"
+"""
+
+import argparse
+import importlib.util
+import json
+import struct
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+def load_module(name):
+    """Load a bpy-free module from utils/ directly (the utils package itself needs bpy)"""
+    path = Path(__file__).resolve().parent.parent / "utils" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(f"runchat_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+streaming = load_module("streaming")
+
+SCHEMA = {
+    'name': "Mock Streaming Workflow",
+    'inputs': [{'id': "prompt_n1", 'label': "Prompt", 'type': "string"}],
+    'outputs': [
+        {'id': "preview_n2", 'label': "Preview", 'type': "image"},
+        {'id': "final_n3", 'label': "Final", 'type': "image"},
+    ],
+}
+
+# Seconds after the start of a run at which each output is ready
+PREVIEW_AT = 1.0
+FINAL_AT = 4.0
+
+# instance id -> start time of async runs
+_runs = {}
+_runs_lock = threading.Lock()
+
+
+def solid_png(color, size=64):
+    """Minimal RGB PNG of one color"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+    row = b"\x00" + bytes(color) * size
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(row * size)) + chunk(b"IEND", b""))
+
+
+IMAGES = {
+    'preview.png': solid_png((200, 120, 40)),
+    'final.png': solid_png((40, 120, 200)),
+}
+
+
+def output_events(base_url, elapsed):
+    """Output events that are ready after elapsed seconds"""
+    events = []
+    if elapsed >= PREVIEW_AT:
+        events.append({'type': 'output', 'id': "preview_n2", 'data': [f"{base_url}/files/preview.png"]})
+    if elapsed >= FINAL_AT:
+        events.append({'type': 'output', 'id': "final_n3", 'data': [f"{base_url}/files/final.png"]})
+    return events
+
+
+def result_data(events):
+    return [{'id': event['id'], 'data': event['data']} for event in events]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    stream_format = None
+
+    def base_url(self):
+        return f"http://{self.headers.get('Host', '127.0.0.1')}"
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def do_GET(self):
+        if self.path.endswith('/schema'):
+            self.send_json(SCHEMA)
+        elif self.path.startswith('/files/') and self.path[len('/files/'):] in IMAGES:
+            body = IMAGES[self.path[len('/files/'):]]
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_json({'error': "Not found"}, 404)
+
+    def do_POST(self):
+        data = self.read_json()
+        if self.path.endswith('/status'):
+            self.handle_status(data)
+        elif data.get('stream'):
+            self.handle_stream()
+        elif data.get('async'):
+            instance_id = data.get('runchat_instance_id') or uuid.uuid4().hex
+            with _runs_lock:
+                _runs[instance_id] = time.time()
+            self.send_json({'status': 'queued', 'instance_id': instance_id})
+        else:
+            time.sleep(FINAL_AT)
+            self.send_json({'data': result_data(output_events(self.base_url(), FINAL_AT))})
+
+    def handle_status(self, data):
+        instance_id = data.get('runchat_instance_id')
+        with _runs_lock:
+            started = _runs.get(instance_id)
+            if data.get('action') == 'cancel':
+                _runs.pop(instance_id, None)
+        if started is None:
+            self.send_json({'error': "Unknown instance"}, 404)
+            return
+        if data.get('action') == 'cancel':
+            self.send_json({'status': 'cancelled'})
+            return
+
+        elapsed = time.time() - started
+        events = output_events(self.base_url(), elapsed)
+        status = 'completed' if elapsed >= FINAL_AT else 'running'
+        self.send_json({'status': status, 'progress': min(elapsed / FINAL_AT, 1.0),
+                        'message': f"{len(events)} of 2 outputs ready", 'data': result_data(events)})
+
+    def handle_stream(self):
+        fmt = self.stream_format
+        if fmt is None:
+            fmt = 'sse' if streaming.SSE_CONTENT_TYPE in self.headers.get('Accept', '') else 'ndjson'
+        content_type = streaming.SSE_CONTENT_TYPE if fmt == 'sse' else streaming.NDJSON_CONTENT_TYPES[0]
+
+        # Chunked like a real event stream, so each event reaches the client as it is written
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+
+        def write_chunk(data):
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+        started = time.time()
+        sent = 0
+        try:
+            while True:
+                elapsed = time.time() - started
+                events = output_events(self.base_url(), elapsed)
+                for event in events[sent:]:
+                    write_chunk(streaming.encode_event(event, fmt))
+                sent = len(events)
+                if elapsed >= FINAL_AT:
+                    break
+                write_chunk(streaming.encode_event(
+                    {'type': 'progress', 'progress': elapsed / FINAL_AT, 'message': f"{sent} of 2 outputs ready"}, fmt))
+                time.sleep(0.25)
+            write_chunk(streaming.encode_event({'type': 'done', 'data': result_data(events)}, fmt))
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client cancelled the run
+            pass
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        print(f"[mock] {self.address_string()} {format % args}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Runchat server for streamed and polled runs")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--format', choices=('sse', 'ndjson'), help="Stream format (default: from the Accept header)")
+    args = parser.parse_args()
+
+    MockHandler.stream_format = args.format
+    server = ThreadingHTTPServer((args.host, args.port), MockHandler)
+    print(f"Mock Runchat server on http://{args.host}:{args.port}/api/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
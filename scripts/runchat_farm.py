@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Multi-process farm coordinator for the Runchat Blender addon
+Shards a job manifest across N headless Blender workers so encoding, JSON
+parsing and downloads aren't bound to one process's GIL.
+
+Each worker gets its own copy of the .blend and runs
+`blender -b <copy> --python-expr "...headless.main()" -- --queue-dir <dir>`.
+Jobs are handed out through a file queue (utils/job_queue.py): workers claim
+one by atomically renaming it, and write one result file per attempt. The
+coordinator re-queues failed attempts up to --retries times, re-queues the
+claims of workers that die, prints progress, and writes the same report as
+a single headless run, plus the attempt count and worker of every job.
+
+Usage:
+    python scripts/runchat_farm.py --blender /path/to/blender --blend scene.blend \\
+        --manifest jobs.json --workers 8 --concurrency 2 --retries 2 --output-dir ./out
+The addon must be installed and enabled in the Blender that runs the workers.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_ADDON_MODULE = "bl_ext.user_default.runchat_blender_addon"
+POLL_INTERVAL = 1.0
+
+
+def load_module(name):
+    """Load a bpy-free module from utils/ directly (the utils package itself needs bpy)"""
+    path = Path(__file__).resolve().parent.parent / "utils" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(f"runchat_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+manifest_utils = load_module("manifest")
+job_queue = load_module("job_queue")
+
+
+def failed_entry(job_id, spec, error):
+    """Report entry for a job no worker finished"""
+    return {
+        'name': spec['name'], 'runchat_id': spec['runchat_id'], 'camera': spec['camera'],
+        'frame': spec['frame'], 'status': 'failed', 'error': error, 'outputs': {},
+        'files': [], 'timings': {}, 'job_id': job_id, 'worker': None,
+    }
+
+
+def start_worker(args, worker_id, blend_copy, queue_dir, log_dir):
+    """Launch one background Blender worker; its output goes to a per-worker log file"""
+    expr = f"from {args.addon_module} import headless; headless.main()"
+    command = [
+        args.blender, '-b', blend_copy, '--python-expr', expr, '--',
+        '--queue-dir', queue_dir, '--worker-id', worker_id,
+    ]
+    log_file = open(os.path.join(log_dir, f"{worker_id}.log"), 'w')
+    process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT)
+    return {'process': process, 'log': log_file, 'blend': blend_copy}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shard a Runchat job manifest across headless Blender workers")
+    parser.add_argument('--blender', default='blender', help="Blender executable")
+    parser.add_argument('--blend', required=True, help=".blend file every worker opens a copy of")
+    parser.add_argument('--manifest', required=True, help="JSON or CSV job manifest")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="Blender processes")
+    parser.add_argument('--concurrency', type=int, default=2, help="Workflow runs at the same time per worker")
+    parser.add_argument('--retries', type=int, default=2, help="Extra attempts for a failed job")
+    parser.add_argument('--output-dir', help="Directory for downloaded outputs")
+    parser.add_argument('--work-dir', help="Queue, .blend copies and worker logs (default: <manifest>.farm)")
+    parser.add_argument('--report', help="Report path (default: <manifest>.report.json)")
+    parser.add_argument('--addon-module', default=DEFAULT_ADDON_MODULE, help="Python module of the installed addon")
+    args = parser.parse_args()
+
+    manifest_path = os.path.abspath(args.manifest)
+    manifest_dir = os.path.dirname(manifest_path)
+    blend_path = os.path.abspath(args.blend)
+    blend_dir = os.path.dirname(blend_path)
+    work_dir = os.path.abspath(args.work_dir or os.path.splitext(manifest_path)[0] + ".farm")
+    queue_dir = os.path.join(work_dir, "queue")
+    log_dir = os.path.join(work_dir, "logs")
+    report_path = args.report or os.path.splitext(manifest_path)[0] + ".report.json"
+
+    try:
+        manifest = manifest_utils.load_manifest(manifest_path)
+        specs = manifest_utils.expand_jobs(manifest)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 2
+
+    for spec in specs:
+        spec['files'] = {key: manifest_utils.resolve_path(path, blend_dir, manifest_dir) for key, path in spec['files'].items()}
+        if (spec['camera'] or spec['frame'] is not None) and not spec['capture_input']:
+            print(f"Error: job {spec['name']} captures a camera but no capture_input is set")
+            return 2
+
+    output_dir = args.output_dir or manifest.get('output_dir')
+    if output_dir:
+        output_dir = manifest_utils.resolve_path(output_dir, blend_dir, manifest_dir)
+
+    # Fresh queue for this run
+    if os.path.isdir(queue_dir):
+        shutil.rmtree(queue_dir)
+    job_queue.init_queue(queue_dir)
+    os.makedirs(log_dir, exist_ok=True)
+    job_queue.write_settings(queue_dir, {
+        'output_dir': output_dir,
+        'concurrency': args.concurrency,
+        'width': manifest.get('width'),
+        'height': manifest.get('height'),
+        'quality': manifest.get('quality'),
+        'api_key': manifest.get('api_key'),
+    })
+
+    # Job IDs keep manifest order in the queue's sorted file listing
+    job_ids = [f"{index:05d}_" + re.sub(r'[^\w.-]', '_', spec['name']) for index, spec in enumerate(specs)]
+    specs_by_id = dict(zip(job_ids, specs))
+    for job_id, spec in specs_by_id.items():
+        job_queue.enqueue(queue_dir, job_id, spec)
+
+    worker_count = max(1, min(args.workers, len(specs)))
+    print(f"{len(specs)} jobs, {worker_count} workers x {args.concurrency} runs, up to {args.retries} retries")
+    started_at = time.time()
+
+    workers = {}
+    for index in range(worker_count):
+        worker_id = f"worker{index + 1:02d}"
+        blend_copy = os.path.join(work_dir, f"{worker_id}.blend")
+        shutil.copy2(blend_path, blend_copy)
+        workers[worker_id] = start_worker(args, worker_id, blend_copy, queue_dir, log_dir)
+
+    final = {}
+    attempts = {job_id: 1 for job_id in job_ids}
+    seen = set()
+    last_progress = None
+    try:
+        while len(final) < len(job_ids):
+            for result in job_queue.read_results(queue_dir, seen):
+                job_id = result['job_id']
+                if job_id in final:
+                    continue
+                if result['status'] != 'ok' and attempts[job_id] <= args.retries:
+                    attempts[job_id] += 1
+                    print(f"{result['name']}: {result['error']} - retrying (attempt {attempts[job_id]})")
+                    job_queue.enqueue(queue_dir, job_id, specs_by_id[job_id], attempts[job_id])
+                else:
+                    final[job_id] = result
+
+            # A worker that died leaves its claims behind; hand them to the others
+            for worker_id, worker in workers.items():
+                if worker['process'].poll() is None:
+                    continue
+                for payload in job_queue.release_claims(queue_dir, worker_id):
+                    job_id = payload['job_id']
+                    if job_id in final:
+                        continue
+                    if attempts[job_id] > args.retries:
+                        spec = specs_by_id[job_id]
+                        final[job_id] = failed_entry(job_id, spec, f"{worker_id} exited with code {worker['process'].returncode}")
+                        continue
+                    print(f"{worker_id} exited with code {worker['process'].returncode}, re-queueing {job_id}")
+                    attempts[job_id] += 1
+                    job_queue.enqueue(queue_dir, job_id, specs_by_id[job_id], attempts[job_id])
+
+            if all(worker['process'].poll() is not None for worker in workers.values()) and len(final) < len(job_ids):
+                print("Error: all workers exited before the queue was finished, see the logs in " + log_dir)
+                break
+
+            ok = sum(1 for result in final.values() if result['status'] == 'ok')
+            progress = (len(final), ok, job_queue.pending_count(queue_dir))
+            if progress != last_progress:
+                print(f"[{time.time() - started_at:7.1f}s] {progress[0]}/{len(job_ids)} done, "
+                      f"{progress[1]} ok, {progress[0] - progress[1]} failed, {progress[2]} queued")
+                last_progress = progress
+            time.sleep(POLL_INTERVAL)
+    finally:
+        job_queue.request_stop(queue_dir)
+        for worker in workers.values():
+            try:
+                worker['process'].wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                worker['process'].kill()
+            worker['log'].close()
+
+    finished_at = time.time()
+    entries = []
+    for job_id in job_ids:
+        entry = final.get(job_id)
+        if entry is None:
+            entry = failed_entry(job_id, specs_by_id[job_id], "Not run")
+        entry['attempts'] = attempts[job_id]
+        entries.append(entry)
+
+    ok = sum(1 for entry in entries if entry['status'] == 'ok')
+    report = {
+        'manifest': manifest_path,
+        'blend_file': blend_path,
+        'workers': worker_count,
+        'concurrency': args.concurrency,
+        'started_at': started_at,
+        'finished_at': finished_at,
+        'total_seconds': round(finished_at - started_at, 3),
+        'summary': {'total': len(entries), 'ok': ok, 'failed': len(entries) - ok,
+                    'retried': sum(1 for entry in entries if entry['attempts'] > 1)},
+        'jobs': entries,
+    }
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Finished {ok}/{len(entries)} jobs in {report['total_seconds']:.1f}s, report: {report_path}")
+    return 0 if ok == len(entries) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,9 +2,11 @@
 
 from . import panels
 from . import helpers
+from . import lists
 
 # Collect all classes from submodules
 classes = []
+classes.extend(lists.classes)
 classes.extend(panels.classes)
 
 def register():
@@ -0,0 +1,48 @@
+# ui/lists.py
+
+import time
+
+from bpy.types import UIList
+
+
+JOB_STATE_ICONS = {
+    'QUEUED': "SORTTIME",
+    'RUNNING': "TIME",
+    'DONE': "CHECKMARK",
+    'FAILED': "ERROR",
+    'CANCELLED': "CANCEL",
+}
+
+
+def job_duration(job):
+    """Seconds the job has been waiting or running, or took to finish"""
+    if job.state == 'QUEUED':
+        return time.time() - job.queued_at
+    if job.state == 'RUNNING':
+        return time.time() - job.started_at
+    if job.started_at:
+        return job.finished_at - job.started_at
+    return 0.0
+
+
+class RUNCHAT_UL_jobs(UIList):
+    """Scheduler jobs: name, state, priority and duration"""
+    
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+            row = layout.row(align=True)
+            row.label(text=item.name, icon=JOB_STATE_ICONS.get(item.state, "QUESTION"))
+            if item.state == 'FAILED':
+                row.alert = True
+            row.label(text=item.state.title())
+            if item.priority:
+                row.label(text=f"P{item.priority:+d}")
+            row.label(text=f"{job_duration(item):.1f}s")
+        elif self.layout_type == 'GRID':
+            layout.alignment = 'CENTER'
+            layout.label(text="", icon=JOB_STATE_ICONS.get(item.state, "QUESTION"))
+
+
+classes = [
+    RUNCHAT_UL_jobs,
+]
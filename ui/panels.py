@@ -5,6 +5,10 @@ from bpy.types import Panel
 
 from . import helpers
 from .. import preferences
+from ..operators import live
+from ..operators import batch
+from ..operators import jobs
+from ..operators import sweep
 
 
 class RUNCHAT_PT_main_panel(Panel):
@@ -273,6 +277,10 @@ class RUNCHAT_PT_inputs_panel(Panel):
         else:
             text_row.prop(input_prop, "text_value", text="Text Input")
         
+        # Values swept in sweep mode
+        if context.scene.runchat_properties.sweep_enabled:
+            box.prop(input_prop, "sweep_values", text="Sweep", icon="MOD_ARRAY")
+        
         # Show uploaded URL if available
         if input_prop.uploaded_url:
             url_box = box.box()
@@ -367,6 +375,7 @@ class RUNCHAT_PT_outputs_panel(Panel):
         is_executing = ("Executing" in runchat_props.status or 
                        "processing" in runchat_props.status.lower() or
                        "Starting" in runchat_props.status or
+                       "Uploading" in runchat_props.status or
                        (runchat_props.progress > 0.0 and runchat_props.progress < 1.0))
         
         # Show running status if execution is in progress
@@ -559,6 +568,7 @@ class RUNCHAT_PT_execution_panel(Panel):
         is_executing = ("Executing" in runchat_props.status or 
                        "processing" in runchat_props.status.lower() or
                        "Starting" in runchat_props.status or
+                       "Uploading" in runchat_props.status or
                        (runchat_props.progress > 0.0 and runchat_props.progress < 1.0))
         
         return runchat_props.schema_loaded or is_executing
@@ -572,6 +582,7 @@ class RUNCHAT_PT_execution_panel(Panel):
         is_executing = ("Executing" in runchat_props.status or 
                        "processing" in runchat_props.status.lower() or
                        "Starting" in runchat_props.status or
+                       "Uploading" in runchat_props.status or
                        (runchat_props.progress > 0.0 and runchat_props.progress < 1.0))
         
         # Main execute/cancel button
@@ -579,12 +590,187 @@ class RUNCHAT_PT_execution_panel(Panel):
         exec_row.scale_y = 1.5
         
         if is_executing:
-            # Show status when executing (no cancel button since operator doesn't exist)
+            # Show status when executing, with a cancel button that aborts the run
             exec_row.alert = True
             exec_row.label(text="Executing Workflow...", icon="TIME")
+            exec_row.operator("runchat.cancel_execution", text="Cancel", icon="CANCEL")
         else:
             # Show execute button when not executing
-            exec_row.operator("runchat.execute", text="Execute Runchat", icon="PLAY")
+            exec_row.operator("runchat.execute", text="Execute Sweep" if runchat_props.sweep_enabled else "Execute Runchat", icon="PLAY")
+            # Bypass the result cache when the same inputs should really run again
+            rerun = exec_row.operator("runchat.execute", text="", icon="FILE_REFRESH")
+            rerun.force_rerun = True
+        
+        # Parameter sweep: runs every combination of the inputs' sweep values
+        sweep_box = layout.box()
+        sweep_settings = sweep_box.row()
+        sweep_settings.prop(runchat_props, "sweep_enabled")
+        sweep_settings.prop(runchat_props, "sweep_cell_size")
+        if sweep.is_sweep_running():
+            sweep_box.operator("runchat.cancel_sweep", icon="CANCEL")
+        if runchat_props.sweep_status:
+            sweep_box.label(text=runchat_props.sweep_status, icon="INFO")
+        if runchat_props.sweep_grid_image:
+            sweep_box.operator("runchat.view_sweep_grid", text="View Sweep Grid", icon="IMGDISPLAY")
+        
+        if runchat_props.sweep_cells:
+            cells_header = sweep_box.row()
+            cells_header.prop(runchat_props, "show_sweep_cells",
+                             icon="TRIA_DOWN" if runchat_props.show_sweep_cells else "TRIA_RIGHT",
+                             icon_only=True, emboss=False)
+            cells_header.label(text=f"Sweep Results ({len(runchat_props.sweep_cells)} runs)")
+            
+            if runchat_props.show_sweep_cells:
+                for cell_index, item in enumerate(runchat_props.sweep_cells):
+                    self.draw_sweep_cell(sweep_box, item, cell_index)
+        
+        # Live mode re-runs the workflow when the viewport changes
+        live_box = layout.box()
+        live_row = live_box.row()
+        if live.is_active():
+            live_row.alert = True
+            live_row.operator("runchat.toggle_live_mode", text="Stop Live Mode", icon="PAUSE", depress=True)
+        else:
+            live_row.operator("runchat.toggle_live_mode", text="Start Live Mode", icon="REC")
+        if runchat_props.live_status:
+            live_box.label(text=runchat_props.live_status, icon="INFO")
+
+        # Multi-camera batch
+        batch_box = layout.box()
+        batch_settings = batch_box.row()
+        batch_settings.prop(runchat_props, "batch_camera_scope", expand=True)
+        batch_settings.prop(runchat_props, "batch_max_parallel")
+        batch_row = batch_box.row()
+        batch_row.enabled = not batch.is_batch_running()
+        batch_row.operator("runchat.batch_cameras", text="Batch Run Cameras", icon="OUTLINER_OB_CAMERA")
+        
+        # Frame range runs save a numbered image sequence
+        batch_box.prop(runchat_props, "frame_output_path")
+        frame_options = batch_box.row()
+        frame_options.prop(runchat_props, "frame_resume")
+        frame_options.prop(runchat_props, "frame_add_strip")
+        frame_row = batch_box.row()
+        frame_row.enabled = not batch.is_batch_running()
+        frame_row.operator("runchat.batch_frames", text=f"Run Frames {context.scene.frame_start}-{context.scene.frame_end}", icon="RENDER_ANIMATION")
+        if runchat_props.batch_status:
+            batch_box.label(text=runchat_props.batch_status, icon="INFO")
+        
+        if runchat_props.batch_results:
+            results_header = batch_box.row()
+            results_header.prop(runchat_props, "show_batch_results",
+                               icon="TRIA_DOWN" if runchat_props.show_batch_results else "TRIA_RIGHT",
+                               icon_only=True, emboss=False)
+            results_header.label(text=f"Batch Results ({len(runchat_props.batch_results)} cameras)")
+            
+            if runchat_props.show_batch_results:
+                for result_index, item in enumerate(runchat_props.batch_results):
+                    self.draw_batch_result(batch_box, item, result_index)
+    
+    def draw_sweep_cell(self, layout, item, cell_index):
+        """Draw one sweep combination's status and outputs"""
+        cell_box = layout.box()
+        header = cell_box.row()
+        header.label(text=item.label or f"Run {cell_index + 1}", icon="MOD_ARRAY")
+        header.label(text=item.status)
+        
+        for output_index, output_prop in enumerate(item.outputs):
+            if not output_prop.value:
+                continue
+            output_row = cell_box.row()
+            if output_prop.output_type == "image":
+                op = output_row.operator("runchat.view_sweep_output", text=output_prop.name, icon="IMAGE_DATA")
+                op.cell_index = cell_index
+                op.output_index = output_index
+            else:
+                value_preview = output_prop.value[:50] + "..." if len(output_prop.value) > 50 else output_prop.value
+                output_row.label(text=f"{output_prop.name}: {value_preview}")
+    
+    def draw_batch_result(self, layout, item, result_index):
+        """Draw one camera's batch status and outputs"""
+        result_box = layout.box()
+        header = result_box.row()
+        header.label(text=item.camera_name, icon="CAMERA_DATA")
+        header.label(text=item.status)
+        
+        for output_index, output_prop in enumerate(item.outputs):
+            if not output_prop.value:
+                continue
+            output_row = result_box.row()
+            if output_prop.output_type == "image":
+                op = output_row.operator("runchat.view_batch_output", text=output_prop.name, icon="IMAGE_DATA")
+                op.result_index = result_index
+                op.output_index = output_index
+            else:
+                value_preview = output_prop.value[:50] + "..." if len(output_prop.value) > 50 else output_prop.value
+                output_row.label(text=f"{output_prop.name}: {value_preview}")
+
+
+class RUNCHAT_PT_jobs_panel(Panel):
+    bl_label = "Jobs"
+    bl_idname = "RUNCHAT_PT_jobs_panel"
+    bl_space_type = 'PROPERTIES'
+    bl_region_type = 'WINDOW'
+    bl_context = "scene"
+    bl_parent_id = "RUNCHAT_PT_main_panel"
+    
+    @classmethod
+    def poll(cls, context):
+        # Only show if API key is configured and there is something to queue or show
+        api_key = preferences.get_api_key()
+        if not api_key:
+            return False
+        
+        runchat_props = context.scene.runchat_properties
+        return runchat_props.schema_loaded or len(runchat_props.jobs) > 0
+    
+    def draw(self, context):
+        layout = self.layout
+        runchat_props = context.scene.runchat_properties
+        
+        # Queue a job with the current inputs
+        queue_row = layout.row(align=True)
+        queue_row.prop(runchat_props, "job_priority")
+        queue_row.operator("runchat.queue_job", text="Queue Job", icon="ADD")
+        
+        running = jobs.running_count()
+        queued = jobs.queued_count()
+        if running or queued:
+            layout.label(text=f"{running} running, {queued} waiting (max {preferences.get_max_concurrent_jobs()})", icon="TIME")
+        
+        layout.template_list("RUNCHAT_UL_jobs", "", runchat_props, "jobs", runchat_props, "active_job_index", rows=4)
+        
+        if 0 <= runchat_props.active_job_index < len(runchat_props.jobs):
+            self.draw_job_details(layout, runchat_props.jobs[runchat_props.active_job_index])
+        
+        if runchat_props.jobs:
+            layout.operator("runchat.clear_finished_jobs", icon="TRASH")
+    
+    def draw_job_details(self, layout, job):
+        """Draw the selected job's message, timings and outputs"""
+        box = layout.box()
+        header = box.row()
+        header.label(text=job.name, icon="PREFERENCES")
+        header.label(text=job.state.title())
+        
+        if job.message:
+            message_row = box.row()
+            message_row.alert = job.state == 'FAILED'
+            message_row.label(text=job.message)
+        
+        if job.started_at:
+            box.label(text=f"Waited {job.started_at - job.queued_at:.1f}s", icon="SORTTIME")
+        
+        for output_prop in job.outputs:
+            if not output_prop.value:
+                continue
+            value_preview = output_prop.value[:50] + "..." if len(output_prop.value) > 50 else output_prop.value
+            box.label(text=f"{output_prop.name}: {value_preview}")
+        
+        actions = box.row()
+        if job.state in ('QUEUED', 'RUNNING'):
+            actions.operator("runchat.cancel_job", icon="CANCEL").job_id = job.job_id
+        elif job.state == 'DONE':
+            actions.operator("runchat.apply_job_outputs", icon="IMPORT").job_id = job.job_id
 
 
 class RUNCHAT_PT_settings_panel(Panel):
@@ -627,6 +813,13 @@ class RUNCHAT_PT_settings_panel(Panel):
         capture_row.prop(runchat_props, "viewport_height")
         viewport_box.prop(runchat_props, "viewport_quality")
         
+        # Live mode settings
+        live_box = layout.box()
+        live_box.label(text="Live Mode Settings:", icon="REC")
+        live_box.prop(runchat_props, "live_debounce")
+        live_box.prop(runchat_props, "live_resolution_scale")
+        live_box.prop(runchat_props, "live_threshold")
+        
 
 
 
@@ -692,6 +885,66 @@ class RUNCHAT_PT_help_panel(Panel):
         # Info log row
         info_row = debug_box.row()
         info_row.operator("runchat.open_info_log", text="Show Info Log", icon="INFO")
+        
+        # Connection pool statistics
+        from ..utils import transport
+        stats = transport.get_pool_stats()
+        pool_box = debug_box.box()
+        pool_box.scale_y = 0.8
+        pool_box.label(text="Connection Pool:", icon="LINKED")
+        pool_box.label(text=f"Requests: {stats['requests']}  Reused: {stats['hits']}  New: {stats['misses']}")
+        pool_box.label(text=f"Reuse rate: {int(stats['hit_rate'] * 100)}%  ({len(stats['hosts'])} active hosts)")
+        
+        # Upload dedupe cache statistics
+        from ..utils.upload_cache import peek_stats
+        upload_stats = peek_stats()
+        upload_box = debug_box.box()
+        upload_box.scale_y = 0.8
+        upload_box.label(text="Upload Cache:", icon="FILE_CACHE")
+        upload_box.label(text=f"Hits: {upload_stats['hits']}  Misses: {upload_stats['misses']}  Entries: {upload_stats['entries']}")
+        upload_box.operator("runchat.clear_upload_cache", text="Clear Upload Cache", icon="TRASH")
+        
+        # Workflow result cache statistics
+        from ..utils import result_cache
+        result_stats = result_cache.peek_stats()
+        result_box = debug_box.box()
+        result_box.scale_y = 0.8
+        result_box.label(text="Result Cache:", icon="FILE_CACHE")
+        result_box.label(text=f"Hits: {result_stats['hits']}  Misses: {result_stats['misses']}  Cached: {result_stats['cached_bytes'] / (1024 * 1024):.1f} MB")
+        result_box.operator("runchat.clear_result_cache", text="Clear Result Cache", icon="TRASH")
+        
+        # Downloaded output asset cache statistics
+        from ..utils import asset_cache
+        asset_stats = asset_cache.peek_stats()
+        asset_box = debug_box.box()
+        asset_box.scale_y = 0.8
+        asset_box.label(text="Asset Cache:", icon="FILE_CACHE")
+        asset_box.label(text=f"Hits: {asset_stats['hits']}  Misses: {asset_stats['misses']}  Hit rate: {int(asset_stats['hit_rate'] * 100)}%")
+        asset_box.label(text=f"Files: {asset_stats['entries']} ({asset_stats['pinned']} pinned)  "
+                             f"Size: {asset_stats['cached_bytes'] / (1024 * 1024):.1f} / {asset_stats['max_bytes'] / (1024 * 1024):.0f} MB")
+        row = asset_box.row(align=True)
+        row.operator("runchat.purge_asset_cache", text="Purge", icon="TRASH")
+        op = row.operator("runchat.purge_asset_cache", text="Purge All", icon="CANCEL")
+        op.include_pinned = True
+        
+        # Output images owned by the datablock registry
+        from ..utils import datablocks
+        image_stats = datablocks.stats()
+        image_box = debug_box.box()
+        image_box.scale_y = 0.8
+        image_box.label(text="Output Images:", icon="IMAGE_DATA")
+        image_box.label(text=f"Images: {image_stats['images']} for {image_stats['slots']} outputs  "
+                             f"({image_stats['bytes'] / (1024 * 1024):.1f} MB)")
+        image_box.label(text=f"History: {image_stats['history']} ({image_stats['history_bytes'] / (1024 * 1024):.1f} MB)")
+        image_box.operator("runchat.purge_output_images", text="Purge History", icon="TRASH")
+        
+        # Viewport capture cache statistics
+        from ..utils import capture_cache
+        capture_stats = capture_cache.stats()
+        capture_box = debug_box.box()
+        capture_box.scale_y = 0.8
+        capture_box.label(text="Capture Cache:", icon="RENDER_STILL")
+        capture_box.label(text=f"Hits: {capture_stats['hits']}  Misses: {capture_stats['misses']}  Cached: {capture_stats['cached_bytes'] / (1024 * 1024):.1f} MB")
 
 
 
@@ -700,6 +953,7 @@ classes = [
     RUNCHAT_PT_inputs_panel,
     RUNCHAT_PT_outputs_panel,
     RUNCHAT_PT_execution_panel,
+    RUNCHAT_PT_jobs_panel,
     RUNCHAT_PT_settings_panel,
     RUNCHAT_PT_help_panel,
 ] 
\ No newline at end of file
@@ -2,15 +2,29 @@
 
 # Import the main functions to maintain compatibility
 from .image_utils import (
+    image_to_bytes,
     image_to_base64,
     base64_to_image,
+    blender_image_to_bytes,
     blender_image_to_base64,
+    load_image_from_bytes,
     load_image_from_base64,
     load_image_from_url,
+    load_image_from_file,
+    decode_image,
+    image_from_decoded,
     get_active_render_image,
     get_active_image_editor_image,
+    read_image_pixels,
+    read_viewport_pixels,
+    encode_readback,
+    discard_readback,
+    submit_encode,
+    capture_viewport_async,
+    capture_viewport_bytes,
     capture_viewport_image,
     auto_display_image,
+    view_image_from_url,
     process_image_array,
     process_single_image,
     setup_image_viewer
@@ -32,22 +46,44 @@ from .data_utils import (
 )
 
 from .blender_utils import (
+    get_screen,
     get_blender_version_info,
     create_progress_callback
 )
 
+# Shared infrastructure modules (used as utils.transport, utils.workers, ...)
+from . import transport
+from . import workers
+from . import capture_cache
+from . import dispatch
+from . import cancellation
+
 # Re-export everything for backward compatibility
 __all__ = [
     # Image utilities
+    'image_to_bytes',
     'image_to_base64',
     'base64_to_image', 
+    'blender_image_to_bytes',
     'blender_image_to_base64',
+    'load_image_from_bytes',
     'load_image_from_base64',
     'load_image_from_url',
+    'load_image_from_file',
+    'decode_image',
+    'image_from_decoded',
     'get_active_render_image',
     'get_active_image_editor_image',
+    'read_image_pixels',
+    'read_viewport_pixels',
+    'encode_readback',
+    'discard_readback',
+    'submit_encode',
+    'capture_viewport_async',
+    'capture_viewport_bytes',
     'capture_viewport_image',
     'auto_display_image',
+    'view_image_from_url',
     'process_image_array',
     'process_single_image',
     'setup_image_viewer',
@@ -66,6 +102,7 @@ __all__ = [
     'sanitize_filename',
     
     # Blender utilities
+    'get_screen',
     'get_blender_version_info',
     'create_progress_callback'
 ] 
\ No newline at end of file
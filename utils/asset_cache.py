@@ -0,0 +1,307 @@
+# utils/asset_cache.py
+
+"""
+Persistent content-addressed cache of downloaded output assets
+Maps each output URL to the SHA-256 of its bytes; the bytes are stored once per
+digest and extension as <digest><ext> in the cache directory (importers go by
+the extension), so viewing, saving and importing
+the same output never downloads it twice. Saves hard-link (or copy) the cached
+file out. The least recently used files are evicted once the total size passes
+the cap, except pinned ones that Blender data still reads from (video strips).
+Large files are downloaded in Range segments, and a download that is cut off
+resumes from its partial file the next time the URL is fetched. Output URLs are
+re-signed on every run, so partial files nobody resumed are deleted once stale.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from . import segmented_download
+from . import workers
+from .cache_paths import get_cache_dir, atomic_write_bytes
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+INDEX_FILENAME = "index.json"
+HASH_NAME = "sha256"
+PARTIAL_PREFIX = ".download_"
+# Partial downloads untouched this long are not coming back (a running one writes state every second)
+STALE_PARTIAL_AGE = 6 * 60 * 60
+
+
+def url_extension(url: str, default: str = "") -> str:
+    """Lower-case file extension of the URL's path"""
+    ext = os.path.splitext(urlparse(url).path)[1].lower()
+    return ext if ext else default
+
+
+def link_or_copy(source: str, destination: str):
+    """Place a cached file at destination, by hard link where the filesystem allows it"""
+    directory = os.path.dirname(os.path.abspath(destination))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    os.close(fd)
+    os.unlink(temp_path)
+    try:
+        try:
+            os.link(source, temp_path)
+        except OSError:
+            # Different volume, or a filesystem without hard links
+            shutil.copyfile(source, temp_path)
+        os.replace(temp_path, destination)
+    except Exception:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class AssetCache:
+    """Disk-backed URL -> content digest -> file store with LRU eviction"""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._urls = None
+        self._files = None
+        self._lock = threading.Lock()
+        # url -> lock held while that URL downloads, so two callers don't write the same partial file
+        self._downloads = {}
+
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILENAME)
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _load_locked(self):
+        if self._files is not None:
+            return
+        self._urls = {}
+        self._files = {}
+        try:
+            with open(self._index_path(), 'r') as f:
+                data = json.load(f)
+            for key, entry in data.get('files', {}).items():
+                path = self._file_path(key)
+                if os.path.exists(path) and os.path.getsize(path) == entry.get('size'):
+                    self._files[key] = entry
+            self._urls = {url: key for url, key in data.get('urls', {}).items() if key in self._files}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[Runchat] Asset cache index unreadable, starting fresh: {e}")
+        self._remove_partials_locked(STALE_PARTIAL_AGE)
+
+    def _remove_partials_locked(self, older_than: Optional[float] = None):
+        """Delete partial files of interrupted downloads, all of them or those idle for older_than seconds"""
+        if not os.path.isdir(self.directory):
+            return
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.startswith(PARTIAL_PREFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if older_than is None or now - os.path.getmtime(path) > older_than:
+                    os.unlink(path)
+            except OSError:
+                pass
+
+    def _save_locked(self):
+        try:
+            payload = json.dumps({'version': 1, 'urls': self._urls, 'files': self._files}).encode('utf-8')
+            atomic_write_bytes(self._index_path(), payload)
+        except Exception as e:
+            print(f"[Runchat] Could not save asset cache index: {e}")
+
+    def _remove_locked(self, key: str):
+        if self._files.pop(key, None) is None:
+            return
+        self._urls = {url: k for url, k in self._urls.items() if k != key}
+        try:
+            os.unlink(self._file_path(key))
+        except OSError:
+            pass
+
+    def _evict_locked(self, keep: Optional[str] = None):
+        """Drop stale partial downloads, then least recently used unpinned files (other than keep) until the cache fits the cap"""
+        self._remove_partials_locked(STALE_PARTIAL_AGE)
+        total = sum(entry.get('size', 0) for entry in self._files.values())
+        for key in sorted(self._files, key=lambda k: self._files[k].get('last_used', 0)):
+            if total <= self.max_bytes:
+                break
+            if key == keep or self._files[key].get('pinned'):
+                continue
+            total -= self._files[key].get('size', 0)
+            self._remove_locked(key)
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Path of the cached file for this URL, counting the hit or miss"""
+        with self._lock:
+            self._load_locked()
+            key = self._urls.get(url)
+            entry = self._files.get(key) if key else None
+            if entry is not None:
+                path = self._file_path(key)
+                if os.path.exists(path):
+                    self.hits += 1
+                    entry['last_used'] = time.time()
+                    self._save_locked()
+                    return path
+                self._remove_locked(key)
+                self._save_locked()
+            self.misses += 1
+            return None
+
+    def fetch(self, url: str, timeout=60, default_ext: str = "",
+              on_progress: Optional[Callable[[int, int], None]] = None) -> str:
+        """Local path of the asset at url, downloading it into the cache on a miss"""
+        path = self.lookup(url)
+        if path is not None:
+            return path
+
+        with self._lock:
+            # Per asset, not per link: two signed links to one file share its partial download
+            download_lock = self._downloads.setdefault(segmented_download.resource_url(url), threading.Lock())
+        with download_lock:
+            # Another caller may have finished the same download while this one waited
+            path = self._peek(url)
+            if path is not None:
+                return path
+            return self._download(url, timeout, default_ext, on_progress)
+
+    def _peek(self, url: str) -> Optional[str]:
+        with self._lock:
+            self._load_locked()
+            key = self._urls.get(url)
+            if key in self._files and os.path.exists(self._file_path(key)):
+                return self._file_path(key)
+        return None
+
+    def _download(self, url, timeout, default_ext, on_progress) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        ext = url_extension(url, default_ext)
+        # Named after the URL without its signature so an interrupted download finds its partial
+        # file again through a re-signed link; segmented_download checks it is still the same file
+        resource = segmented_download.resource_url(url)
+        url_hash = hashlib.blake2b(resource.encode('utf-8'), digest_size=16).hexdigest()
+        temp_path = os.path.join(self.directory, f"{PARTIAL_PREFIX}{url_hash}{ext}")
+        try:
+            download = segmented_download.download(url, temp_path, timeout=timeout,
+                                                    hash_name=HASH_NAME, on_progress=on_progress)
+            key = download['digest'] + ext
+            now = time.time()
+            with self._lock:
+                self._load_locked()
+                entry = self._files.get(key)
+                if entry is None:
+                    entry = {'size': download['bytes'], 'created': now}
+                    os.replace(temp_path, self._file_path(key))
+                    self._files[key] = entry
+                entry['last_used'] = now
+                self._urls[url] = key
+                path = self._file_path(key)
+                self._evict_locked(keep=key)
+                self._save_locked()
+            return path
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            with self._lock:
+                self._downloads.pop(resource, None)
+
+    def copy_out(self, url: str, destination: str, timeout=60,
+                 on_progress: Optional[Callable[[int, int], None]] = None) -> str:
+        """Save the asset at url to destination from the cache (downloading it first on a miss)"""
+        link_or_copy(self.fetch(url, timeout=timeout, on_progress=on_progress), destination)
+        return destination
+
+    def pin(self, path: str):
+        """Keep a cached file through eviction because Blender data reads it from disk"""
+        with self._lock:
+            self._load_locked()
+            entry = self._files.get(os.path.basename(path))
+            if entry is not None and not entry.get('pinned'):
+                entry['pinned'] = True
+                self._save_locked()
+
+    def set_max_bytes(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._load_locked()
+            self._evict_locked()
+            self._save_locked()
+
+    def purge(self, include_pinned: bool = False):
+        """Delete cached files (pinned ones only if asked) and reset counters"""
+        with self._lock:
+            self._load_locked()
+            for key in list(self._files):
+                if include_pinned or not self._files[key].get('pinned'):
+                    self._remove_locked(key)
+            self._remove_partials_locked()
+            self.hits = 0
+            self.misses = 0
+            self._save_locked()
+
+    def stats(self, load: bool = True) -> Dict[str, Any]:
+        """Counters and index size; with load=False an index not read yet counts as empty (no disk access)"""
+        with self._lock:
+            if load:
+                self._load_locked()
+            files = self._files or {}
+            total = self.hits + self.misses
+            return {
+                'entries': len(files),
+                'urls': len(self._urls or {}),
+                'pinned': sum(1 for e in files.values() if e.get('pinned')),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else 0.0,
+                'cached_bytes': sum(e.get('size', 0) for e in files.values()),
+                'max_bytes': self.max_bytes,
+            }
+
+
+_asset_cache = None
+_asset_cache_lock = threading.Lock()
+_index_loading = False
+
+
+def _load_index():
+    get_asset_cache().stats()
+
+
+def peek_stats() -> Dict[str, Any]:
+    """
+    Asset cache stats for UI draw code: never touches the disk itself. The first call reads
+    the index on a worker, so the figures fill in on a later redraw.
+    """
+    global _index_loading
+    cache = _asset_cache
+    if (cache is None or cache._files is None) and not _index_loading:
+        _index_loading = True
+        workers.submit('download', _load_index)
+    if cache is None:
+        return {'entries': 0, 'urls': 0, 'pinned': 0, 'hits': 0, 'misses': 0, 'hit_rate': 0.0,
+                'cached_bytes': 0, 'max_bytes': DEFAULT_MAX_BYTES}
+    return cache.stats(load=False)
+
+
+def get_asset_cache() -> AssetCache:
+    """Get the process-wide asset cache"""
+    global _asset_cache
+    with _asset_cache_lock:
+        if _asset_cache is None:
+            _asset_cache = AssetCache(get_cache_dir("assets"))
+        return _asset_cache
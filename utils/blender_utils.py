@@ -27,6 +27,13 @@ def get_blender_version_info() -> Dict[str, Any]:
         }
 
 
+def get_screen():
+    """The active screen, or None when Blender runs without a UI (blender -b, timers without a window)"""
+    if bpy.app.background:
+        return None
+    return getattr(bpy.context, 'screen', None)
+
+
 def create_progress_callback(node, operation_name: str) -> Callable:
     """Create a progress callback function for long operations"""
     def update_progress(progress: float, message: str = ""):
@@ -62,7 +69,8 @@ def safe_scene_update():
             bpy.context.view_layer.update()
         
         # Force UI redraw
-        for area in bpy.context.screen.areas:
+        screen = get_screen()
+        for area in screen.areas if screen else []:
             area.tag_redraw()
             
     except Exception as e:
@@ -282,7 +290,8 @@ def force_ui_update():
     """Force a complete UI update"""
     try:
         # Update all areas
-        for area in bpy.context.screen.areas:
+        screen = get_screen()
+        for area in screen.areas if screen else []:
             area.tag_redraw()
         
         # Update scene
@@ -0,0 +1,46 @@
+# utils/cache_paths.py
+
+import os
+import tempfile
+
+import bpy
+
+# Top-level addon package name (this module lives in <addon>.utils)
+ADDON_PACKAGE = __package__.rsplit('.', 1)[0] if __package__ and '.' in __package__ else (__package__ or "runchat")
+
+
+def get_cache_dir(name: str = "") -> str:
+    """Get (and create) a persistent per-user cache directory for the addon"""
+    base_dir = None
+
+    # Blender 4.2+ extensions get a writable per-user directory
+    try:
+        if hasattr(bpy.utils, 'extension_path_user'):
+            base_dir = bpy.utils.extension_path_user(ADDON_PACKAGE, path="cache", create=True)
+    except Exception as e:
+        print(f"[Runchat] Extension user path unavailable ({e}), using temp directory for cache")
+        base_dir = None
+
+    if not base_dir:
+        base_dir = os.path.join(tempfile.gettempdir(), "runchat_cache")
+
+    path = os.path.join(base_dir, name) if name else base_dir
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def atomic_write_bytes(path: str, data: bytes):
+    """Write a file atomically (temp file in the same directory, then rename)"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except Exception:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,105 @@
+# utils/cancellation.py
+
+"""
+Cooperative cancellation for background workflow runs
+A CancelToken is shared by everything one run starts: its thread, its upload
+and download workers, its timers. Code running for the run makes the token
+current on its thread (use_token / bind); the HTTP transport then registers
+every connection it opens with the token, so cancel() can shut the sockets
+down and blocking requests fail at once instead of running to their timeout.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+_local = threading.local()
+
+
+class OperationCancelled(Exception):
+    """Raised inside a run once its token has been cancelled"""
+
+
+class CancelToken:
+    """Cancellation flag plus the callbacks that release a run's resources"""
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks = []
+        self._event = threading.Event()
+        # Server instance the run was submitted as, once known, so cancel can stop it server-side too
+        self.instance_id = ""
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def raise_if_cancelled(self):
+        if self._cancelled:
+            raise OperationCancelled(f"{self.name or 'Run'} was cancelled")
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to timeout seconds, waking early on cancel. Returns True if cancelled."""
+        return self._event.wait(timeout)
+
+    def on_cancel(self, callback: Callable) -> Callable:
+        """Call callback() on cancel (immediately if already cancelled). Returns callback for remove()."""
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+                return callback
+        _run_callback(callback)
+        return callback
+
+    def remove(self, callback: Callable):
+        """Forget a callback whose resource was released normally"""
+        with self._lock:
+            try:
+                self._callbacks.remove(callback)
+            except ValueError:
+                pass
+
+    def cancel(self):
+        """Set the flag and run every callback once (safe from any thread)"""
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        self._event.set()
+        for callback in callbacks:
+            _run_callback(callback)
+
+
+def _run_callback(callback):
+    try:
+        callback()
+    except Exception as e:
+        print(f"[Runchat] Error releasing cancelled resource: {e}")
+
+
+def current() -> Optional[CancelToken]:
+    """The token of the run this thread is working for, if any"""
+    return getattr(_local, 'token', None)
+
+
+@contextmanager
+def use_token(token: Optional[CancelToken]):
+    """Make token current on this thread for the duration of the block"""
+    previous = current()
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+def bind(token: Optional[CancelToken], fn: Callable) -> Callable:
+    """Wrap fn so it runs with token current (for work handed to a worker pool)"""
+    def run(*args, **kwargs):
+        # No early exit here: fn's own cleanup (finally blocks) must still run for a cancelled token
+        with use_token(token):
+            return fn(*args, **kwargs)
+    return run
@@ -0,0 +1,212 @@
+# utils/capture_cache.py
+
+"""
+Viewport capture cache
+Keeps recently encoded captures keyed by a fingerprint of the scene state
+(depsgraph update counter, camera, view, viewport shading and overlays, frame,
+resolution and quality) so a preview followed by an upload of the same frame
+only renders once.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+import bpy
+from bpy.app.handlers import persistent
+
+# Encoded JPEGs kept in memory at most
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# Images the addon creates itself; loading them must not invalidate the cache
+IGNORED_IMAGE_PREFIXES = ("Viewport_Preview", "Preview_")
+
+_lock = threading.Lock()
+_entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_cached_bytes = 0
+_depsgraph_counter = 0
+_hits = 0
+_misses = 0
+
+
+def _round_matrix(matrix, digits: int = 5) -> tuple:
+    return tuple(round(value, digits) for row in matrix for value in row)
+
+
+# Viewport display settings that change the drawn image but never reach the depsgraph
+SHADING_FIELDS = (
+    'type', 'light', 'color_type', 'single_color', 'background_type', 'background_color',
+    'studio_light', 'studiolight_rotate_z', 'studiolight_intensity', 'studiolight_background_alpha',
+    'studiolight_background_blur', 'use_scene_lights', 'use_scene_world', 'use_scene_lights_render',
+    'use_scene_world_render', 'show_xray', 'xray_alpha', 'show_xray_wireframe', 'xray_alpha_wireframe',
+    'show_shadows', 'shadow_intensity', 'show_cavity', 'show_object_outline', 'object_outline_color',
+    'show_specular_highlight', 'show_backface_culling', 'wireframe_color_type', 'render_pass', 'use_dof',
+)
+OVERLAY_FIELDS = (
+    'show_overlays', 'show_floor', 'show_ortho_grid', 'show_axis_x', 'show_axis_y', 'show_axis_z',
+    'show_cursor', 'show_object_origins', 'show_extras', 'show_bones', 'show_outline_selected',
+    'show_relationship_lines', 'show_wireframes', 'wireframe_threshold', 'show_face_orientation',
+    'show_text', 'show_stats', 'show_annotation',
+)
+
+
+def _settings_key(settings, fields) -> tuple:
+    """Current values of the given fields (skipping any this Blender version lacks)"""
+    values = []
+    for field in fields:
+        value = getattr(settings, field, None)
+        if hasattr(value, '__len__') and not isinstance(value, str):
+            value = tuple(round(component, 4) for component in value)
+        elif isinstance(value, float):
+            value = round(value, 4)
+        values.append(value)
+    return tuple(values)
+
+
+def _is_ignored_update(update) -> bool:
+    """True for depsgraph updates that cannot change what the viewport shows"""
+    id_data = getattr(update, 'id', None)
+    return isinstance(id_data, bpy.types.Image) and id_data.name.startswith(IGNORED_IMAGE_PREFIXES)
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    """Any real scene change invalidates every cached capture"""
+    global _depsgraph_counter
+    try:
+        if all(_is_ignored_update(update) for update in depsgraph.updates):
+            return
+    except Exception:
+        pass
+    _depsgraph_counter += 1
+    clear()
+
+
+@persistent
+def _on_load_post(*args):
+    clear()
+
+
+def get_capture_key(context, width: int, height: int, quality: int) -> Optional[tuple]:
+    """Fingerprint of everything that affects a viewport capture (main thread only)"""
+    try:
+        scene = context.scene
+        camera = scene.camera
+        camera_key = (camera.name, _round_matrix(camera.matrix_world)) if camera else None
+        
+        # View matrix and shading live on the viewport, not in the depsgraph
+        view_key = None
+        from .image_utils import _find_view3d
+        area, region, space = _find_view3d(context)
+        if space is not None:
+            region_3d = space.region_3d
+            view_key = (
+                region_3d.view_perspective,
+                _round_matrix(region_3d.view_matrix),
+                round(space.lens, 4),
+                _settings_key(space.shading, SHADING_FIELDS),
+                _settings_key(space.overlay, OVERLAY_FIELDS),
+                getattr(space, 'show_gizmo', None),
+            )
+        
+        return (_depsgraph_counter, scene.name, scene.frame_current, camera_key, view_key, width, height, quality)
+    except Exception as e:
+        print(f"[Runchat] Could not fingerprint viewport state: {e}")
+        return None
+
+
+def lookup(key: Optional[tuple]) -> Optional[Dict[str, Any]]:
+    """Return a cached encode result for this key, counting the hit or miss"""
+    global _hits, _misses
+    if key is None:
+        return None
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            _misses += 1
+            return None
+        _entries.move_to_end(key)
+        _hits += 1
+        return entry
+
+
+def lookup_future(key: Optional[tuple]) -> Optional[Future]:
+    """A completed Future wrapping a cached result, so callers can treat hits like fresh encodes"""
+    entry = lookup(key)
+    if entry is None:
+        return None
+    future = Future()
+    future.set_result(entry)
+    return future
+
+
+def store(key: Optional[tuple], encoded: Optional[Dict[str, Any]]):
+    """Cache an encode result (thread-safe). Results for an outdated scene state are dropped."""
+    global _cached_bytes
+    if key is None or not encoded:
+        return
+    size = len(encoded['data'])
+    if size > MAX_CACHE_BYTES:
+        return
+    with _lock:
+        if key[0] != _depsgraph_counter:
+            return
+        old = _entries.pop(key, None)
+        if old is not None:
+            _cached_bytes -= len(old['data'])
+        _entries[key] = encoded
+        _cached_bytes += size
+        # Evict least recently used captures over the memory cap
+        while _cached_bytes > MAX_CACHE_BYTES and _entries:
+            _, evicted = _entries.popitem(last=False)
+            _cached_bytes -= len(evicted['data'])
+
+
+def store_when_done(key: Optional[tuple], future: Future):
+    """Cache a pending encode once its Future completes"""
+    if key is None:
+        return
+    
+    def _done(completed):
+        try:
+            store(key, completed.result())
+        except Exception:
+            pass
+    
+    future.add_done_callback(_done)
+
+
+def clear():
+    """Drop all cached captures"""
+    global _cached_bytes
+    with _lock:
+        _entries.clear()
+        _cached_bytes = 0
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        total = _hits + _misses
+        return {
+            'entries': len(_entries),
+            'cached_bytes': _cached_bytes,
+            'hits': _hits,
+            'misses': _misses,
+            'hit_rate': (_hits / total) if total else 0.0,
+        }
+
+
+def register():
+    if _on_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    if _on_load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_on_load_post)
+
+
+def unregister():
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    clear()
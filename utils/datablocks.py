@@ -0,0 +1,263 @@
+# utils/datablocks.py
+
+"""
+Registry of the Image datablocks the addon creates
+Images are tagged with custom properties naming their slot (an output or
+preview name) and generation, so the registry survives saving and reopening
+the .blend. Each slot has one current image, named after the slot and updated
+in place (resized when needed). For outputs, the previous image is kept as
+history ("Name [3]") instead of piling up Name.001, Name.002, ...; old
+generations are freed by count per slot and by a memory budget, recycling
+their datablocks where possible.
+"""
+
+import os
+import re
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import bpy
+
+from .cache_paths import get_cache_dir
+
+SLOT_KEY = "runchat_slot"
+GENERATION_KEY = "runchat_generation"
+CURRENT_KEY = "runchat_current"
+CREATED_KEY = "runchat_created"
+# Tag that earlier versions put on images they filled from decoded pixels
+LEGACY_DECODED_KEY = "runchat_decoded"
+
+DEFAULT_HISTORY_LIMIT = 2
+DEFAULT_MEMORY_BUDGET = 1024 * 1024 * 1024
+
+# Set from the addon preferences
+_history_limit = DEFAULT_HISTORY_LIMIT
+_memory_budget = DEFAULT_MEMORY_BUDGET
+
+
+def configure(history_limit: Optional[int] = None, memory_budget: Optional[int] = None):
+    """Older generations kept per output, and the memory they may use together (0 = no limit)"""
+    global _history_limit, _memory_budget
+    if history_limit is not None:
+        _history_limit = max(0, int(history_limit))
+    if memory_budget is not None:
+        _memory_budget = max(0, int(memory_budget))
+
+
+def image_bytes(image) -> int:
+    """Approximate memory held by an image's pixels"""
+    width, height = image.size
+    channels = image.channels or 4
+    return width * height * channels * (4 if image.is_float else 1)
+
+
+def managed_images(slot: Optional[str] = None) -> List[Any]:
+    """Images owned by the registry, all of them or one slot's"""
+    return [image for image in bpy.data.images
+            if image.get(SLOT_KEY) and (slot is None or image.get(SLOT_KEY) == slot)]
+
+
+def current_image(slot: str):
+    for image in managed_images(slot):
+        if image.get(CURRENT_KEY):
+            return image
+    return None
+
+
+def _current_or_legacy(slot: str):
+    """
+    Current image of the slot, adopting an untracked one holding its name only if older
+    versions of the addon provably created it. Any other image of that name is the user's
+    and is left alone; the slot's image then gets a name of its own.
+    """
+    image = current_image(slot)
+    if image is None:
+        legacy = bpy.data.images.get(slot)
+        if legacy is not None and not legacy.get(SLOT_KEY) and _created_by_addon(legacy):
+            _tag(legacy, slot, 0)
+            image = legacy
+    return image
+
+
+def history_images(slot: Optional[str] = None) -> List[Any]:
+    """Earlier generations, newest first"""
+    images = [image for image in managed_images(slot) if not image.get(CURRENT_KEY)]
+    return sorted(images, key=lambda image: image.get(GENERATION_KEY, 0), reverse=True)
+
+
+def in_use(image) -> bool:
+    """True if something other than an editor shows the image (a material, texture, the user's fake user)"""
+    if image.use_fake_user:
+        return True
+    users = bpy.data.user_map(subset=[image]).get(image, set())
+    return any(not isinstance(user, (bpy.types.Screen, bpy.types.WindowManager)) for user in users)
+
+
+def _next_generation(slot: str) -> int:
+    return max((image.get(GENERATION_KEY, 0) for image in managed_images(slot)), default=0) + 1
+
+
+def _tag(image, slot: str, generation: int):
+    image[SLOT_KEY] = slot
+    image[GENERATION_KEY] = generation
+    image[CURRENT_KEY] = True
+    image[CREATED_KEY] = time.time()
+    image.name = slot
+
+
+def _retire(image):
+    """Turn the current image into history, freeing its name for the next generation"""
+    image[CURRENT_KEY] = False
+    image.name = f"{image[SLOT_KEY]} [{image.get(GENERATION_KEY, 0)}]"
+
+
+def _surplus(slot: str) -> List[Any]:
+    """History images beyond the per-slot limit, oldest first"""
+    return list(reversed(history_images(slot)[_history_limit:]))
+
+
+def acquire_image(slot: str, width: int, height: int, history: bool = False):
+    """
+    Image to fill with the next pixels for a slot (main thread).
+    Without history the current image is updated in place. With history it is kept as the
+    previous generation, and a surplus old generation is recycled for the new one if possible.
+    """
+    current = _current_or_legacy(slot)
+    reusable = current is not None and current.source == 'GENERATED'
+
+    if reusable and not history:
+        image = current
+        image[GENERATION_KEY] = image.get(GENERATION_KEY, 0) + 1
+        image[CREATED_KEY] = time.time()
+    else:
+        generation = _next_generation(slot)
+        if current is not None:
+            if history:
+                _retire(current)
+            else:
+                release(current)
+
+        image = None
+        for candidate in _surplus(slot):
+            if candidate.source == 'GENERATED' and not in_use(candidate):
+                image = candidate
+                break
+        if image is None:
+            image = bpy.data.images.new(slot, width, height, alpha=True)
+        _tag(image, slot, generation)
+
+    if tuple(image.size) != (width, height):
+        image.scale(width, height)
+    enforce_limits()
+    return image
+
+
+def adopt_image(slot: str, image, history: bool = False):
+    """Register an image loaded some other way (from a file) as the slot's current image (main thread)"""
+    current = _current_or_legacy(slot)
+    if current is not None and current != image:
+        if history:
+            _retire(current)
+        else:
+            release(current)
+    _tag(image, slot, _next_generation(slot))
+    enforce_limits()
+    return image
+
+
+def release(image) -> int:
+    """
+    Remove a managed image, or hand it over to the user if something uses it
+    (it leaves the registry and keeps its pixels). Returns the bytes freed.
+    """
+    if in_use(image):
+        if image.get(CURRENT_KEY):
+            _retire(image)
+        for key in (SLOT_KEY, GENERATION_KEY, CURRENT_KEY, CREATED_KEY):
+            if key in image:
+                del image[key]
+        return 0
+    size = image_bytes(image)
+    bpy.data.images.remove(image)
+    return size
+
+
+def _addon_file(image) -> bool:
+    """The image was loaded from a file the addon downloaded (temp or cache directory)"""
+    if not image.filepath:
+        return False
+    path = os.path.realpath(bpy.path.abspath(image.filepath))
+    roots = (os.path.realpath(tempfile.gettempdir()), os.path.realpath(get_cache_dir()))
+    return any(path.startswith(root + os.sep) for root in roots)
+
+
+def _created_by_addon(image) -> bool:
+    return bool(image.get(LEGACY_DECODED_KEY)) or _addon_file(image)
+
+
+def _duplicates(slot: str) -> List[Any]:
+    """
+    Untracked Name.001 style copies of a slot left by older versions of the addon. Only ones
+    loaded from the addon's downloads: a user's own image may share the name pattern.
+    """
+    pattern = re.compile(re.escape(slot) + r"\.\d{3,}")
+    return [image for image in bpy.data.images
+            if not image.get(SLOT_KEY) and pattern.fullmatch(image.name) and _created_by_addon(image)]
+
+
+def purge(keep_generations: Optional[int] = None, memory_budget: Optional[int] = None,
+          duplicates: bool = False) -> Dict[str, int]:
+    """
+    Free old generations: all but keep_generations per slot, then the oldest remaining
+    ones until history fits memory_budget (0 = no budget). With duplicates, unused
+    Name.001 copies of the slots go too (explicit purges only). Current images are kept.
+    Returns {'images', 'bytes'} freed.
+    """
+    keep = _history_limit if keep_generations is None else max(0, keep_generations)
+    budget = _memory_budget if memory_budget is None else max(0, memory_budget)
+    freed = {'images': 0, 'bytes': 0}
+
+    def free(image):
+        size = release(image)
+        if size:
+            freed['images'] += 1
+            freed['bytes'] += size
+
+    for slot in {image[SLOT_KEY] for image in managed_images()}:
+        for image in history_images(slot)[keep:]:
+            free(image)
+        if not duplicates:
+            continue
+        for image in _duplicates(slot):
+            if not in_use(image):
+                free(image)
+
+    if budget:
+        remaining = sorted(history_images(), key=lambda image: image.get(CREATED_KEY, 0))
+        total = sum(image_bytes(image) for image in remaining)
+        for image in remaining:
+            if total <= budget:
+                break
+            total -= image_bytes(image)
+            free(image)
+    return freed
+
+
+def enforce_limits():
+    """Apply the preference limits after a new generation"""
+    freed = purge()
+    if freed['images']:
+        print(f"[Runchat] Freed {freed['images']} old output images ({freed['bytes'] / (1024 * 1024):.1f} MB)")
+
+
+def stats() -> Dict[str, Any]:
+    images = managed_images()
+    history = [image for image in images if not image.get(CURRENT_KEY)]
+    return {
+        'slots': len({image[SLOT_KEY] for image in images}),
+        'images': len(images),
+        'history': len(history),
+        'bytes': sum(image_bytes(image) for image in images),
+        'history_bytes': sum(image_bytes(image) for image in history),
+    }
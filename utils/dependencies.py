@@ -31,6 +31,16 @@ def get_pil():
         raise ImportError("PIL wheel not found. Please use a properly bundled version of the addon.")
 
 
+def get_numpy():
+    """Get numpy (bundled with Blender's Python)"""
+    try:
+        import numpy
+        return numpy, True
+    except ImportError as e:
+        print(f"[Runchat] numpy not available, using file-based image encoding: {e}")
+        return None, False
+
+
 def get_http_client():
     """Get HTTP client (requests) from wheel"""
     return get_requests()
@@ -0,0 +1,124 @@
+# utils/dispatch.py
+
+"""
+Main-thread dispatch queue
+Background threads must not touch Blender data. They post messages here
+instead; a single bpy.app.timers callback drains the queue on the main thread
+in bounded batches and applies them. The timer stops itself once the queue is
+empty and no background work is outstanding.
+"""
+
+import queue
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+import bpy
+
+# Per-tick limits so a burst of messages can't stall the UI
+MAX_MESSAGES_PER_TICK = 64
+TICK_BUDGET_SECONDS = 0.008
+BUSY_INTERVAL = 0.02
+IDLE_INTERVAL = 0.1
+
+# SimpleQueue put/get are atomic, so producers never wait on a Python-level lock
+_queue: "queue.SimpleQueue[Message]" = queue.SimpleQueue()
+
+# Outstanding background jobs; only changed on the main thread
+_active_jobs = 0
+_applied = 0
+
+
+class Message(NamedTuple):
+    """A call to make on the main thread"""
+    fn: Callable
+    args: tuple
+    kwargs: dict
+
+
+def post(fn: Callable, *args, **kwargs):
+    """Queue fn(*args, **kwargs) to run on the main thread (safe from any thread)"""
+    _queue.put(Message(fn, args, kwargs))
+
+
+def set_attrs(target: Any, **values):
+    """Queue attribute writes on a Blender struct (e.g. runchat_props.status)"""
+    post(_apply_attrs, target, tuple(values.items()))
+
+
+def _apply_attrs(target, items):
+    for name, value in items:
+        setattr(target, name, value)
+
+
+def begin_job():
+    """Call on the main thread before starting background work that will post messages"""
+    global _active_jobs
+    _active_jobs += 1
+    _ensure_timer()
+
+
+def end_job():
+    """Call from the background job when it has posted its last message"""
+    post(_finish_job)
+
+
+def _finish_job():
+    global _active_jobs
+    _active_jobs = max(0, _active_jobs - 1)
+
+
+def _ensure_timer():
+    if not bpy.app.timers.is_registered(_drain):
+        bpy.app.timers.register(_drain, first_interval=0.0)
+
+
+def _drain() -> Optional[float]:
+    """Timer: apply queued messages within the per-tick budget"""
+    global _applied
+    deadline = time.perf_counter() + TICK_BUDGET_SECONDS
+    
+    for _ in range(MAX_MESSAGES_PER_TICK):
+        try:
+            message = _queue.get_nowait()
+        except queue.Empty:
+            break
+        
+        try:
+            message.fn(*message.args, **message.kwargs)
+        except ReferenceError:
+            # The struct was removed (scene deleted, file reloaded) before the message arrived
+            pass
+        except Exception as e:
+            print(f"[Runchat] Error applying background result: {e}")
+        _applied += 1
+        
+        if time.perf_counter() >= deadline:
+            break
+    
+    if not _queue.empty():
+        return BUSY_INTERVAL
+    if _active_jobs > 0:
+        return IDLE_INTERVAL
+    return None
+
+
+def pending() -> int:
+    """Approximate number of queued messages"""
+    return _queue.qsize()
+
+
+def stats():
+    return {'pending': _queue.qsize(), 'active_jobs': _active_jobs, 'applied': _applied}
+
+
+def unregister():
+    """Stop the timer and drop undelivered messages"""
+    global _active_jobs
+    if bpy.app.timers.is_registered(_drain):
+        bpy.app.timers.unregister(_drain)
+    while True:
+        try:
+            _queue.get_nowait()
+        except queue.Empty:
+            break
+    _active_jobs = 0
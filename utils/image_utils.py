@@ -5,12 +5,17 @@ import base64
 import os
 import tempfile
 import io
+import time
 from typing import Any, Dict, Optional
 
+from .asset_cache import get_asset_cache, url_extension
+from . import datablocks
+from . import pixel_utils
+from .blender_utils import get_screen
+
 # Import dependencies lazily to avoid path issues during module loading
 _pil_image = None
 _pil_available = None
-_requests = None
 
 def get_pil_module():
     """Get the PIL module, importing it lazily"""
@@ -20,17 +25,9 @@ def get_pil_module():
         _pil_image, _pil_available = get_pil()
     return _pil_image, _pil_available
 
-def get_requests_module():
-    """Get the requests module, importing it lazily"""
-    global _requests
-    if _requests is None:
-        from .dependencies import get_requests
-        _requests, _ = get_requests()
-    return _requests
-
 
-def image_to_base64(image_path: str, quality: int = 90) -> Optional[str]:
-    """Convert an image file to base64 string with optional compression"""
+def image_to_bytes(image_path: str, quality: int = 90) -> Optional[bytes]:
+    """Encode an image file to compressed JPEG bytes (no base64)"""
     if not os.path.exists(image_path):
         print(f"Image file not found: {image_path}")
         return None
@@ -51,23 +48,26 @@ def image_to_base64(image_path: str, quality: int = 90) -> Optional[str]:
                 # Save to bytes with compression
                 buffer = io.BytesIO()
                 img.save(buffer, format='JPEG', quality=quality, optimize=True)
-                image_bytes = buffer.getvalue()
-                
-                # Encode to base64
-                encoded_string = base64.b64encode(image_bytes).decode('utf-8')
-                return encoded_string
+                return buffer.getvalue()
         else:
             # Fallback without PIL compression
-            print("PIL not available, using basic encoding")
+            print("PIL not available, using raw file bytes")
             with open(image_path, 'rb') as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-                return encoded_string
+                return image_file.read()
                 
     except Exception as e:
         print(f"Error encoding image: {e}")
         return None
 
 
+def image_to_base64(image_path: str, quality: int = 90) -> Optional[str]:
+    """Convert an image file to base64 string with optional compression"""
+    image_bytes = image_to_bytes(image_path, quality)
+    if image_bytes is None:
+        return None
+    return base64.b64encode(image_bytes).decode('utf-8')
+
+
 def base64_to_image(base64_string: str, output_path: str, filename: str = None) -> Optional[str]:
     """Convert base64 string to image file"""
     if not base64_string:
@@ -100,76 +100,279 @@ def base64_to_image(base64_string: str, output_path: str, filename: str = None)
         return None
 
 
-def blender_image_to_base64(image_name: str, quality: int = 90) -> Optional[str]:
-    """Convert a Blender image to base64 with compression"""
-    temp_path = None
+def _is_scene_linear(image) -> bool:
+    """True if the image's pixel values are scene-linear and need the sRGB curve for display"""
+    try:
+        if image.colorspace_settings.is_data:
+            return False
+        # Float buffers are always stored scene-linear
+        return image.is_float or 'linear' in image.colorspace_settings.name.lower()
+    except AttributeError:
+        return image.is_float
+
+
+def _save_image_to_temp(image) -> Optional[str]:
+    """Save a Blender image to a temporary PNG (works for Render Result)"""
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
+        temp_path = tmp_file.name
+    
     try:
-        image = bpy.data.images.get(image_name)
-        if not image:
-            print(f"Image '{image_name}' not found in Blender data")
-            return None
-        
-        # Save image to temporary file
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-            temp_path = tmp_file.name
-        
-        # Save the image
         original_format = image.file_format
         image.file_format = 'PNG'
         image.save_render(temp_path)
         image.file_format = original_format
+        return temp_path
+    except Exception:
+        _remove_temp_file(temp_path)
+        raise
+
+
+def _remove_temp_file(temp_path: Optional[str]):
+    if temp_path and os.path.exists(temp_path):
+        try:
+            os.unlink(temp_path)
+        except OSError as e:
+            print(f"Warning: Could not delete temp file {temp_path}: {e}")
+
+
+def read_image_pixels(image) -> Optional[Dict[str, Any]]:
+    """
+    Read a Blender image's pixels for encoding (main thread only).
+    Returns a readback dict for encode_readback, or None on failure.
+    """
+    try:
+        width, height = image.size
+        count = width * height * 4
+        
+        # Render Result and unloaded images expose no pixels
+        if (pixel_utils.numpy_available() and width > 0 and height > 0
+                and image.channels == 4 and len(image.pixels) == count):
+            buffer = pixel_utils.acquire_pixel_buffer(count)
+            image.pixels.foreach_get(buffer)
+            return {
+                'kind': 'float',
+                'pixels': buffer,
+                'width': width,
+                'height': height,
+                'linear': _is_scene_linear(image),
+                # Float buffers are stored with premultiplied alpha, byte buffers with straight alpha
+                'premultiplied': image.is_float,
+            }
+    except Exception as e:
+        print(f"In-memory readback failed for '{image.name}', saving to file instead: {e}")
+    
+    try:
+        temp_path = _save_image_to_temp(image)
+        return {'kind': 'file', 'path': temp_path, 'width': image.size[0], 'height': image.size[1]}
+    except Exception as e:
+        print(f"Error saving Blender image '{image.name}': {e}")
+        return None
+
+
+def encode_readback(readback: Dict[str, Any], quality: int = 90) -> Optional[Dict[str, Any]]:
+    """
+    Encode a readback to JPEG and hash it. Safe to run on a worker thread.
+    Returns {'data', 'digest', 'width', 'height', 'seconds'} or None.
+    """
+    from .upload_cache import hash_bytes
+    
+    start_time = time.perf_counter()
+    kind = readback['kind']
+    width, height = readback['width'], readback['height']
+    
+    try:
+        if kind == 'float':
+            rgb8 = pixel_utils.rgba_float_to_rgb8(readback['pixels'], width, height, linear=readback['linear'],
+                                                  premultiplied=readback.get('premultiplied', False))
+            # Hand the float buffer back to the pool before compressing
+            discard_readback(readback)
+            data = pixel_utils.encode_rgb8(rgb8, width, height, quality)
+        elif kind == 'rgba8':
+            rgb8 = pixel_utils.rgba8_to_rgb8(readback['pixels'], width, height)
+            discard_readback(readback)
+            data = pixel_utils.encode_rgb8(rgb8, width, height, quality)
+        else:
+            data = image_to_bytes(readback['path'], quality)
+    except Exception as e:
+        print(f"Error encoding image: {e}")
+        data = None
+    finally:
+        discard_readback(readback)
+    
+    if not data:
+        return None
+    
+    return {
+        'data': data,
+        'digest': hash_bytes(data),
+        'width': width,
+        'height': height,
+        'seconds': time.perf_counter() - start_time,
+    }
+
+
+def readback_to_rgb8(readback: Dict[str, Any]):
+    """
+    Convert a readback to a uint8 RGB array (needs numpy). Safe to run on a worker thread.
+    Returns (rgb8, bottom_up); the readback is released.
+    """
+    np = pixel_utils.get_numpy_module()
+    width, height = readback['width'], readback['height']
+    kind = readback['kind']
+    
+    try:
+        if kind == 'float':
+            return pixel_utils.rgba_float_to_rgb8(readback['pixels'], width, height, linear=readback['linear'],
+                                                  premultiplied=readback.get('premultiplied', False)), True
+        if kind == 'rgba8':
+            return pixel_utils.rgba8_to_rgb8(readback['pixels'], width, height), True
+        
+        PIL_Image, _ = get_pil_module()
+        with PIL_Image.open(readback['path']) as img:
+            rgb_img = PIL_Image.new('RGB', img.size, (255, 255, 255))
+            rgba = img.convert('RGBA')
+            rgb_img.paste(rgba, mask=rgba.split()[-1])
+            return np.asarray(rgb_img, dtype=np.uint8), False
+    finally:
+        discard_readback(readback)
+
+
+def discard_readback(readback: Optional[Dict[str, Any]]):
+    """Release a readback's pixel buffer or temp file (idempotent)"""
+    if not readback:
+        return
+    pixels = readback.pop('pixels', None)
+    if readback.get('kind') == 'float':
+        pixel_utils.release_pixel_buffer(pixels)
+    _remove_temp_file(readback.pop('path', None))
+
+
+def submit_encode(readback: Dict[str, Any], quality: int = 90):
+    """Encode a readback on the encode worker pool, returns a Future of encode_readback's result"""
+    from . import workers
+    return workers.submit('encode', encode_readback, readback, quality)
+
+
+def blender_image_to_bytes(image_name: str, quality: int = 90) -> Optional[bytes]:
+    """Convert a Blender image to compressed JPEG bytes"""
+    try:
+        image = bpy.data.images.get(image_name)
+        if not image:
+            print(f"Image '{image_name}' not found in Blender data")
+            return None
         
-        # Convert to base64 with compression
-        base64_string = image_to_base64(temp_path, quality)
+        readback = read_image_pixels(image)
+        if readback is None:
+            return None
         
-        return base64_string
+        encoded = encode_readback(readback, quality)
+        return encoded['data'] if encoded else None
     except Exception as e:
         print(f"Error converting Blender image: {e}")
         return None
-    finally:
-        # Clean up temp file
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except OSError as e:
-                print(f"Warning: Could not delete temp file {temp_path}: {e}")
 
 
-def load_image_from_base64(base64_string: str, image_name: str = "RunChat_Image") -> Optional[bpy.types.Image]:
-    """Load base64 image into Blender"""
-    if not base64_string:
-        print("Empty base64 string provided")
+def blender_image_to_base64(image_name: str, quality: int = 90) -> Optional[str]:
+    """Convert a Blender image to base64 with compression"""
+    image_bytes = blender_image_to_bytes(image_name, quality)
+    if image_bytes is None:
+        return None
+    return base64.b64encode(image_bytes).decode('utf-8')
+
+
+def decode_image(source) -> Optional[Dict[str, Any]]:
+    """
+    Decode encoded image bytes or an image file for image_from_decoded. Safe to run on a worker thread.
+    Returns {'pixels', 'width', 'height', 'seconds'}, or None if numpy/PIL can't decode it.
+    """
+    if not pixel_utils.numpy_available():
+        return None
+    
+    start_time = time.perf_counter()
+    try:
+        pixels, width, height = pixel_utils.decode_to_rgba_float(source)
+    except Exception as e:
+        print(f"In-memory image decode failed, loading through Blender instead: {e}")
         return None
     
+    return {
+        'pixels': pixels,
+        'width': width,
+        'height': height,
+        'seconds': time.perf_counter() - start_time,
+    }
+
+
+def image_from_decoded(decoded: Dict[str, Any], image_name: str = "RunChat_Image", pack: bool = False,
+                       history: bool = False) -> Optional[bpy.types.Image]:
+    """
+    Put decoded pixels into an Image with a single foreach_set, without touching disk (main thread).
+    The image comes from the datablock registry: the current image of this name is reused and
+    resized in place, or with history kept as the previous generation.
+    pack stores the pixels in the .blend, otherwise they are lost when the file is reopened.
+    """
+    image = datablocks.acquire_image(image_name, decoded['width'], decoded['height'], history=history)
+    image.pixels.foreach_set(decoded['pixels'])
+    image.update()
+    
+    # A reused image that was packed before would otherwise reopen with its old pixels
+    if pack or image.packed_file:
+        try:
+            image.pack()
+        except RuntimeError as e:
+            print(f"Could not pack image '{image.name}': {e}")
+    return image
+
+
+def load_image_from_bytes(image_data: bytes, image_name: str = "RunChat_Image", pack: bool = False,
+                          history: bool = False) -> Optional[bpy.types.Image]:
+    """Load encoded image bytes into Blender (history keeps the previous image of this name)"""
+    if not image_data:
+        print("Empty image data provided")
+        return None
+    
+    decoded = decode_image(image_data)
+    if decoded is not None:
+        return image_from_decoded(decoded, image_name, pack=pack, history=history)
+    
     temp_path = None
     try:
         # Create temporary file
         with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
             temp_path = tmp_file.name
-        
-        # Decode base64 to file
-        image_data = base64.b64decode(base64_string)
-        with open(temp_path, 'wb') as f:
-            f.write(image_data)
+            tmp_file.write(image_data)
         
         # Load into Blender
         image = bpy.data.images.load(temp_path)
-        image.name = image_name
+        if pack:
+            image.pack()
         
-        return image
+        return datablocks.adopt_image(image_name, image, history=history)
     except Exception as e:
         print(f"Error loading image into Blender: {e}")
         return None
     finally:
         # Clean up temp file
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except OSError as e:
-                print(f"Warning: Could not delete temp file {temp_path}: {e}")
+        _remove_temp_file(temp_path)
+
+
+def load_image_from_base64(base64_string: str, image_name: str = "RunChat_Image", history: bool = True) -> Optional[bpy.types.Image]:
+    """Load base64 image into Blender"""
+    if not base64_string:
+        print("Empty base64 string provided")
+        return None
+    
+    try:
+        image_data = base64.b64decode(base64_string)
+    except Exception as e:
+        print(f"Error decoding base64 image: {e}")
+        return None
+    
+    # Nothing on disk backs these pixels, so keep them in the .blend
+    return load_image_from_bytes(image_data, image_name, pack=True, history=history)
 
 
-def load_image_from_url(url: str, image_name: str = "RunChat_Image", operator=None) -> Optional[bpy.types.Image]:
+def load_image_from_url(url: str, image_name: str = "RunChat_Image", operator=None, history: bool = True) -> Optional[bpy.types.Image]:
     """Load image from URL into Blender"""
     def report_info(msg):
         if operator and hasattr(operator, 'report'):
@@ -187,7 +390,6 @@ def load_image_from_url(url: str, image_name: str = "RunChat_Image", operator=No
         report_error(f"Invalid URL provided: {url}")
         return None
     
-    temp_path = None
     try:
         report_info(f"Downloading image from URL: {url[:100]}...")
         
@@ -209,41 +411,60 @@ def load_image_from_url(url: str, image_name: str = "RunChat_Image", operator=No
         
         report_info(f"Detected file extension: {file_extension}")
         
-        # Download the image
-        response = get_requests_module().get(url, timeout=30)
-        response.raise_for_status()
-        
-        if len(response.content) == 0:
-            report_error("Downloaded image has no content")
-            return None
-        
-        report_info(f"Downloaded {len(response.content)} bytes")
-        
-        # Create temporary file with correct extension
-        with tempfile.NamedTemporaryFile(suffix=file_extension, delete=False) as tmp_file:
-            temp_path = tmp_file.name
-            tmp_file.write(response.content)
-        
-        report_info(f"Saved to temp file: {temp_path}")
+        # Fetch through the asset cache, which only downloads outputs it hasn't seen
+        cached_path = get_asset_cache().fetch(url, timeout=30, default_ext=file_extension)
+        report_info(f"Cached at: {cached_path}")
+        return load_image_from_file(cached_path, image_name, operator=operator, history=history)
         
-        # Verify temp file exists and has content
-        if not os.path.exists(temp_path):
-            report_error("Temp file was not created")
+    except Exception as e:
+        report_error(f"Error loading image from URL: {e}")
+        import traceback
+        trace_lines = traceback.format_exc().split('\n')
+        for line in trace_lines:
+            if line.strip():
+                report_error(f"TRACE: {line}")
+        return None
+
+
+def load_image_from_file(file_path: str, image_name: str = "RunChat_Image", operator=None,
+                         history: bool = True) -> Optional[bpy.types.Image]:
+    """Load an already downloaded image file into Blender (history keeps the previous image of this name)"""
+    def report_info(msg):
+        if operator and hasattr(operator, 'report'):
+            operator.report({'INFO'}, msg)
+        else:
+            print(f"[Runchat] {msg}")
+    
+    def report_error(msg):
+        if operator and hasattr(operator, 'report'):
+            operator.report({'ERROR'}, msg)
+        else:
+            print(f"[Runchat ERROR] {msg}")
+    
+    try:
+        # Verify the file exists and has content
+        if not os.path.exists(file_path):
+            report_error(f"Image file not found: {file_path}")
             return None
             
-        temp_size = os.path.getsize(temp_path)
+        temp_size = os.path.getsize(file_path)
         if temp_size == 0:
-            report_error("Temp file is empty")
+            report_error("Image file is empty")
             return None
             
-        report_info(f"Temp file size: {temp_size} bytes")
+        report_info(f"Image file size: {temp_size} bytes")
+        
+        # Decode in memory and fill the image directly when numpy and PIL are available
+        decoded = decode_image(file_path)
+        if decoded is not None:
+            image = image_from_decoded(decoded, image_name, history=history)
+            report_info(f"Successfully loaded image '{image.name}' with size {image.size[0]}x{image.size[1]} "
+                        f"(decoded in {decoded['seconds'] * 1000:.0f} ms)")
+            return image
         
         # Load into Blender
         report_info("Loading image into Blender...")
-        image = bpy.data.images.load(temp_path)
-        
-        # Set the name
-        image.name = image_name
+        image = bpy.data.images.load(file_path)
         
         # Force Blender to fully load and process the image data
         report_info("Forcing image data load...")
@@ -286,25 +507,19 @@ def load_image_from_url(url: str, image_name: str = "RunChat_Image", operator=No
                 bpy.data.images.remove(image)
                 return None
         
+        # Named after the output and tracked, replacing or keeping the previous generation
+        datablocks.adopt_image(image_name, image, history=history)
         report_info(f"Successfully loaded image '{image.name}' with size {image.size[0]}x{image.size[1]}")
         return image
         
     except Exception as e:
-        report_error(f"Error loading image from URL: {e}")
+        report_error(f"Error loading image file: {e}")
         import traceback
         trace_lines = traceback.format_exc().split('\n')
         for line in trace_lines:
             if line.strip():
                 report_error(f"TRACE: {line}")
         return None
-    finally:
-        # Clean up temp file
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-                report_info(f"Cleaned up temp file: {temp_path}")
-            except OSError as e:
-                report_error(f"Warning: Could not delete temp file {temp_path}: {e}")
 
 
 def get_active_render_image() -> Optional[str]:
@@ -324,7 +539,10 @@ def get_active_render_image() -> Optional[str]:
 def get_active_image_editor_image() -> Optional[str]:
     """Get the active image from Image Editor as base64"""
     try:
-        for area in bpy.context.screen.areas:
+        screen = get_screen()
+        if screen is None:
+            return None
+        for area in screen.areas:
             if area.type == 'IMAGE_EDITOR':
                 if area.spaces.active.image:
                     return blender_image_to_base64(area.spaces.active.image.name)
@@ -334,8 +552,79 @@ def get_active_image_editor_image() -> Optional[str]:
         return None
 
 
-def capture_viewport_image(quality: int = 90) -> Optional[str]:
-    """Capture the active viewport as base64 image"""
+def _find_view3d(context):
+    """Find a 3D viewport (area, region, space) to draw from"""
+    screen = getattr(context, 'screen', None)
+    if screen is None:
+        return None, None, None
+    
+    # Prefer the viewport the operator was invoked from
+    areas = [context.area] if getattr(context, 'area', None) and context.area.type == 'VIEW_3D' else []
+    areas += [area for area in screen.areas if area.type == 'VIEW_3D']
+    
+    for area in areas:
+        for region in area.regions:
+            if region.type == 'WINDOW':
+                return area, region, area.spaces.active
+    return None, None, None
+
+
+def _read_viewport_offscreen(width: int, height: int, camera=None) -> Optional[Dict[str, Any]]:
+    """Draw the viewport (or the given camera's view) into an offscreen buffer and read the 8-bit result back"""
+    if not pixel_utils.numpy_available():
+        return None
+    
+    import gpu
+    
+    context = bpy.context
+    scene = context.scene
+    area, region, space = _find_view3d(context)
+    if space is None:
+        return None
+    
+    np = pixel_utils.get_numpy_module()
+    region_3d = space.region_3d
+    
+    if camera is None and region_3d.view_perspective == 'CAMERA':
+        camera = scene.camera
+    
+    if camera is not None:
+        # Match render.opengl: camera view at the capture resolution
+        depsgraph = context.evaluated_depsgraph_get()
+        view_matrix = camera.matrix_world.inverted()
+        projection_matrix = camera.calc_matrix_camera(
+            depsgraph, x=width, y=height,
+            scale_x=scene.render.pixel_aspect_x, scale_y=scene.render.pixel_aspect_y
+        )
+    else:
+        view_matrix = region_3d.view_matrix.copy()
+        projection_matrix = region_3d.window_matrix.copy()
+        # Keep the viewport's vertical field of view at the capture aspect ratio
+        projection_matrix[0][0] = projection_matrix[1][1] * height / width
+    
+    offscreen = gpu.types.GPUOffScreen(width, height)
+    try:
+        offscreen.draw_view3d(
+            scene, context.view_layer, space, region,
+            view_matrix, projection_matrix, do_color_management=True
+        )
+        buffer = gpu.types.Buffer('UBYTE', width * height * 4)
+        with offscreen.bind():
+            framebuffer = gpu.state.active_framebuffer_get()
+            framebuffer.read_color(0, 0, width, height, 4, 0, 'UBYTE', data=buffer)
+    finally:
+        offscreen.free()
+    
+    return {
+        'kind': 'rgba8',
+        'pixels': np.asarray(buffer, dtype=np.uint8).reshape(-1),
+        'width': width,
+        'height': height,
+    }
+
+
+def _read_viewport_via_render(width: int, height: int, camera=None) -> Optional[Dict[str, Any]]:
+    """Capture the viewport (or the given camera) with an OpenGL render written to a temporary PNG"""
     temp_path = None
     try:
         # Create temporary file for saving the capture
@@ -350,28 +639,24 @@ def capture_viewport_image(quality: int = 90) -> Optional[str]:
         original_format = render.image_settings.file_format
         original_width = render.resolution_x
         original_height = render.resolution_y
+        original_percentage = render.resolution_percentage
+        original_camera = scene.camera
         
         try:
-            # Get dimensions from addon properties if available
-            if hasattr(scene, 'runchat_properties'):
-                render.resolution_x = scene.runchat_properties.viewport_width
-                render.resolution_y = scene.runchat_properties.viewport_height
-            else:
-                # Default dimensions
-                render.resolution_x = 1920
-                render.resolution_y = 1080
+            render.resolution_x = width
+            render.resolution_y = height
+            render.resolution_percentage = 100
             
             # Set capture settings
             render.filepath = temp_path
             render.image_settings.file_format = 'PNG'
             
             # Perform the capture using OpenGL render
-            bpy.ops.render.opengl(write_still=True)
-            
-            # Convert to base64
-            base64_data = image_to_base64(temp_path, quality)
-            
-            return base64_data
+            if camera is not None:
+                scene.camera = camera
+                bpy.ops.render.opengl(write_still=True, view_context=False)
+            else:
+                bpy.ops.render.opengl(write_still=True)
             
         finally:
             # Restore original settings
@@ -379,17 +664,75 @@ def capture_viewport_image(quality: int = 90) -> Optional[str]:
             render.image_settings.file_format = original_format
             render.resolution_x = original_width
             render.resolution_y = original_height
+            render.resolution_percentage = original_percentage
+            if scene.camera != original_camera:
+                scene.camera = original_camera
+        
+        # The temp file now belongs to the readback and is removed after encoding
+        return {'kind': 'file', 'path': temp_path, 'width': width, 'height': height}
             
     except Exception as e:
         print(f"Error capturing viewport: {e}")
+        _remove_temp_file(temp_path)
         return None
-    finally:
-        # Clean up temp file
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except OSError as e:
-                print(f"Warning: Could not delete temp file {temp_path}: {e}")
+
+
+def get_viewport_capture_size(scene=None):
+    """Capture dimensions from the addon properties, or 1920x1080"""
+    scene = scene or bpy.context.scene
+    if hasattr(scene, 'runchat_properties'):
+        return scene.runchat_properties.viewport_width, scene.runchat_properties.viewport_height
+    # Default dimensions
+    return 1920, 1080
+
+
+def read_viewport_pixels(width: Optional[int] = None, height: Optional[int] = None, camera=None,
+                         fallback: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Read back the active viewport for encoding (main thread only).
+    With a camera object the capture is taken through that camera instead of the current view.
+    Without fallback a failed offscreen draw returns None instead of running an OpenGL render.
+    Returns a readback dict for encode_readback, or None on failure.
+    """
+    if width is None or height is None:
+        width, height = get_viewport_capture_size()
+    
+    try:
+        readback = _read_viewport_offscreen(width, height, camera)
+        if readback:
+            return readback
+    except Exception as e:
+        print(f"Offscreen viewport capture failed: {e}")
+    
+    if not fallback:
+        return None
+    return _read_viewport_via_render(width, height, camera)
+
+
+def capture_viewport_async(quality: int = 90):
+    """Read the viewport now and encode it in the background. Returns a Future or None."""
+    readback = read_viewport_pixels()
+    if readback is None:
+        return None
+    return submit_encode(readback, quality)
+
+
+def capture_viewport_bytes(quality: int = 90) -> Optional[bytes]:
+    """Capture the active viewport as compressed JPEG bytes"""
+    readback = read_viewport_pixels()
+    if readback is None:
+        return None
+    
+    encoded = encode_readback(readback, quality)
+    return encoded['data'] if encoded else None
+
+
+def capture_viewport_image(quality: int = 90) -> Optional[str]:
+    """Capture the active viewport as base64 image"""
+    image_bytes = capture_viewport_bytes(quality)
+    if image_bytes is None:
+        return None
+    return base64.b64encode(image_bytes).decode('utf-8')
 
 
 def setup_image_viewer(image_name: str) -> bool:
@@ -404,6 +747,11 @@ def setup_image_viewer(image_name: str) -> bool:
             print(f"Image '{image_name}' has no data")
             return False
         
+        # Nothing to show the image in when running headless
+        if get_screen() is None:
+            print(f"No UI available, not displaying '{image_name}'")
+            return False
+        
         print(f"Setting up Image Editor for '{image_name}' (size: {image.size[0]}x{image.size[1]})")
         
         # Method 1: Try to find an existing Image Editor
@@ -511,6 +859,9 @@ def setup_image_viewer(image_name: str) -> bool:
 def auto_display_image(image_name: str) -> bool:
     """Automatically display an image using multiple methods"""
     try:
+        if get_screen() is None:
+            return False
+        
         # Method 1: Setup Image Editor
         if setup_image_viewer(image_name):
             return True
@@ -530,6 +881,38 @@ def auto_display_image(image_name: str) -> bool:
         return False
 
 
+def _fetch_and_decode(url: str):
+    """Download pool: the cached file for url and its decoded pixels (None if numpy/PIL can't decode it)"""
+    path = get_asset_cache().fetch(url, timeout=30, default_ext=url_extension(url, '.png'))
+    return path, decode_image(path)
+
+
+def view_image_from_url(url: str, image_name: str, history: bool = True):
+    """
+    Download and decode an image URL on the download pool, then fill the image and display it
+    from a timer (main thread). Unlike load_image_from_url the caller returns at once.
+    """
+    from . import workers
+    future = workers.submit('download', _fetch_and_decode, url)
+    
+    def apply():
+        if not future.done():
+            return 0.05
+        try:
+            path, decoded = future.result()
+            if decoded is not None:
+                image = image_from_decoded(decoded, image_name, history=history)
+            else:
+                image = load_image_from_file(path, image_name, history=history)
+            if image:
+                auto_display_image(image.name)
+        except Exception as e:
+            print(f"[Runchat ERROR] Could not load image from {url[:100]}: {e}")
+        return None
+    
+    bpy.app.timers.register(apply, first_interval=0.05)
+
+
 def process_image_array(output_data, output_id, output_prop, runchat_props):
     """Process image output data that might be an array of images - simplified to use first image only"""
     try:
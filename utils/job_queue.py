@@ -0,0 +1,152 @@
+# utils/job_queue.py
+
+"""
+File-based job queue shared by the farm coordinator and headless workers
+Layout under the queue directory:
+    pending/<job_id>.json              waiting to be claimed
+    claimed/<worker>__<job_id>.json    being run by a worker
+    results/<job_id>.a<attempt>.json   one file per finished attempt
+    stop                               no more work will be queued
+A worker claims a job by renaming it out of pending/; rename is atomic, so
+exactly one worker wins and the others move on to the next file.
+This module does not import bpy so the coordinator can use it outside Blender.
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+
+CLAIM_SEPARATOR = "__"
+
+
+def _write_json(path: str, data: Dict[str, Any]):
+    """Write JSON atomically (temp file in the same directory, then rename)"""
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+    except Exception:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _visible_files(directory: str) -> List[str]:
+    """JSON files in a queue directory, skipping in-progress temp files"""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted(name for name in names if name.endswith('.json') and not name.startswith('.tmp_'))
+
+
+def init_queue(root: str):
+    """Create the queue directories and clear a stop marker left from a previous run"""
+    for name in ('pending', 'claimed', 'results'):
+        os.makedirs(os.path.join(root, name), exist_ok=True)
+    try:
+        os.unlink(os.path.join(root, 'stop'))
+    except FileNotFoundError:
+        pass
+
+
+def enqueue(root: str, job_id: str, spec: Dict[str, Any], attempt: int = 1):
+    """Add a job for any worker to claim"""
+    _write_json(os.path.join(root, 'pending', f"{job_id}.json"),
+                {'job_id': job_id, 'attempt': attempt, 'spec': spec})
+
+
+def claim(root: str, worker_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Claim the next pending job. Returns (claimed path, payload) or None if the queue is empty."""
+    pending_dir = os.path.join(root, 'pending')
+    for name in _visible_files(pending_dir):
+        claimed_path = os.path.join(root, 'claimed', f"{worker_id}{CLAIM_SEPARATOR}{name}")
+        try:
+            os.rename(os.path.join(pending_dir, name), claimed_path)
+        except FileNotFoundError:
+            # Another worker claimed it first
+            continue
+        payload = _read_json(claimed_path)
+        if payload is not None:
+            return claimed_path, payload
+    return None
+
+
+def complete(root: str, claimed_path: str, payload: Dict[str, Any], entry: Dict[str, Any], worker_id: str):
+    """Record the outcome of a claimed job and release the claim"""
+    result = dict(entry, job_id=payload['job_id'], attempt=payload['attempt'], worker=worker_id)
+    _write_json(os.path.join(root, 'results', f"{payload['job_id']}.a{payload['attempt']}.json"), result)
+    try:
+        os.unlink(claimed_path)
+    except FileNotFoundError:
+        pass
+
+
+def read_results(root: str, seen: set) -> List[Dict[str, Any]]:
+    """Results not in seen (file names); adds the new ones to seen"""
+    results = []
+    results_dir = os.path.join(root, 'results')
+    for name in _visible_files(results_dir):
+        if name in seen:
+            continue
+        result = _read_json(os.path.join(results_dir, name))
+        if result is not None:
+            seen.add(name)
+            results.append(result)
+    return results
+
+
+def release_claims(root: str, worker_id: str) -> List[Dict[str, Any]]:
+    """Remove the claims of a worker that exited and return their payloads"""
+    payloads = []
+    claimed_dir = os.path.join(root, 'claimed')
+    prefix = f"{worker_id}{CLAIM_SEPARATOR}"
+    for name in _visible_files(claimed_dir):
+        if not name.startswith(prefix):
+            continue
+        path = os.path.join(claimed_dir, name)
+        payload = _read_json(path)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            continue
+        if payload is not None:
+            payloads.append(payload)
+    return payloads
+
+
+def pending_count(root: str) -> int:
+    return len(_visible_files(os.path.join(root, 'pending')))
+
+
+def request_stop(root: str):
+    """Tell workers to exit once the pending queue is empty"""
+    with open(os.path.join(root, 'stop'), 'w') as f:
+        f.write("stop\n")
+
+
+def stop_requested(root: str) -> bool:
+    return os.path.exists(os.path.join(root, 'stop'))
+
+
+def write_settings(root: str, settings: Dict[str, Any]):
+    """Run-wide settings for workers (output directory, capture size, concurrency)"""
+    _write_json(os.path.join(root, 'settings.json'), settings)
+
+
+def read_settings(root: str) -> Dict[str, Any]:
+    return _read_json(os.path.join(root, 'settings.json')) or {}
@@ -0,0 +1,104 @@
+# utils/manifest.py
+
+"""
+Job manifests for headless and multi-process runs
+Reads JSON or CSV manifests and expands them into one job spec per workflow
+run. This module does not import bpy so the farm coordinator can use it
+outside Blender.
+"""
+
+import csv
+import json
+import os
+
+
+def parse_frames(spec):
+    """Frame numbers from an int, a list, or text like '1-24', '1-24:4' or '1,5,9'"""
+    if isinstance(spec, int):
+        return [spec]
+    if isinstance(spec, list):
+        return [int(frame) for frame in spec]
+    
+    frames = []
+    for part in str(spec).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        bounds, _, step = part.partition(':')
+        start, sep, end = bounds.partition('-')
+        if sep:
+            frames.extend(range(int(start), int(end) + 1, int(step) if step else 1))
+        else:
+            frames.append(int(bounds))
+    return frames
+
+
+def resolve_path(path, blend_dir, manifest_dir):
+    """
+    Absolute path of a file named in a manifest: Blender-relative (//) paths against the
+    .blend, other relative paths against the manifest's directory. Headless runs and the
+    farm both use this, so a manifest reads the same files however it is run.
+    """
+    if path.startswith('//'):
+        return os.path.normpath(os.path.join(blend_dir, path[2:]))
+    return os.path.normpath(os.path.join(manifest_dir, os.path.expanduser(path)))
+
+
+def read_csv_manifest(path):
+    """Manifest dict from a CSV file with one job per row"""
+    jobs = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            job = {'inputs': {}, 'files': {}}
+            for column, value in row.items():
+                if column is None or value is None or value == '':
+                    continue
+                column = column.strip()
+                if column.startswith('input:'):
+                    job['inputs'][column[len('input:'):]] = value
+                elif column.startswith('file:'):
+                    job['files'][column[len('file:'):]] = value
+                else:
+                    job[column] = value
+            jobs.append(job)
+    return {'jobs': jobs}
+
+
+def load_manifest(path):
+    """Manifest dict from a .json or .csv file. Raises ValueError if it has no jobs."""
+    if path.lower().endswith('.csv'):
+        manifest = read_csv_manifest(path)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    
+    if not manifest.get('jobs'):
+        raise ValueError(f"Manifest {path} has no jobs")
+    return manifest
+
+
+def expand_jobs(manifest):
+    """One job spec per run: frame ranges become a job per frame"""
+    specs = []
+    for index, job in enumerate(manifest['jobs']):
+        runchat_id = job.get('runchat_id') or manifest.get('runchat_id')
+        if not runchat_id:
+            raise ValueError(f"Job {index + 1} has no runchat_id")
+        
+        base = {
+            'name': job.get('name') or f"job_{index + 1}",
+            'runchat_id': runchat_id,
+            'inputs': dict(job.get('inputs') or {}),
+            'files': dict(job.get('files') or {}),
+            'camera': job.get('camera') or None,
+            'capture_input': job.get('capture_input') or manifest.get('capture_input'),
+            'frame': None,
+        }
+        
+        frame_spec = job.get('frames', job.get('frame'))
+        if frame_spec in (None, ''):
+            specs.append(base)
+            continue
+        for frame in parse_frames(frame_spec):
+            specs.append(dict(base, name=f"{base['name']}_{frame:04d}", frame=frame))
+    return specs
@@ -0,0 +1,85 @@
+"""
+Streaming multipart/form-data bodies for uploads
+Sends raw file or buffer bytes in chunks, without base64 and without
+building the whole request body in memory
+"""
+
+import mimetypes
+import os
+import uuid
+from typing import Dict, Optional, Union
+
+# Chunk size used when reading files or slicing buffers
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+
+class MultipartStream:
+    """
+    Iterable multipart body for requests' ``data=`` argument.
+
+    ``source`` is either a file path (read lazily in chunks) or a bytes-like
+    object (sent as memoryview slices, never copied). ``__len__`` is defined
+    so requests sends a Content-Length header instead of chunked encoding.
+    """
+
+    def __init__(self, source: Union[str, bytes, bytearray, memoryview], filename: str,
+                 field_name: str = "file", content_type: Optional[str] = None,
+                 fields: Optional[Dict[str, str]] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.source = source
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.boundary = f"----RunchatBoundary{uuid.uuid4().hex}"
+
+        if content_type is None:
+            content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+        if isinstance(source, str):
+            self._payload_size = os.path.getsize(source)
+        else:
+            self._payload_size = memoryview(source).nbytes
+
+        # Plain form fields go first, then the file part header
+        head_parts = []
+        for name, value in (fields or {}).items():
+            head_parts.append(
+                f"--{self.boundary}\r\n"
+                f"Content-Disposition: form-data; name=\"{name}\"\r\n\r\n"
+                f"{value}\r\n"
+            )
+        head_parts.append(
+            f"--{self.boundary}\r\n"
+            f"Content-Disposition: form-data; name=\"{field_name}\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: {content_type}\r\n\r\n"
+        )
+        self._head = "".join(head_parts).encode("utf-8")
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+
+    @property
+    def content_type(self) -> str:
+        """Value for the request's Content-Type header"""
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @property
+    def payload_size(self) -> int:
+        """Size of the raw file/buffer being uploaded"""
+        return self._payload_size
+
+    def __len__(self):
+        return len(self._head) + self._payload_size + len(self._tail)
+
+    def __iter__(self):
+        yield self._head
+
+        if isinstance(self.source, str):
+            with open(self.source, 'rb') as f:
+                while True:
+                    chunk = f.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        else:
+            view = memoryview(self.source).cast('B')
+            for offset in range(0, view.nbytes, self.chunk_size):
+                yield view[offset:offset + self.chunk_size]
+
+        yield self._tail
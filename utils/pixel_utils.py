@@ -0,0 +1,267 @@
+# utils/pixel_utils.py
+
+"""
+In-memory pixel conversion and JPEG encoding
+Turns Blender float RGBA pixel buffers (or 8-bit GPU readbacks) into JPEG bytes
+with vectorised numpy math, without writing anything to disk, and decodes
+downloaded images into buffers ready for Image.pixels.foreach_set.
+This module does not import bpy so it can be benchmarked outside Blender.
+"""
+
+import io
+import threading
+from typing import Optional
+
+# Rows converted per step, bounds the temporary memory used for 8K images
+ROWS_PER_CHUNK = 256
+# Resolution of the linear -> sRGB lookup table (16-bit index, 8-bit output)
+SRGB_LUT_SIZE = 65536
+
+_np = None
+_pil_image = None
+_srgb_lut = None
+
+# Pooled float buffers, at most this many are kept between captures
+MAX_POOLED_BUFFERS = 2
+_free_buffers = []
+_pool_lock = threading.Lock()
+
+
+def get_numpy_module():
+    """Get numpy, importing it lazily"""
+    global _np
+    if _np is None:
+        try:
+            from .dependencies import get_numpy
+            _np, _ = get_numpy()
+        except ImportError:
+            # Loaded standalone (benchmarks)
+            import numpy
+            _np = numpy
+    return _np
+
+
+def get_pil_module():
+    """Get PIL.Image, importing it lazily"""
+    global _pil_image
+    if _pil_image is None:
+        try:
+            from .dependencies import get_pil
+            _pil_image, _ = get_pil()
+        except ImportError:
+            from PIL import Image
+            _pil_image = Image
+    return _pil_image
+
+
+def numpy_available() -> bool:
+    """True if the in-memory encoding path can be used"""
+    try:
+        return get_numpy_module() is not None
+    except ImportError:
+        return False
+
+
+def acquire_pixel_buffer(count: int):
+    """
+    Get a float32 buffer of ``count`` values for Image.pixels.foreach_get.
+    Buffers are pooled so repeated captures don't reallocate hundreds of MB;
+    hand them back with release_pixel_buffer once encoding is done.
+    """
+    np = get_numpy_module()
+    with _pool_lock:
+        for i, buffer in enumerate(_free_buffers):
+            if buffer.size == count:
+                return _free_buffers.pop(i)
+    return np.empty(count, dtype=np.float32)
+
+
+def release_pixel_buffer(buffer):
+    """Return a buffer to the pool (thread-safe)"""
+    if buffer is None:
+        return
+    with _pool_lock:
+        if len(_free_buffers) < MAX_POOLED_BUFFERS:
+            _free_buffers.append(buffer)
+
+
+def clear_pixel_buffers():
+    """Drop all pooled buffers"""
+    with _pool_lock:
+        _free_buffers.clear()
+
+
+def get_srgb_lut():
+    """Lookup table mapping 16-bit quantised linear values to 8-bit sRGB"""
+    global _srgb_lut
+    if _srgb_lut is None:
+        np = get_numpy_module()
+        linear = np.linspace(0.0, 1.0, SRGB_LUT_SIZE, dtype=np.float64)
+        srgb = np.where(linear <= 0.0031308, linear * 12.92, 1.055 * np.power(linear, 1.0 / 2.4) - 0.055)
+        _srgb_lut = np.clip(np.rint(srgb * 255.0), 0, 255).astype(np.uint8)
+    return _srgb_lut
+
+
+def rgba_float_to_rgb8(pixels, width: int, height: int, linear: bool = False, premultiplied: bool = False,
+                       rows_per_chunk: int = ROWS_PER_CHUNK):
+    """
+    Convert a flat float RGBA buffer (Blender layout, bottom row first) to uint8 RGB.
+
+    Alpha is composited over white. ``premultiplied`` buffers (Blender's float
+    images) already carry rgb * a; byte images read through image.pixels are
+    straight alpha. When ``linear`` is True the values are
+    scene-linear and get the sRGB transfer curve, otherwise they are already
+    display-encoded. ``pixels`` is used as scratch space and is modified.
+    Returns an array of shape (height, width, 3), still bottom row first.
+    """
+    np = get_numpy_module()
+    rgba = pixels.reshape(height, width, 4)
+    out = np.empty((height, width, 3), dtype=np.uint8)
+    lut = get_srgb_lut() if linear else None
+    scale = float(SRGB_LUT_SIZE - 1) if linear else 255.0
+
+    for start in range(0, height, rows_per_chunk):
+        end = min(start + rows_per_chunk, height)
+        chunk = rgba[start:end]
+        rgb = chunk[..., :3]
+        alpha = chunk[..., 3:4]
+
+        # Composite onto white in place: rgb * a + (1 - a), where premultiplied rgb already is rgb * a
+        if not premultiplied:
+            rgb *= alpha
+        rgb += 1.0 - alpha
+        np.clip(rgb, 0.0, 1.0, out=rgb)
+        rgb *= scale
+        rgb += 0.5
+
+        if linear:
+            out[start:end] = lut[rgb.astype(np.uint16)]
+        else:
+            out[start:end] = rgb.astype(np.uint8)
+
+    return out
+
+
+def rgba8_to_rgb8(pixels, width: int, height: int, rows_per_chunk: int = ROWS_PER_CHUNK):
+    """
+    Composite a flat uint8 RGBA buffer (e.g. a GPU readback) over white.
+    Returns uint8 RGB of shape (height, width, 3) in the same row order.
+    """
+    np = get_numpy_module()
+    rgba = pixels.reshape(height, width, 4)
+    out = np.empty((height, width, 3), dtype=np.uint8)
+
+    for start in range(0, height, rows_per_chunk):
+        end = min(start + rows_per_chunk, height)
+        chunk = rgba[start:end].astype(np.uint16)
+        alpha = chunk[..., 3:4]
+        # rgb * a / 255 + (255 - a), rounded
+        rgb = chunk[..., :3] * alpha
+        rgb += 255 * (255 - alpha) + 127
+        rgb //= 255
+        out[start:end] = rgb
+
+    return out
+
+
+def encode_rgb8(rgb8, width: int, height: int, quality: int = 90, flip: bool = True) -> Optional[bytes]:
+    """
+    JPEG-encode a uint8 RGB array straight from memory.
+    ``flip`` converts Blender's bottom-up row order while the encoder reads the buffer.
+    """
+    PIL_Image = get_pil_module()
+    orientation = -1 if flip else 1
+    img = PIL_Image.frombuffer('RGB', (width, height), rgb8, 'raw', 'RGB', 0, orientation)
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def decode_to_rgba_float(source):
+    """
+    Decode an encoded image (bytes, or a file path) into a flat float32 RGBA buffer in
+    Blender's layout: bottom row first, display-encoded values 0..1.
+    The flip and the uint8 -> float conversion happen in one pass.
+    Returns (pixels, width, height).
+    """
+    np = get_numpy_module()
+    PIL_Image = get_pil_module()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    with PIL_Image.open(source) as img:
+        rgba = np.asarray(img.convert('RGBA'), dtype=np.uint8)
+    height, width = rgba.shape[:2]
+    pixels = np.empty(height * width * 4, dtype=np.float32)
+    np.multiply(rgba[::-1], np.float32(1.0 / 255.0), out=pixels.reshape(height, width, 4), dtype=np.float32)
+    return pixels, width, height
+
+
+def luma_signature(rgb8, grid_width: int = 48, grid_height: int = 27, bottom_up: bool = True):
+    """
+    Tiny luminance thumbnail for change detection.
+    Block-averages the frame down to grid_width x grid_height cells (values 0..1),
+    which smooths out noise and antialiasing shimmer before comparing frames.
+    """
+    np = get_numpy_module()
+    height, width = rgb8.shape[:2]
+    grid_width = max(1, min(grid_width, width))
+    grid_height = max(1, min(grid_height, height))
+    cell_w, cell_h = width // grid_width, height // grid_height
+
+    # Crop to whole cells, then average each cell
+    cropped = rgb8[:cell_h * grid_height, :cell_w * grid_width].astype(np.float32)
+    luma = cropped[..., 0] * 0.299 + cropped[..., 1] * 0.587 + cropped[..., 2] * 0.114
+    cells = luma.reshape(grid_height, cell_h, grid_width, cell_w).mean(axis=(1, 3)) / 255.0
+
+    return cells[::-1] if bottom_up else cells
+
+
+def signature_distance(previous, current, top_fraction: float = 0.1) -> float:
+    """
+    Perceptual-ish difference between two signatures (0 = identical, 1 = black vs white).
+    Averages the most-changed cells so a small object moving counts as much as a global shift.
+    """
+    np = get_numpy_module()
+    if previous is None or current is None or previous.shape != current.shape:
+        return 1.0
+    diff = np.abs(current - previous).reshape(-1)
+    count = max(1, int(diff.size * top_fraction))
+    return float(np.partition(diff, diff.size - count)[-count:].mean())
+
+
+def compose_grid(images, columns: int, cell_size: int = 512, labels=None, label_height: int = 18) -> Optional[bytes]:
+    """
+    Lay encoded images out as a PNG contact sheet, row by row.
+    Each image is fitted into a cell_size square; missing images (None) leave a grey cell.
+    Optional labels are drawn in a strip under each cell.
+    """
+    PIL_Image = get_pil_module()
+    columns = max(1, columns)
+    rows = (len(images) + columns - 1) // columns
+    strip = label_height if labels else 0
+    sheet = PIL_Image.new('RGB', (columns * cell_size, rows * (cell_size + strip)), (40, 40, 40))
+
+    draw = None
+    if labels:
+        try:
+            from PIL import ImageDraw
+            draw = ImageDraw.Draw(sheet)
+        except ImportError:
+            pass
+
+    for index, data in enumerate(images):
+        x = (index % columns) * cell_size
+        y = (index // columns) * (cell_size + strip)
+        if data:
+            try:
+                img = PIL_Image.open(io.BytesIO(data)).convert('RGB')
+                img.thumbnail((cell_size, cell_size))
+                sheet.paste(img, (x + (cell_size - img.width) // 2, y + (cell_size - img.height) // 2))
+            except Exception:
+                pass
+        if draw is not None and index < len(labels):
+            draw.text((x + 4, y + cell_size + 2), labels[index], fill=(230, 230, 230))
+
+    buffer = io.BytesIO()
+    sheet.save(buffer, format='PNG')
+    return buffer.getvalue()
@@ -0,0 +1,255 @@
+# utils/result_cache.py
+
+"""
+Workflow result memoization
+Keys a run by workflow ID, schema version and a canonical hash of its inputs,
+with image inputs hashed by content (via the upload cache) rather than by URL,
+so re-running unchanged inputs returns the stored result without a request.
+Results are JSON files in the cache directory; the least recently used ones
+are evicted once the total size passes the cap. Output URLs are often signed
+and time-limited, so a result expires with the earliest of its URLs.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from . import workers
+from .cache_paths import get_cache_dir, atomic_write_bytes
+from .upload_cache import DEFAULT_TTL, EXPIRY_MARGIN, get_upload_cache, url_expiry
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+INDEX_FILENAME = "index.json"
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def schema_version(raw_schema: Dict[str, Any]) -> str:
+    """Version of a workflow schema: the server's version field if it sends one, else a hash of the schema"""
+    if not isinstance(raw_schema, dict):
+        return ""
+    for key in ('version', 'updated_at', 'updatedAt'):
+        if raw_schema.get(key):
+            return str(raw_schema[key])
+    return hashlib.blake2b(_canonical(raw_schema).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def make_key(runchat_id: str, version: str, inputs: Dict[str, Any]) -> str:
+    """Cache key of a run; uploaded images count by content so a re-signed URL still hits"""
+    upload_cache = get_upload_cache()
+    canonical_inputs = {}
+    for key, value in (inputs or {}).items():
+        digest = upload_cache.digest_for_url(value) if isinstance(value, str) and value.startswith('http') else None
+        canonical_inputs[key] = {'content': digest} if digest else value
+    payload = _canonical({'runchat_id': runchat_id, 'schema': version, 'inputs': canonical_inputs})
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+
+def _output_urls(value: Any):
+    if isinstance(value, str):
+        if value.startswith('http'):
+            yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _output_urls(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _output_urls(item)
+
+
+def result_expiry(result: Dict[str, Any], now: float) -> Optional[float]:
+    """When the first output URL of a result stops working, or None if it has no URLs"""
+    # URLs without an expiry hint are trusted for as long as uploads are
+    expiries = [url_expiry(url) or (now + DEFAULT_TTL) for url in _output_urls(result.get('data'))]
+    return min(expiries) if expiries else None
+
+
+def is_cacheable(result: Any) -> bool:
+    """Only finished, successful results with outputs are worth keeping (not an interrupted stream's)"""
+    return (isinstance(result, dict) and not result.get('error') and not result.get('partial')
+            and bool(result.get('data')))
+
+
+class ResultCache:
+    """Disk-backed key -> workflow result store with LRU eviction"""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILENAME)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_locked(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            with open(self._index_path(), 'r') as f:
+                data = json.load(f)
+            now = time.time()
+            for key, entry in data.get('entries', {}).items():
+                if self._is_expired(entry, now):
+                    self._remove_file(key)
+                elif os.path.exists(self._entry_path(key)):
+                    self._entries[key] = entry
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[Runchat] Result cache index unreadable, starting fresh: {e}")
+
+    def _save_locked(self):
+        try:
+            payload = json.dumps({'version': 1, 'entries': self._entries}).encode('utf-8')
+            atomic_write_bytes(self._index_path(), payload)
+        except Exception as e:
+            print(f"[Runchat] Could not save result cache index: {e}")
+
+    @staticmethod
+    def _is_expired(entry: Dict[str, Any], now: float) -> bool:
+        expires = entry.get('expires')
+        return expires is not None and expires - EXPIRY_MARGIN <= now
+
+    def _remove_file(self, key: str):
+        try:
+            os.unlink(self._entry_path(key))
+        except OSError:
+            pass
+
+    def _remove_locked(self, key: str):
+        self._entries.pop(key, None)
+        self._remove_file(key)
+
+    def _evict_locked(self):
+        """Drop least recently used results until the cache fits the cap"""
+        total = sum(entry.get('size', 0) for entry in self._entries.values())
+        for key in sorted(self._entries, key=lambda k: self._entries[k].get('last_used', 0)):
+            if total <= self.max_bytes:
+                break
+            total -= self._entries[key].get('size', 0)
+            self._remove_locked(key)
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Stored result for this key, counting the hit or miss"""
+        if self.max_bytes <= 0:
+            return None
+        with self._lock:
+            self._load_locked()
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry, time.time()):
+                # Its output URLs no longer work; run the workflow again for fresh ones
+                self._remove_locked(key)
+                self._save_locked()
+                entry = None
+            if entry is not None:
+                try:
+                    with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                        result = json.load(f)
+                except (OSError, ValueError):
+                    self._remove_locked(key)
+                    self._save_locked()
+                    result = None
+                if result is not None:
+                    self.hits += 1
+                    entry['last_used'] = time.time()
+                    self._save_locked()
+                    return result
+            self.misses += 1
+            return None
+
+    def store(self, key: str, result: Dict[str, Any]):
+        """Remember a successful result"""
+        if not is_cacheable(result) or self.max_bytes <= 0:
+            return
+        payload = json.dumps(result).encode('utf-8')
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            self._load_locked()
+            try:
+                atomic_write_bytes(self._entry_path(key), payload)
+            except OSError as e:
+                print(f"[Runchat] Could not store workflow result: {e}")
+                return
+            now = time.time()
+            self._entries[key] = {'size': len(payload), 'created': now, 'last_used': now,
+                                  'expires': result_expiry(result, now)}
+            self._evict_locked()
+            self._save_locked()
+
+    def set_max_bytes(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._load_locked()
+            self._evict_locked()
+            self._save_locked()
+
+    def clear(self):
+        """Forget all stored results and reset counters"""
+        with self._lock:
+            self._load_locked()
+            for key in list(self._entries):
+                self._remove_locked(key)
+            self.hits = 0
+            self.misses = 0
+            self._save_locked()
+
+    def stats(self, load: bool = True) -> Dict[str, Any]:
+        """Counters and index size; with load=False an index not read yet counts as empty (no disk access)"""
+        with self._lock:
+            if load:
+                self._load_locked()
+            entries = self._entries or {}
+            total = self.hits + self.misses
+            return {
+                'entries': len(entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else 0.0,
+                'cached_bytes': sum(e.get('size', 0) for e in entries.values()),
+            }
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+_index_loading = False
+
+
+def _load_index():
+    get_result_cache().stats()
+
+
+def peek_stats() -> Dict[str, Any]:
+    """
+    Result cache stats for UI draw code: never touches the disk itself. The first call reads
+    the index on a worker, so the figures fill in on a later redraw.
+    """
+    global _index_loading
+    cache = _result_cache
+    if (cache is None or cache._entries is None) and not _index_loading:
+        _index_loading = True
+        workers.submit('download', _load_index)
+    if cache is None:
+        return {'entries': 0, 'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'cached_bytes': 0}
+    return cache.stats(load=False)
+
+
+def get_result_cache() -> ResultCache:
+    """Get the process-wide result cache"""
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache(get_cache_dir("results"))
+        return _result_cache
@@ -0,0 +1,264 @@
+# utils/segmented_download.py
+
+"""
+Parallel HTTP Range downloads with resume
+A large asset is split into byte-range segments fetched concurrently over the
+pooled transport into <path>.part. How much of each segment is on disk is kept
+in <path>.part.json, so an interrupted download (timeout, cancel, Blender
+crash) picks up where it stopped the next time the same asset is fetched to the
+same path, even through a freshly signed URL (see resource_url). Servers without Range support and small files fall back to one
+stream (transport.download_to_file).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from . import cancellation
+from . import transport
+from . import workers
+from .cache_paths import atomic_write_bytes
+
+# Files smaller than this are not worth splitting
+MIN_SEGMENTED_SIZE = 16 * 1024 * 1024
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+DEFAULT_SEGMENTS = 4
+# Per socket operation, not the whole transfer: a slow but live download never times out
+DEFAULT_TIMEOUT = (10, 60)
+# Attempts per segment; each retry continues from the bytes already written
+SEGMENT_RETRIES = 4
+RETRY_BACKOFF = 1.0
+# How often progress is written to the state file while segments run
+STATE_SAVE_INTERVAL = 1.0
+# Small enough that progress (and what a retry or resume can skip) is recorded often
+CHUNK_SIZE = 256 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+STATE_VERSION = 1
+
+
+def _probe(url: str, timeout) -> Dict[str, Any]:
+    """Size and validators of the asset, and whether the server honours Range requests"""
+    response = transport.get(url, timeout=timeout, stream=True, headers={'Range': 'bytes=0-0'})
+    try:
+        response.raise_for_status()
+        content_range = response.headers.get('Content-Range', '')
+        size = 0
+        if response.status_code == 206 and '/' in content_range:
+            total = content_range.rsplit('/', 1)[1].strip()
+            size = int(total) if total.isdigit() else 0
+        return {
+            'ranges': response.status_code == 206 and size > 0,
+            'size': size or int(response.headers.get('Content-Length') or 0),
+            'etag': response.headers.get('ETag', ''),
+            'last_modified': response.headers.get('Last-Modified', ''),
+            'content_type': response.headers.get('Content-Type', ''),
+        }
+    finally:
+        response.close()
+
+
+def resource_url(url: str) -> str:
+    """The URL without its query string: signed links to one asset differ only in their signature"""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, '', ''))
+
+
+def _plan_segments(size: int, segments: int) -> List[List[int]]:
+    """[start, end (inclusive), bytes done] for each segment"""
+    count = max(1, min(segments, size // MIN_SEGMENT_SIZE))
+    step = -(-size // count)
+    return [[start, min(start + step, size) - 1, 0] for start in range(0, size, step)]
+
+
+def _load_state(state_path: str, part_path: str, url: str, probe: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Saved progress of an earlier attempt, if it is for the same, unchanged asset"""
+    try:
+        with open(state_path, 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (state.get('version') != STATE_VERSION or resource_url(state.get('url', '')) != resource_url(url)
+            or state.get('size') != probe['size'] or not os.path.exists(part_path)
+            or os.path.getsize(part_path) != probe['size']):
+        return None
+    # A changed validator means the server has a different file now
+    for key in ('etag', 'last_modified'):
+        if state.get(key) and probe[key] and state[key] != probe[key]:
+            return None
+    if state['url'] != url and not any(state.get(key) and state[key] == probe[key]
+                                       for key in ('etag', 'last_modified')):
+        # Same path under a different query: only the same size and a matching validator prove the same file
+        return None
+    # Segments are fetched from the URL of this attempt; the old signature may have expired
+    state['url'] = url
+    return state
+
+
+def _remove(*paths):
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def hash_file(path: str, hash_name: str) -> str:
+    hasher = hashlib.new(hash_name)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class _Download:
+    """Shared state of the segments of one download"""
+
+    def __init__(self, url, part_path, state_path, state, timeout, on_progress):
+        self.url = url
+        self.part_path = part_path
+        self.state_path = state_path
+        self.state = state
+        self.timeout = timeout
+        self.on_progress = on_progress
+        self.lock = threading.Lock()
+        self.last_save = 0.0
+        self.failed = threading.Event()
+
+    def done_bytes(self) -> int:
+        return sum(segment[2] for segment in self.state['segments'])
+
+    def save(self, force: bool = False):
+        """Persist segment progress (caller holds the lock)"""
+        now = time.monotonic()
+        if not force and now - self.last_save < STATE_SAVE_INTERVAL:
+            return
+        self.last_save = now
+        try:
+            atomic_write_bytes(self.state_path, json.dumps(self.state).encode('utf-8'))
+        except OSError as e:
+            print(f"[Runchat] Could not save download state: {e}")
+
+    def advance(self, segment, length: int):
+        with self.lock:
+            segment[2] += length
+            self.save()
+            done = self.done_bytes()
+        if self.on_progress is not None:
+            self.on_progress(done, self.state['size'])
+
+    def fetch_segment(self, segment):
+        """Fetch what is missing of one segment, retrying from the last written byte (segment pool)"""
+        token = cancellation.current()
+        attempt = 0
+        while True:
+            start, end, done = segment
+            if start + done > end:
+                return
+            if self.failed.is_set():
+                return
+            try:
+                headers = {'Range': f"bytes={start + done}-{end}"}
+                response = transport.get(self.url, timeout=self.timeout, stream=True, headers=headers)
+                try:
+                    if response.status_code != 206:
+                        raise IOError(f"Server ignored the range request (HTTP {response.status_code})")
+                    with open(self.part_path, 'r+b') as f:
+                        f.seek(start + done)
+                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                            if token is not None:
+                                token.raise_if_cancelled()
+                            if not chunk:
+                                continue
+                            chunk = chunk[:end + 1 - (start + segment[2])]
+                            f.write(chunk)
+                            # On disk before the state file can count it
+                            f.flush()
+                            self.advance(segment, len(chunk))
+                            if start + segment[2] > end:
+                                break
+                finally:
+                    response.close()
+                if token is not None:
+                    token.raise_if_cancelled()
+                if start + segment[2] <= end:
+                    raise IOError(f"Segment {start}-{end} ended early")
+                return
+            except cancellation.OperationCancelled:
+                raise
+            except Exception as e:
+                if token is not None and token.cancelled:
+                    raise cancellation.OperationCancelled(f"Download of {self.url} was cancelled") from None
+                attempt += 1
+                if attempt > SEGMENT_RETRIES:
+                    self.failed.set()
+                    raise
+                print(f"[Runchat] Segment {start}-{end} failed ({e}), retry {attempt}/{SEGMENT_RETRIES}")
+                if token is not None and token.wait(RETRY_BACKOFF * attempt):
+                    raise cancellation.OperationCancelled(f"Download of {self.url} was cancelled") from None
+                if token is None:
+                    time.sleep(RETRY_BACKOFF * attempt)
+
+
+def download(url: str, path: str, timeout=DEFAULT_TIMEOUT, segments: int = DEFAULT_SEGMENTS,
+             hash_name: Optional[str] = None,
+             on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    Download url to path, in parallel Range segments when the file is large and the server
+    supports it. Same arguments and result as transport.download_to_file. An interrupted
+    segmented download leaves <path>.part and <path>.part.json behind and resumes from them.
+    """
+    probe = _probe(url, timeout)
+    if not probe['ranges'] or probe['size'] < MIN_SEGMENTED_SIZE:
+        return transport.download_to_file(url, path, timeout=timeout, hash_name=hash_name, on_progress=on_progress)
+
+    part_path = path + ".part"
+    state_path = path + ".part.json"
+    state = _load_state(state_path, part_path, url, probe)
+    if state is None:
+        _remove(part_path, state_path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(part_path, 'wb') as f:
+            f.truncate(probe['size'])
+        state = {
+            'version': STATE_VERSION,
+            'url': url,
+            'size': probe['size'],
+            'etag': probe['etag'],
+            'last_modified': probe['last_modified'],
+            'segments': _plan_segments(probe['size'], segments),
+        }
+    else:
+        print(f"[Runchat] Resuming download at {sum(s[2] for s in state['segments']) * 100 // state['size']}%: {url[:100]}")
+
+    job = _Download(url, part_path, state_path, state, timeout, on_progress)
+    with job.lock:
+        job.save(force=True)
+
+    token = cancellation.current()
+    futures = [workers.submit('segments', cancellation.bind(token, job.fetch_segment), segment)
+               for segment in state['segments']]
+    errors = []
+    for future in futures:
+        try:
+            future.result()
+        except Exception as e:
+            errors.append(e)
+    with job.lock:
+        job.save(force=True)
+    if errors:
+        # Partial state stays on disk for the next attempt
+        cancelled = [e for e in errors if isinstance(e, cancellation.OperationCancelled)]
+        raise cancelled[0] if cancelled else errors[0]
+
+    os.replace(part_path, path)
+    _remove(state_path)
+    return {
+        'path': path,
+        'bytes': state['size'],
+        'digest': hash_file(path, hash_name) if hash_name else None,
+        'content_type': probe['content_type'],
+    }
@@ -0,0 +1,118 @@
+# utils/streaming.py
+
+"""
+Incremental parsing of streamed workflow responses
+The run endpoint can answer a streaming request with Server-Sent Events
+(text/event-stream) or newline-delimited JSON (application/x-ndjson). Both
+are turned into the same event dicts as lines arrive:
+    {'type': 'output', 'id': <output param id>, 'data': <value>}
+    {'type': 'progress', 'progress': <0-1 or 0-100>, 'message': <text>}
+    {'type': 'done', ...final result...}
+    {'type': 'error', 'message': <text>}
+This module does not import bpy so the mock server can use it outside Blender.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+SSE_CONTENT_TYPE = "text/event-stream"
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# Event names servers use for the same thing
+EVENT_ALIASES = {
+    'complete': 'done',
+    'completed': 'done',
+    'result': 'done',
+    'end': 'done',
+    'failed': 'error',
+}
+
+
+def stream_format(content_type: Optional[str]) -> Optional[str]:
+    """'sse' or 'ndjson' for a streaming Content-Type, None for a plain JSON body"""
+    content_type = (content_type or "").split(';')[0].strip().lower()
+    if content_type == SSE_CONTENT_TYPE:
+        return 'sse'
+    if content_type in NDJSON_CONTENT_TYPES:
+        return 'ndjson'
+    return None
+
+
+def normalize_event(payload: Any, event_name: Optional[str] = None) -> Dict[str, Any]:
+    """Event dict from one decoded message; event_name is the SSE 'event:' field if there was one"""
+    event = dict(payload) if isinstance(payload, dict) else {'data': payload}
+    event_type = str(event.get('type') or event_name or 'message').lower()
+    event['type'] = EVENT_ALIASES.get(event_type, event_type)
+    if event['type'] == 'output' and 'id' not in event:
+        event['id'] = event.get('output_id') or event.get('param_id')
+    return event
+
+
+def _decode_line(line) -> str:
+    if isinstance(line, bytes):
+        line = line.decode('utf-8', errors='replace')
+    return line.rstrip('\r\n')
+
+
+def _decode_message(event_name: Optional[str], data_lines) -> Dict[str, Any]:
+    text = "\n".join(data_lines)
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        payload = text
+    return normalize_event(payload, event_name)
+
+
+def iter_sse(lines: Iterable) -> Iterator[Dict[str, Any]]:
+    """Events from Server-Sent Events lines; a blank line ends each message"""
+    event_name = None
+    data_lines = []
+    for line in lines:
+        line = _decode_line(line)
+        if not line:
+            if data_lines:
+                yield _decode_message(event_name, data_lines)
+            event_name = None
+            data_lines = []
+            continue
+        if line.startswith(':'):
+            # Comment, servers send these as keep-alives
+            continue
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+        if field == 'event':
+            event_name = value
+        elif field == 'data':
+            data_lines.append(value)
+
+    if data_lines:
+        yield _decode_message(event_name, data_lines)
+
+
+def iter_ndjson(lines: Iterable) -> Iterator[Dict[str, Any]]:
+    """Events from newline-delimited JSON, one object per line"""
+    for line in lines:
+        line = _decode_line(line).strip()
+        if not line:
+            continue
+        try:
+            payload = json.loads(line)
+        except ValueError:
+            print(f"[Runchat] Skipping malformed stream line: {line[:100]}")
+            continue
+        yield normalize_event(payload)
+
+
+def iter_events(lines: Iterable, fmt: str) -> Iterator[Dict[str, Any]]:
+    """Events from response lines in the given stream format ('sse' or 'ndjson')"""
+    if fmt == 'sse':
+        return iter_sse(lines)
+    return iter_ndjson(lines)
+
+
+def encode_event(event: Dict[str, Any], fmt: str) -> bytes:
+    """Wire form of one event (used by the mock server)"""
+    if fmt == 'sse':
+        return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode('utf-8')
+    return (json.dumps(event) + "\n").encode('utf-8')
@@ -0,0 +1,334 @@
+"""
+Process-wide pooled HTTP transport for the Runchat addon
+Every API call and asset download shares one keep-alive requests.Session
+so TCP/TLS connections are reused instead of re-handshaking per request
+"""
+
+import hashlib
+import os
+import socket
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from . import cancellation
+
+# Pool defaults (overridden from the addon preferences at registration)
+DEFAULT_POOL_CONNECTIONS = 4   # Number of distinct hosts kept in the pool manager
+DEFAULT_POOL_MAXSIZE = 8       # Keep-alive connections kept per host
+
+USER_AGENT = "Runchat-Blender"
+
+# Bytes read from a streamed download per write
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+_lock = threading.Lock()
+_session = None
+_pool_connections = DEFAULT_POOL_CONNECTIONS
+_pool_maxsize = DEFAULT_POOL_MAXSIZE
+
+# Counters from connection pools that were evicted or closed, so stats survive pool turnover
+_retired = {'requests': 0, 'connections': 0}
+
+_requests = None
+
+
+def get_requests_module():
+    """Get the requests module, importing it lazily"""
+    global _requests
+    if _requests is None:
+        from .dependencies import get_requests
+        _requests, _ = get_requests()
+    return _requests
+
+
+def _retire_pool(pool):
+    """Fold the counters of a pool that is about to be discarded into the retired totals"""
+    try:
+        _retired['requests'] += getattr(pool, 'num_requests', 0)
+        _retired['connections'] += getattr(pool, 'num_connections', 0)
+    except Exception:
+        pass
+
+
+def _track_pool_evictions(adapter):
+    """Wrap the pool manager's dispose hook so evicted host pools keep contributing to stats"""
+    pools = adapter.poolmanager.pools
+    original_dispose = pools.dispose_func
+
+    def dispose(pool):
+        _retire_pool(pool)
+        if original_dispose:
+            original_dispose(pool)
+
+    pools.dispose_func = dispose
+
+
+def _abort_connection(conn):
+    """Shut a connection's socket down so a read or write blocked on it fails immediately"""
+    sock = getattr(conn, 'sock', None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def _cancellable_pool_class(base):
+    """
+    Connection pool that registers each checked-out connection with the calling thread's cancel token.
+    The registration is dropped when the connection goes back to the pool, so cancelling one run
+    never touches a connection that another run is using.
+    """
+    class CancellablePool(base):
+        def _get_conn(self, timeout=None):
+            conn = super()._get_conn(timeout=timeout)
+            token = cancellation.current()
+            if token is not None:
+                callback = token.on_cancel(lambda: _abort_connection(conn))
+                conn._runchat_cancel = (token, callback)
+            return conn
+
+        def _put_conn(self, conn):
+            registration = getattr(conn, '_runchat_cancel', None)
+            if registration is not None:
+                token, callback = registration
+                token.remove(callback)
+                conn._runchat_cancel = None
+            return super()._put_conn(conn)
+
+    return CancellablePool
+
+
+def _install_cancellable_pools(adapter):
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+    adapter.poolmanager.pool_classes_by_scheme = {
+        'http': _cancellable_pool_class(HTTPConnectionPool),
+        'https': _cancellable_pool_class(HTTPSConnectionPool),
+    }
+
+
+def _create_session():
+    """Create a session with a keep-alive connection pool mounted for http and https"""
+    requests = get_requests_module()
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Connection': 'keep-alive',
+    })
+
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=_pool_connections,
+        pool_maxsize=_pool_maxsize,
+        pool_block=False,  # Burst above maxsize opens extra connections rather than stalling
+    )
+    _track_pool_evictions(adapter)
+    _install_cancellable_pools(adapter)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    print(f"[Runchat] HTTP transport ready (hosts: {_pool_connections}, connections per host: {_pool_maxsize})")
+    return session
+
+
+def _close_session_locked():
+    """Close the current session, keeping its counters. Caller must hold _lock."""
+    global _session
+    if _session is None:
+        return
+    try:
+        # Closing clears the pool manager, which runs the dispose hook and retires each pool's counters
+        _session.close()
+    except Exception as e:
+        print(f"[Runchat] Warning: error closing HTTP session: {e}")
+    _session = None
+
+
+def get_session():
+    """Get the shared session, creating it on first use"""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _create_session()
+        return _session
+
+
+def configure(pool_connections: Optional[int] = None, pool_maxsize: Optional[int] = None):
+    """Change pool sizes. The next request builds a new session with the new limits."""
+    global _pool_connections, _pool_maxsize
+    with _lock:
+        new_connections = max(1, int(pool_connections)) if pool_connections else _pool_connections
+        new_maxsize = max(1, int(pool_maxsize)) if pool_maxsize else _pool_maxsize
+        if new_connections == _pool_connections and new_maxsize == _pool_maxsize:
+            return
+        _pool_connections = new_connections
+        _pool_maxsize = new_maxsize
+        _close_session_locked()
+
+
+def close():
+    """Close all pooled connections (called when the addon is unregistered)"""
+    with _lock:
+        _close_session_locked()
+
+
+def request(method: str, url: str, **kwargs):
+    """
+    Send a request through the shared pool.
+    Inside a cancellable run (see utils/cancellation.py) a cancel aborts the request and
+    OperationCancelled is raised instead of the connection error it causes.
+    """
+    token = cancellation.current()
+    if token is None:
+        return get_session().request(method, url, **kwargs)
+
+    token.raise_if_cancelled()
+    try:
+        response = get_session().request(method, url, **kwargs)
+    except Exception:
+        if token.cancelled:
+            raise cancellation.OperationCancelled(f"Request to {url} was cancelled") from None
+        raise
+    token.raise_if_cancelled()
+    return response
+
+
+def get(url: str, **kwargs):
+    """GET through the shared pool (same signature as requests.get)"""
+    return request('GET', url, **kwargs)
+
+
+def post(url: str, **kwargs):
+    """POST through the shared pool (same signature as requests.post)"""
+    return request('POST', url, **kwargs)
+
+
+def head(url: str, **kwargs):
+    """HEAD through the shared pool (same signature as requests.head)"""
+    kwargs.setdefault('allow_redirects', True)
+    return request('HEAD', url, **kwargs)
+
+
+def download_to_file(url: str, path: str, timeout=60, chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+                     hash_name: Optional[str] = None,
+                     on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    Stream a GET response to path without holding the body in memory.
+    Chunks go to a temp file next to path that is renamed into place once complete, so a
+    failed or cancelled download never leaves a truncated file. hash_name (any hashlib
+    algorithm) digests the bytes as they are written. on_progress(bytes_done, total_bytes)
+    is called per chunk, total is 0 when the server sends no Content-Length.
+    Returns {'path', 'bytes', 'digest', 'content_type'}.
+    """
+    token = cancellation.current()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    hasher = hashlib.new(hash_name) if hash_name else None
+
+    response = get(url, timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()
+        # A compressed body is decoded while streaming, so its length doesn't match the header
+        encoded = response.headers.get('Content-Encoding', 'identity') != 'identity'
+        total = 0 if encoded else int(response.headers.get('Content-Length') or 0)
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".download_")
+        done = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if token is not None:
+                        token.raise_if_cancelled()
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    done += len(chunk)
+                    if on_progress is not None:
+                        on_progress(done, total)
+            # A cancel shuts the socket down, which can look like the end of the body
+            if token is not None:
+                token.raise_if_cancelled()
+            if total and done < total:
+                raise IOError(f"Download of {url} ended after {done} of {total} bytes")
+            os.replace(temp_path, path)
+        except BaseException as e:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            if token is not None and token.cancelled and not isinstance(e, cancellation.OperationCancelled):
+                raise cancellation.OperationCancelled(f"Download of {url} was cancelled") from None
+            raise
+    finally:
+        response.close()
+
+    return {
+        'path': path,
+        'bytes': done,
+        'digest': hasher.hexdigest() if hasher is not None else None,
+        'content_type': response.headers.get('Content-Type', ''),
+    }
+
+
+def _iter_pools(session):
+    """Yield every live urllib3 connection pool behind a session"""
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                yield pool
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Report connection reuse for the shared transport.
+    A hit is a request served on an already-open connection, a miss is one that
+    had to open a new TCP/TLS connection.
+    """
+    with _lock:
+        total_requests = _retired['requests']
+        total_connections = _retired['connections']
+        hosts = []
+
+        if _session is not None:
+            for pool in _iter_pools(_session):
+                pool_requests = getattr(pool, 'num_requests', 0)
+                pool_connections = getattr(pool, 'num_connections', 0)
+                total_requests += pool_requests
+                total_connections += pool_connections
+
+                idle = 0
+                if getattr(pool, 'pool', None) is not None:
+                    try:
+                        idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+                    except Exception:
+                        idle = 0
+
+                hosts.append({
+                    'host': f"{pool.scheme}://{pool.host}:{pool.port}",
+                    'requests': pool_requests,
+                    'hits': max(0, pool_requests - pool_connections),
+                    'misses': min(pool_requests, pool_connections),
+                    'idle_connections': idle,
+                })
+
+        hits = max(0, total_requests - total_connections)
+        misses = min(total_requests, total_connections)
+
+        return {
+            'requests': total_requests,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': (hits / total_requests) if total_requests else 0.0,
+            'pool_connections': _pool_connections,
+            'pool_maxsize': _pool_maxsize,
+            'hosts': hosts,
+        }
+
@@ -0,0 +1,268 @@
+# utils/upload_cache.py
+
+"""
+Content-addressed upload dedupe cache
+Maps the BLAKE2 hash of uploaded image bytes to the URL the server returned,
+so re-uploading the same reference image is skipped while the URL is valid.
+Expired entries are dropped and the index keeps at most MAX_ENTRIES uploads.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from .cache_paths import get_cache_dir, atomic_write_bytes
+
+# URLs without an expiry hint are trusted for this long
+DEFAULT_TTL = 24 * 60 * 60
+# Treat signed URLs as expired this many seconds early so a workflow never starts with a dying URL
+EXPIRY_MARGIN = 5 * 60
+
+# Least recently used uploads beyond this are forgotten
+MAX_ENTRIES = 2000
+
+INDEX_FILENAME = "upload_index.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_bytes(data) -> str:
+    """BLAKE2b digest of an in-memory buffer"""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def hash_file(file_path: str) -> Optional[str]:
+    """BLAKE2b digest of a file, read in chunks"""
+    try:
+        hasher = hashlib.blake2b(digest_size=20)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+    except OSError as e:
+        print(f"[Runchat] Could not hash file {file_path}: {e}")
+        return None
+
+
+def _parse_amz_date(value: str) -> Optional[float]:
+    try:
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+
+def _parse_iso_date(value: str) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def _jwt_expiry(token: str) -> Optional[float]:
+    """Read the exp claim from a JWT without verifying it (Supabase signed URLs)"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        exp = claims.get('exp')
+        return float(exp) if exp else None
+    except Exception:
+        return None
+
+
+def url_expiry(url: str) -> Optional[float]:
+    """Best-effort expiry timestamp for a signed URL, or None if the URL carries no expiry"""
+    try:
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(url).query)
+    except ValueError:
+        return None
+
+    def first(key):
+        values = query.get(key)
+        return values[0] if values else None
+
+    # AWS SigV4 presigned URLs
+    amz_date, amz_expires = first('X-Amz-Date'), first('X-Amz-Expires')
+    if amz_date and amz_expires:
+        signed_at = _parse_amz_date(amz_date)
+        if signed_at is not None:
+            try:
+                return signed_at + float(amz_expires)
+            except ValueError:
+                pass
+
+    # AWS SigV2 / CloudFront / GCS style absolute epoch
+    expires = first('Expires')
+    if expires and expires.isdigit():
+        return float(expires)
+
+    # Azure SAS
+    se = first('se')
+    if se:
+        parsed = _parse_iso_date(se)
+        if parsed is not None:
+            return parsed
+
+    # Supabase signed URLs carry a JWT
+    token = first('token')
+    if token:
+        return _jwt_expiry(token)
+
+    return None
+
+
+class UploadCache:
+    """Persistent digest -> uploaded URL index with expiry awareness"""
+
+    def __init__(self, index_path: str, default_ttl: float = DEFAULT_TTL):
+        self.index_path = index_path
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load_locked(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+            now = time.time()
+            for digest, entry in data.get('entries', {}).items():
+                if entry.get('expires', 0) > now:
+                    self._entries[digest] = entry
+            self._trim_locked()
+        except Exception as e:
+            print(f"[Runchat] Upload cache index unreadable, starting fresh: {e}")
+            self._entries = {}
+
+    def _trim_locked(self):
+        """Drop expired entries, then the least recently used ones over MAX_ENTRIES"""
+        now = time.time()
+        for digest in [d for d, entry in self._entries.items() if entry.get('expires', 0) <= now]:
+            del self._entries[digest]
+        if len(self._entries) > MAX_ENTRIES:
+            by_use = sorted(self._entries, key=lambda d: self._entries[d].get('last_used', 0))
+            for digest in by_use[:len(self._entries) - MAX_ENTRIES]:
+                del self._entries[digest]
+
+    def _save_locked(self):
+        try:
+            payload = json.dumps({'version': 1, 'entries': self._entries}).encode('utf-8')
+            atomic_write_bytes(self.index_path, payload)
+        except Exception as e:
+            print(f"[Runchat] Could not save upload cache index: {e}")
+
+    def lookup(self, digest: str) -> Optional[str]:
+        """Return a still-valid URL for this content, counting the hit or miss"""
+        if not digest:
+            return None
+        with self._lock:
+            self._load_locked()
+            entry = self._entries.get(digest)
+            if entry and entry.get('expires', 0) - EXPIRY_MARGIN > time.time():
+                self.hits += 1
+                entry['last_used'] = time.time()
+                return entry['url']
+            if entry:
+                # Expired signed URL - forget it so the next upload refreshes it
+                del self._entries[digest]
+                self._save_locked()
+            self.misses += 1
+            return None
+
+    def store(self, digest: str, url: str, size: int = 0):
+        """Remember the URL returned for this content"""
+        if not digest or not url:
+            return
+        now = time.time()
+        expires = url_expiry(url) or (now + self.default_ttl)
+        with self._lock:
+            self._load_locked()
+            self._entries[digest] = {
+                'url': url,
+                'expires': expires,
+                'size': size,
+                'created': now,
+                'last_used': now,
+            }
+            self._trim_locked()
+            self._save_locked()
+
+    def digest_for_url(self, url: str) -> Optional[str]:
+        """Reverse lookup: content digest of a URL this addon uploaded"""
+        if not url:
+            return None
+        with self._lock:
+            self._load_locked()
+            for digest, entry in self._entries.items():
+                if entry.get('url') == url:
+                    return digest
+        return None
+
+    def is_url_fresh(self, url: str) -> bool:
+        """False if the URL is a cached upload whose signature has (nearly) expired"""
+        expires = url_expiry(url)
+        if expires is None:
+            with self._lock:
+                self._load_locked()
+                for entry in self._entries.values():
+                    if entry.get('url') == url:
+                        expires = entry.get('expires')
+                        break
+        if expires is None:
+            return True
+        return expires - EXPIRY_MARGIN > time.time()
+
+    def clear(self):
+        """Forget all cached uploads and reset counters"""
+        with self._lock:
+            self._entries = {}
+            self.hits = 0
+            self.misses = 0
+            self._save_locked()
+
+    def stats(self, load: bool = True) -> Dict[str, Any]:
+        """Counters and index size; with load=False an index not read yet counts as empty (no disk access)"""
+        with self._lock:
+            if load:
+                self._load_locked()
+            entries = self._entries or {}
+            total = self.hits + self.misses
+            return {
+                'entries': len(entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else 0.0,
+                'cached_bytes': sum(e.get('size', 0) for e in entries.values()),
+            }
+
+
+_upload_cache = None
+_upload_cache_lock = threading.Lock()
+
+
+def peek_stats() -> Dict[str, Any]:
+    """Upload cache stats for UI draw code: never creates the cache directory or reads the index"""
+    cache = _upload_cache
+    if cache is None:
+        return {'entries': 0, 'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'cached_bytes': 0}
+    return cache.stats(load=False)
+
+
+def get_upload_cache() -> UploadCache:
+    """Get the process-wide upload cache"""
+    global _upload_cache
+    with _upload_cache_lock:
+        if _upload_cache is None:
+            _upload_cache = UploadCache(os.path.join(get_cache_dir(), INDEX_FILENAME))
+        return _upload_cache
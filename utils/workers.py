@@ -0,0 +1,72 @@
+# utils/workers.py
+
+"""
+Named, bounded background worker pools shared across the addon
+Each pool is created on first use and shut down when the addon is unregistered
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+# Default worker counts per pool (overridden from the addon preferences at registration)
+DEFAULT_MAX_WORKERS = {
+    'upload': 4,
+    # JPEG encoding and hashing release the GIL, leave one core for Blender's UI
+    'encode': max(1, min(4, (os.cpu_count() or 2) - 1)),
+    # Concurrent workflow runs during a multi-camera batch
+    'batch': 3,
+    # Jobs from the job scheduler (overridden by the Concurrent Jobs preference)
+    'jobs': 3,
+    # Output prefetches for the auto-import scheduler
+    'download': 4,
+    # Byte-range segments of large downloads (only ever submitted from other pools' tasks)
+    'segments': 8,
+}
+FALLBACK_MAX_WORKERS = 2
+
+_lock = threading.Lock()
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_max_workers = dict(DEFAULT_MAX_WORKERS)
+
+
+def get_executor(name: str) -> ThreadPoolExecutor:
+    """Get the named pool, creating it on first use"""
+    with _lock:
+        executor = _executors.get(name)
+        if executor is None:
+            workers = _max_workers.get(name, FALLBACK_MAX_WORKERS)
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"runchat-{name}")
+            _executors[name] = executor
+            print(f"[Runchat] Worker pool '{name}' ready ({workers} workers)")
+        return executor
+
+
+def submit(name: str, fn, *args, **kwargs):
+    """Run fn on the named pool and return its Future"""
+    return get_executor(name).submit(fn, *args, **kwargs)
+
+
+def configure(name: str, max_workers: int):
+    """Change a pool's size. Running tasks finish, new tasks go to a fresh pool."""
+    with _lock:
+        max_workers = max(1, int(max_workers))
+        if _max_workers.get(name) == max_workers:
+            return
+        _max_workers[name] = max_workers
+        executor = _executors.pop(name, None)
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+def shutdown(wait: bool = False):
+    """Shut down every pool, dropping tasks that have not started yet"""
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        try:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        except Exception as e:
+            print(f"[Runchat] Warning: error shutting down worker pool: {e}")